@@ -0,0 +1,61 @@
+"""add_posm_stock_movements
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-02-07 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # POSM stok hareket defteri (sayaçlar bu defterin toplamı olarak tutulur)
+    op.create_table(
+        'posm_stock_movements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('posm_id', sa.Integer(), nullable=False),
+        sa.Column('ready_delta', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('repair_pending_delta', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reason', sa.String(length=30), nullable=False),
+        sa.Column('request_id', sa.Integer(), nullable=True),
+        sa.Column('transfer_id', sa.Integer(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['posm_id'], ['posm.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['request_id'], ['requests.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['transfer_id'], ['posm_transfers.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_posm_stock_movements_id'), 'posm_stock_movements', ['id'], unique=False)
+    op.create_index(op.f('ix_posm_stock_movements_request_id'), 'posm_stock_movements', ['request_id'], unique=False)
+    op.create_index('ix_posm_stock_movements_posm_created', 'posm_stock_movements', ['posm_id', 'created_at'], unique=False)
+    
+    # Mevcut stoklar açılış bakiyesi olarak deftere yazılır (defter toplamı = sayaçlar)
+    op.execute("""
+        INSERT INTO posm_stock_movements (posm_id, ready_delta, repair_pending_delta, reason)
+        SELECT id, ready_count, repair_pending_count, 'opening_balance'
+        FROM posm
+        WHERE ready_count <> 0 OR repair_pending_count <> 0
+    """)
+    
+    # Negatif stok veritabanı seviyesinde de engellenir (NOT VALID: mevcut satırlar kontrol edilmez)
+    op.execute("ALTER TABLE posm ADD CONSTRAINT ck_posm_ready_count_non_negative CHECK (ready_count >= 0) NOT VALID")
+    op.execute("ALTER TABLE posm ADD CONSTRAINT ck_posm_repair_pending_count_non_negative CHECK (repair_pending_count >= 0) NOT VALID")
+
+
+def downgrade() -> None:
+    op.drop_constraint('ck_posm_repair_pending_count_non_negative', 'posm', type_='check')
+    op.drop_constraint('ck_posm_ready_count_non_negative', 'posm', type_='check')
+    op.drop_index('ix_posm_stock_movements_posm_created', table_name='posm_stock_movements')
+    op.drop_index(op.f('ix_posm_stock_movements_request_id'), table_name='posm_stock_movements')
+    op.drop_index(op.f('ix_posm_stock_movements_id'), table_name='posm_stock_movements')
+    op.drop_table('posm_stock_movements')
@@ -0,0 +1,48 @@
+"""add_notification_digest_items
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-02-08 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Özet (digest) bildirim kuyruğu: alıcı başına pencere boyunca biriken talep bildirimleri
+    op.create_table(
+        'notification_digest_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('request_id', sa.Integer(), nullable=True),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('dealer_label', sa.String(length=255), nullable=True),
+        sa.Column('detail', sa.Text(), nullable=True),
+        sa.Column('subject', sa.String(length=500), nullable=False),
+        sa.Column('body_html', sa.Text(), nullable=False),
+        sa.Column('body_text', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['request_id'], ['requests.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notification_digest_items_id'), 'notification_digest_items', ['id'], unique=False)
+    op.create_index(
+        'ix_notification_digest_items_pending', 'notification_digest_items', ['user_id', 'created_at'],
+        unique=False, postgresql_where=sa.text("sent_at IS NULL")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_digest_items_pending', table_name='notification_digest_items')
+    op.drop_index(op.f('ix_notification_digest_items_id'), table_name='notification_digest_items')
+    op.drop_table('notification_digest_items')
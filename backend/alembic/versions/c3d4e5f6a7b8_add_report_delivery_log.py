@@ -0,0 +1,67 @@
+"""add_report_delivery_log
+
+Revision ID: c3d4e5f6a7b8
+Revises: b7c8d9e0f1a2
+Create Date: 2026-02-03 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d4e5f6a7b8'
+down_revision = 'b7c8d9e0f1a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rapor çalışmaları (süre ve özet sayılar)
+    op.create_table(
+        'report_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('report_key', sa.String(length=100), nullable=False),
+        sa.Column('scheduled_report_id', sa.Integer(), nullable=True),
+        sa.Column('subject', sa.String(length=500), nullable=True),
+        sa.Column('recipient_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('success_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('render_ms', sa.Integer(), nullable=True),
+        sa.Column('duration_ms', sa.Integer(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['scheduled_report_id'], ['scheduled_reports.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_report_runs_id'), 'report_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_report_runs_report_key'), 'report_runs', ['report_key'], unique=False)
+    op.create_index(op.f('ix_report_runs_scheduled_report_id'), 'report_runs', ['scheduled_report_id'], unique=False)
+    
+    # Alıcı bazında gönderim kayıtları
+    op.create_table(
+        'report_deliveries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('recipient_user_id', sa.Integer(), nullable=True),
+        sa.Column('recipient_email', sa.String(length=255), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('duration_ms', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['run_id'], ['report_runs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recipient_user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_report_deliveries_id'), 'report_deliveries', ['id'], unique=False)
+    op.create_index(op.f('ix_report_deliveries_run_id'), 'report_deliveries', ['run_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_report_deliveries_run_id'), table_name='report_deliveries')
+    op.drop_index(op.f('ix_report_deliveries_id'), table_name='report_deliveries')
+    op.drop_table('report_deliveries')
+    op.drop_index(op.f('ix_report_runs_scheduled_report_id'), table_name='report_runs')
+    op.drop_index(op.f('ix_report_runs_report_key'), table_name='report_runs')
+    op.drop_index(op.f('ix_report_runs_id'), table_name='report_runs')
+    op.drop_table('report_runs')
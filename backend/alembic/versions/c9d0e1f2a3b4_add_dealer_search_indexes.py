@@ -0,0 +1,44 @@
+"""add_dealer_search_indexes
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-02-09 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d0e1f2a3b4'
+down_revision = 'b8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Türkçe harf katlama: veritabanı locale'inden bağımsız (C collation'da lower() Türkçe harflere dokunmaz).
+    # I/İ/ı/i aynı harf sayılır; Python tarafındaki karşılığı DealerService.fold_search_text (iki taraf aynı kalmalı).
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION tr_fold(value text) RETURNS text
+        LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+        AS $$ SELECT lower(translate(value, 'İIıÇĞÖŞÜ', 'iiiçğöşü')) $$
+        """
+    )
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Bayi arama: 3+ karakterlik terimler için içerir (trigram GIN), kısa terimler için önek (text_pattern_ops)
+    op.execute("CREATE INDEX ix_dealers_code_trgm ON dealers USING gin (tr_fold(code) gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_dealers_name_trgm ON dealers USING gin (tr_fold(name) gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_dealers_code_prefix ON dealers (tr_fold(code) text_pattern_ops)")
+    op.execute("CREATE INDEX ix_dealers_name_prefix ON dealers (tr_fold(name) text_pattern_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dealers_name_prefix', table_name='dealers')
+    op.drop_index('ix_dealers_code_prefix', table_name='dealers')
+    op.drop_index('ix_dealers_name_trgm', table_name='dealers')
+    op.drop_index('ix_dealers_code_trgm', table_name='dealers')
+    # pg_trgm başka nesneler tarafından kullanılıyor olabilir; extension bırakılır
+    op.execute("DROP FUNCTION IF EXISTS tr_fold(text)")
@@ -0,0 +1,35 @@
+"""add_reference_data_versions
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-02-10 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0e1f2a3b4c5'
+down_revision = 'c9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Referans veri önbelleği: veri seti başına sürüm sayacı (yazan transaction commit'te artırır)
+    op.create_table(
+        'reference_data_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.execute(
+        "INSERT INTO reference_data_versions (name, version) "
+        "VALUES ('depots', 1), ('territories', 1), ('posm', 1)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reference_data_versions')
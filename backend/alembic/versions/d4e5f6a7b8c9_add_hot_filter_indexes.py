@@ -0,0 +1,57 @@
+"""add_hot_filter_indexes
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2026-02-04 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e5f6a7b8c9'
+down_revision = 'c3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Talep listeleri: request_date DESC, id DESC sıralı keyset sayfalama (tümü / depo / kullanıcı bazında)
+    op.create_index('ix_requests_request_date_id', 'requests', [sa.text('request_date DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_requests_depot_request_date', 'requests', ['depot_id', sa.text('request_date DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_requests_user_request_date', 'requests', ['user_id', sa.text('request_date DESC'), sa.text('id DESC')], unique=False)
+
+    # Haftalık tamamlanan işler raporu: status = 'Tamamlandı' AND completed_date aralığı
+    op.create_index('ix_requests_status_completed_date', 'requests', ['status', 'completed_date'], unique=False)
+
+    # Açık durumlar için kısmi index'ler (tablonun küçük bir kısmı; iş planı ve bekleyen işler raporu)
+    op.create_index(
+        'ix_requests_pending_depot_requested_date', 'requests', ['depot_id', 'requested_date'],
+        unique=False, postgresql_where=sa.text("status = 'Beklemede'")
+    )
+    op.create_index(
+        'ix_requests_planned_depot_planned_date', 'requests', ['depot_id', 'planned_date'],
+        unique=False, postgresql_where=sa.text("status = 'TakvimeEklendi'")
+    )
+
+    # Fotoğraflar her zaman talep üzerinden okunur
+    op.create_index('ix_photos_request_id', 'photos', ['request_id'], unique=False)
+
+    # Audit log listesi (created_at DESC), entity geçmişi ve kullanıcı bazında filtre
+    op.create_index('ix_audit_logs_created_at', 'audit_logs', [sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_audit_logs_entity_created_at', 'audit_logs', ['entity_type', 'entity_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_audit_logs_user_created_at', 'audit_logs', ['user_id', sa.text('created_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_user_created_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_entity_created_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_created_at', table_name='audit_logs')
+    op.drop_index('ix_photos_request_id', table_name='photos')
+    op.drop_index('ix_requests_planned_depot_planned_date', table_name='requests')
+    op.drop_index('ix_requests_pending_depot_requested_date', table_name='requests')
+    op.drop_index('ix_requests_status_completed_date', table_name='requests')
+    op.drop_index('ix_requests_user_request_date', table_name='requests')
+    op.drop_index('ix_requests_depot_request_date', table_name='requests')
+    op.drop_index('ix_requests_request_date_id', table_name='requests')
@@ -0,0 +1,42 @@
+"""fold_circumflex_in_tr_fold
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-02-11 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f2a3b4c5d6'
+down_revision = 'd0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+_INDEXES = ("ix_dealers_code_trgm", "ix_dealers_name_trgm", "ix_dealers_code_prefix", "ix_dealers_name_prefix")
+
+
+def _replace_tr_fold(source: str, target: str) -> None:
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION tr_fold(value text) RETURNS text
+        LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+        AS $$ SELECT lower(translate(value, '{source}', '{target}')) $$
+        """
+    )
+    # Index'ler fonksiyonun eski sonuçlarını tutar; fonksiyon değişince yeniden oluşturulmalı
+    for index in _INDEXES:
+        op.execute(f"REINDEX INDEX {index}")
+
+
+def upgrade() -> None:
+    # C/POSIX collation'da lower() sadece ASCII harfleri küçültür: şapkalı büyük harfler (Â, Î, Û) de
+    # çevrilmezse "KÂĞIT" veritabanında "kÂğit", arama teriminde "kâğit" olur ve eşleşmez.
+    # Python tarafındaki karşılığı DealerService._TR_FOLD (iki taraf aynı kalmalı).
+    _replace_tr_fold('İIıÇĞÖŞÜÂÎÛ', 'iiiçğöşüâîû')
+
+
+def downgrade() -> None:
+    _replace_tr_fold('İIıÇĞÖŞÜ', 'iiiçğöşü')
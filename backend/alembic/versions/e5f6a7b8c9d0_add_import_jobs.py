@@ -0,0 +1,50 @@
+"""add_import_jobs
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-02-05 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Arka plan import işleri (ilerleme, sonuç sayıları ve CSV hata raporu)
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('depot_id', sa.Integer(), nullable=True),
+        sa.Column('total_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('processed_rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('inserted_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_report', sa.Text(), nullable=True),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['depot_id'], ['depots.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_import_jobs_id'), 'import_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_import_jobs_kind'), 'import_jobs', ['kind'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_import_jobs_kind'), table_name='import_jobs')
+    op.drop_index(op.f('ix_import_jobs_id'), table_name='import_jobs')
+    op.drop_table('import_jobs')
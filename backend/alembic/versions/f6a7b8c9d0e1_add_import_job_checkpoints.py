@@ -0,0 +1,35 @@
+"""add_import_job_checkpoints
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-02-06 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Kaynak dosya bilgisi ve kaldığı yerden devam için checkpoint
+    op.add_column('import_jobs', sa.Column('source_type', sa.String(length=20), nullable=False, server_default='csv'))
+    op.add_column('import_jobs', sa.Column('source_path', sa.String(length=500), nullable=True))
+    op.add_column('import_jobs', sa.Column('options', sa.JSON(), nullable=True))
+    op.add_column('import_jobs', sa.Column('checkpoint_row', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('import_jobs', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.create_index('ix_import_jobs_status', 'import_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_import_jobs_status', table_name='import_jobs')
+    op.drop_column('import_jobs', 'updated_at')
+    op.drop_column('import_jobs', 'checkpoint_row')
+    op.drop_column('import_jobs', 'options')
+    op.drop_column('import_jobs', 'source_path')
+    op.drop_column('import_jobs', 'source_type')
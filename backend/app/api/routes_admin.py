@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Request
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.session import get_db
@@ -11,9 +11,14 @@ from app.models.territory import Territory
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.schemas.dealer import DealerCreate, DealerUpdate, DealerResponse
 from app.schemas.depot import DepotResponse
+from app.schemas.diagnostics import SlowQuerySettingsUpdate, ProfileStartRequest
 from app.core.security import get_password_hash
-import pandas as pd
-import io
+from app.core.principal_cache import principal_cache
+from app.core.reference_cache import DEPOTS, PRINCIPALS, TERRITORIES, mark_changed, serve_cached
+from app.services.report_delivery_service import invalidate_admin_recipients
+from app.services.import_job_service import ImportJobService, job_to_dict, run_import_job
+from app.services.import_sources import detect_source_type
+import os
 
 router = APIRouter()
 
@@ -135,16 +140,125 @@ def require_admin(current_user: dict = Depends(AuthService.get_current_user)):
     return current_user
 
 
+@router.get("/email-outbox/metrics")
+async def get_email_outbox_metrics(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """Email kuyruğu derinliği ve gönderim gecikmesi metrikleri"""
+    from app.services.email_outbox_service import email_outbox_worker
+    return email_outbox_worker.get_metrics(db)
+
+
+# ========== DİAGNOSTİK ==========
+# Yavaş sorgu log'u ve profiler process başınadır; birden fazla worker varsa istek hangi worker'a
+# düştüyse onun durumu döner (yanıttaki pid ile görülebilir)
+
+@router.get("/diagnostics/slow-queries")
+async def get_slow_queries(
+    limit: int = 50,
+    current_user: dict = Depends(require_admin)
+):
+    """Son yavaş sorgular (statement, parametreler, route) ve log ayarları"""
+    from app.core.diagnostics import slow_query_log
+    return {
+        "pid": os.getpid(),
+        **slow_query_log.get_status(),
+        "entries": slow_query_log.get_entries(limit)
+    }
+
+
+@router.put("/diagnostics/slow-queries")
+async def update_slow_query_settings(
+    update: SlowQuerySettingsUpdate,
+    current_user: dict = Depends(require_admin)
+):
+    """Yavaş sorgu log'unu aç/kapat veya eşiği değiştir (yeniden başlatma gerekmez)"""
+    from app.core.diagnostics import slow_query_log
+    slow_query_log.configure(threshold_ms=update.threshold_ms, enabled=update.enabled)
+    return {"pid": os.getpid(), **slow_query_log.get_status()}
+
+
+@router.delete("/diagnostics/slow-queries")
+async def clear_slow_queries(
+    current_user: dict = Depends(require_admin)
+):
+    """Bellekteki yavaş sorgu kayıtlarını temizle"""
+    from app.core.diagnostics import slow_query_log
+    slow_query_log.clear()
+    return {"pid": os.getpid(), **slow_query_log.get_status()}
+
+
+@router.post("/diagnostics/profile")
+async def start_profile(
+    profile_request: ProfileStartRequest,
+    current_user: dict = Depends(require_admin)
+):
+    """Örnekleyici profiler'ı verilen süre için başlat; çıktı flamegraph uyumlu .folded dosyasıdır"""
+    from app.core.config import settings
+    from app.core.diagnostics import sampling_profiler
+    
+    if profile_request.duration_seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Profil süresi en fazla {settings.PROFILER_MAX_SECONDS} saniye olabilir"
+        )
+    try:
+        return sampling_profiler.start(profile_request.duration_seconds, profile_request.interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.get("/diagnostics/profile")
+async def get_profile_status(
+    current_user: dict = Depends(require_admin)
+):
+    """Çalışan/son profilin durumu ve kayıtlı profil dosyaları"""
+    from app.core.diagnostics import sampling_profiler, list_profiles
+    return {"pid": os.getpid(), **sampling_profiler.get_status(), "files": list_profiles()}
+
+
+@router.delete("/diagnostics/profile")
+async def stop_profile(
+    current_user: dict = Depends(require_admin)
+):
+    """Çalışan profili erken bitir (o ana kadarki örnekler yazılır)"""
+    from app.core.diagnostics import sampling_profiler
+    sampling_profiler.stop()
+    return {"pid": os.getpid(), **sampling_profiler.get_status()}
+
+
+@router.get("/diagnostics/profiles/{filename}")
+async def download_profile(
+    filename: str,
+    current_user: dict = Depends(require_admin)
+):
+    """Profil dosyasını indir (flamegraph.pl / speedscope ile açılabilir)"""
+    from fastapi.responses import FileResponse
+    from app.core.diagnostics import get_diagnostics_dir
+    
+    if filename != os.path.basename(filename) or not filename.endswith(".folded"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Geçersiz dosya adı")
+    path = os.path.join(get_diagnostics_dir(), filename)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profil bulunamadı")
+    return FileResponse(path, media_type="text/plain", filename=filename)
+
+
 # ========== DEPOT YÖNETİMİ ==========
 
 @router.get("/depots", response_model=List[DepotResponse])
 async def get_depots(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
-    """Tüm depoları listele"""
-    depots = db.query(Depot).all()
-    return depots
+    """Tüm depoları listele (önbellekten; ETag ile 304 desteklenir)"""
+    return serve_cached(
+        request, response, db, DEPOTS, "all",
+        lambda: [DepotResponse.model_validate(depot) for depot in db.query(Depot).all()]
+    )
 
 
 @router.delete("/depots/{depot_id}")
@@ -235,6 +349,7 @@ async def delete_depot(
         logging.getLogger(__name__).warning(f"Audit log oluşturma hatası: {e}")
     
     db.delete(depot)
+    mark_changed(db, DEPOTS)
     db.commit()
     
     return {"message": "Depo başarıyla silindi"}
@@ -367,6 +482,9 @@ async def create_user(
         db.commit()
         db.refresh(new_user)
     
+    # Yeni admin otomatik raporları hemen alsın
+    invalidate_admin_recipients()
+    
     # Audit log oluştur
     try:
         from app.services.audit_service import AuditService
@@ -483,9 +601,14 @@ async def update_user(
     if user_data.password:
         user.password_hash = get_password_hash(user_data.password)
     
+    # Rol/depo değişiklikleri tüm worker'larda sonraki istekte geçerli olsun (sürüm commit'te artar)
+    mark_changed(db, PRINCIPALS)
     db.commit()
     db.refresh(user)
     
+    principal_cache.invalidate_user(user_id)
+    invalidate_admin_recipients()
+    
     # Yeni değerleri kaydet (audit log için)
     new_values = {}
     if user_data.name:
@@ -590,8 +713,13 @@ async def delete_user(
         logging.getLogger(__name__).warning(f"Audit log oluşturma hatası: {e}")
     
     db.delete(user)
+    # Silinen kullanıcının token'ları hiçbir worker'da önbellekten çözülmesin
+    mark_changed(db, PRINCIPALS)
     db.commit()
     
+    principal_cache.invalidate_user(user_id)
+    invalidate_admin_recipients()
+    
     return {"message": "Kullanıcı başarıyla silindi"}
 
 
@@ -658,6 +786,7 @@ async def create_dealer(
     )
     
     db.add(new_dealer)
+    mark_changed(db, TERRITORIES)
     db.commit()
     db.refresh(new_dealer)
     
@@ -771,6 +900,7 @@ async def update_dealer(
     if dealer_data.longitude is not None:
         dealer.longitude = dealer_data.longitude
     
+    mark_changed(db, TERRITORIES)
     db.commit()
     db.refresh(dealer)
     
@@ -857,6 +987,7 @@ async def delete_dealer(
         logging.getLogger(__name__).warning(f"Audit log oluşturma hatası: {e}")
     
     db.delete(dealer)
+    mark_changed(db, TERRITORIES)
     db.commit()
     
     return {"message": "Bayi başarıyla silindi"}
@@ -864,175 +995,158 @@ async def delete_dealer(
 
 # ========== TOPLU BAYİ İMPORT ==========
 
-@router.post("/dealers/bulk-import")
+@router.post("/dealers/bulk-import", status_code=status.HTTP_202_ACCEPTED)
 async def bulk_import_dealers(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     depot_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
-    """Excel/CSV dosyasından toplu bayi import"""
-    if not depot_id:
+    """Excel/CSV dosyasından toplu bayi import - arka planda çalışır, ilerleme import işi üzerinden izlenir"""
+    return await _start_import_job(background_tasks, file, "dealers", None, depot_id, db, current_user)
+
+
+# ========== IMPORT İŞLERİ ==========
+
+async def _start_import_job(
+    background_tasks: BackgroundTasks,
+    file: UploadFile,
+    kind: str,
+    source_type: Optional[str],
+    depot_id: Optional[int],
+    db: Session,
+    current_user: dict,
+    options: Optional[dict] = None
+) -> dict:
+    if depot_id and not db.query(Depot).filter(Depot.id == depot_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Depo bulunamadı"
+        )
+    
+    contents = await file.read()
+    try:
+        job = ImportJobService(db).create_job(
+            kind=kind,
+            source_type=source_type or detect_source_type(file.filename or ""),
+            filename=file.filename or "import",
+            contents=contents,
+            depot_id=depot_id,
+            user_id=current_user["id"],
+            options=options
+        )
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="depot_id parametresi gereklidir"
+            detail=str(e)
         )
     
-    # Depot kontrolü
-    depot = db.query(Depot).filter(Depot.id == depot_id).first()
-    if not depot:
+    background_tasks.add_task(run_import_job, job.id)
+    return job_to_dict(job)
+
+
+@router.post("/import-jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_import_job(
+    background_tasks: BackgroundTasks,
+    kind: str,
+    file: UploadFile = File(...),
+    source_type: Optional[str] = None,
+    depot_id: Optional[int] = None,
+    create_territories: bool = False,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """
+    Import işi başlat (kind: dealers, posm, users; source_type: csv, xlsx, sheets - boşsa uzantıdan).
+    Bayi ve POSM import'u için depot_id gereklidir.
+    """
+    options = {"create_territories": True} if create_territories else None
+    return await _start_import_job(background_tasks, file, kind, source_type, depot_id, db, current_user, options)
+
+
+@router.get("/import-jobs")
+async def list_import_jobs(
+    kind: Optional[str] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """Son import işleri"""
+    jobs = ImportJobService(db).list_jobs(kind=kind, limit=min(max(limit, 1), 200))
+    return [job_to_dict(job) for job in jobs]
+
+
+@router.get("/import-jobs/{job_id}")
+async def get_import_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """Import işinin durumu ve ilerlemesi"""
+    job = ImportJobService(db).get_job(job_id)
+    if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Depo bulunamadı"
+            detail="Import işi bulunamadı"
+        )
+    return job_to_dict(job)
+
+
+@router.post("/import-jobs/{job_id}/resume", status_code=status.HTTP_202_ACCEPTED)
+async def resume_import_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """Başarısız olmuş veya yarıda kalmış import işini son checkpoint'ten devam ettir"""
+    job = ImportJobService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import işi bulunamadı"
+        )
+    if job.status == "completed":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="İş zaten tamamlanmış"
+        )
+    if not job.source_path:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="İşin kaynak dosyası yok, yeniden yükleyin"
         )
     
-    # Dosya içeriğini oku
-    contents = await file.read()
-    
-    try:
-        # Excel veya CSV dosyasını parse et
-        if file.filename.endswith('.xlsx') or file.filename.endswith('.xls'):
-            df = pd.read_excel(io.BytesIO(contents))
-        elif file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents))
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Desteklenen formatlar: .xlsx, .xls, .csv"
-            )
-        
-        # Beklenen kolonlar: Bayi Kodu, Bayi Adı, Territory (opsiyonel), Latitude (opsiyonel), Longitude (opsiyonel)
-        required_cols = ["Bayi Kodu", "Bayi Adı"]
-        for col in required_cols:
-            if col not in df.columns:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Eksik kolon: {col}. Gerekli kolonlar: {', '.join(required_cols)}"
-                )
-        
-        imported = 0
-        updated = 0
-        errors = []
-        
-        # Excel dosyasındaki duplicate'leri temizle (aynı code + depot_id kombinasyonu)
-        # Son görünen değeri kullan (daha güncel olabilir)
-        seen_combinations = {}
-        df_cleaned = []
-        for idx, row in df.iterrows():
-            code = str(row["Bayi Kodu"]).strip() if pd.notna(row.get("Bayi Kodu")) else ""
-            if code:
-                key = (code, depot_id)
-                # Eğer daha önce görüldüyse, eski kaydı kaldır ve yenisini ekle
-                if key in seen_combinations:
-                    # Eski kaydı bul ve kaldır
-                    old_idx = seen_combinations[key]
-                    df_cleaned = [(i, r) for i, r in df_cleaned if i != old_idx]
-                    errors.append(f"Satır {old_idx + 2}: Duplicate bayi kodu '{code}' - son görünen değer kullanıldı")
-                seen_combinations[key] = idx
-                df_cleaned.append((idx, row))
-        
-        # Session içinde eklenen kayıtları takip et (aynı batch içinde duplicate'leri önlemek için)
-        session_added_keys = set()
-        
-        # Temizlenmiş verileri işle
-        for idx, row in df_cleaned:
-            try:
-                code = str(row["Bayi Kodu"]).strip()
-                name = str(row["Bayi Adı"]).strip()
-                
-                if not code or not name:
-                    errors.append(f"Satır {idx + 2}: Kod veya isim boş")
-                    continue
-                
-                key = (code, depot_id)
-                
-                # Önce session içinde eklenen kayıtları kontrol et
-                if key in session_added_keys:
-                    errors.append(f"Satır {idx + 2}: Duplicate bayi kodu '{code}' aynı import içinde - atlandı")
-                    continue
-                
-                # Territory bul (eğer varsa)
-                territory_id = None
-                if "Territory" in df.columns and pd.notna(row.get("Territory")):
-                    territory_name = str(row["Territory"]).strip()
-                    territory = db.query(Territory).filter(Territory.name == territory_name).first()
-                    if territory:
-                        territory_id = territory.id
-                
-                # Latitude/Longitude
-                latitude = None
-                longitude = None
-                if "Latitude" in df.columns and pd.notna(row.get("Latitude")):
-                    try:
-                        latitude = float(str(row["Latitude"]).replace(",", "."))
-                    except:
-                        pass
-                if "Longitude" in df.columns and pd.notna(row.get("Longitude")):
-                    try:
-                        longitude = float(str(row["Longitude"]).replace(",", "."))
-                    except:
-                        pass
-                
-                # Mevcut bayi kontrolü (veritabanında)
-                existing = db.query(Dealer).filter(
-                    Dealer.code == code,
-                    Dealer.depot_id == depot_id
-                ).first()
-                
-                if existing:
-                    # Güncelle
-                    existing.name = name
-                    existing.territory_id = territory_id
-                    existing.latitude = latitude
-                    existing.longitude = longitude
-                    updated += 1
-                else:
-                    # Yeni ekle
-                    new_dealer = Dealer(
-                        code=code,
-                        name=name,
-                        territory_id=territory_id,
-                        depot_id=depot_id,
-                        latitude=latitude,
-                        longitude=longitude
-                    )
-                    db.add(new_dealer)
-                    session_added_keys.add(key)  # Session'a eklenen kayıtları takip et
-                    imported += 1
-                
-            except Exception as e:
-                errors.append(f"Satır {idx + 2}: {str(e)[:100]}")
-                continue
-        
-        # Tüm değişiklikleri tek seferde commit et
-        try:
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            # UniqueViolation hatasını daha anlaşılır hale getir
-            error_msg = str(e)
-            if "UniqueViolation" in error_msg or "duplicate key" in error_msg.lower():
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Import hatası: Aynı bayi kodu ve depo kombinasyonu zaten mevcut. Lütfen Excel dosyasındaki duplicate kayıtları kontrol edin. Detay: {error_msg[:200]}"
-                )
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Veritabanı hatası: {str(e)}"
-            )
-        
-        return {
-            "message": "Toplu import tamamlandı",
-            "imported": imported,
-            "updated": updated,
-            "errors": errors[:10]  # İlk 10 hatayı göster
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        db.rollback()
+    # Çalıştırma hakkı run_job içinde koşullu UPDATE ile alınır (aynı iş iki kez çalışmaz)
+    background_tasks.add_task(run_import_job, job.id)
+    return job_to_dict(job)
+
+
+@router.get("/import-jobs/{job_id}/errors")
+async def download_import_job_errors(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """Import hata raporunu CSV olarak indir"""
+    job = ImportJobService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import işi bulunamadı"
+        )
+    if not job.error_report:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Import hatası: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bu import için hata raporu yok"
         )
+    
+    # Excel'in Türkçe karakterleri tanıması için UTF-8 BOM
+    return Response(
+        content=("\ufeff" + job.error_report).encode("utf-8"),
+        media_type="text/csv; charset=utf-8",
+        headers={
+            "Content-Disposition": f"attachment; filename=import_{job.id}_hatalar.csv"
+        }
+    )
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.services.auth_service import AuthService
 from app.services.dealer_service import DealerService
 from app.schemas.dealer import DealerResponse, DealerSearchResponse
@@ -14,34 +14,37 @@ async def search_dealers(
     territory: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
     depot_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    limit: int = Query(DealerService.DEFAULT_SEARCH_LIMIT, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
-    """Bayileri ara (depot filtresi ile)"""
-    dealer_service = DealerService(db)
-    
+    """Bayileri ara (depot filtresi ile, sıralı ve sınırlı sonuç)"""
     # Depot filtresi: Kullanıcının depot_id'si varsa ve parametre yoksa onu kullan
     if not depot_id and current_user.get("depot_id"):
         depot_id = current_user["depot_id"]
     
-    return dealer_service.search_dealers(territory=territory, search_term=search, depot_id=depot_id)
+    return await db.run_sync(
+        lambda sync_db: DealerService(sync_db).search_dealers(
+            territory=territory, search_term=search, depot_id=depot_id, limit=limit
+        )
+    )
 
 
 @router.get("/{code}", response_model=DealerResponse)
 async def get_dealer_by_code(
     code: str,
     depot_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
     """Bayi bilgilerini getir (depot filtresi ile)"""
-    dealer_service = DealerService(db)
-    
     # Depot filtresi: Kullanıcının depot_id'si varsa ve parametre yoksa onu kullan
     if not depot_id and current_user.get("depot_id"):
         depot_id = current_user["depot_id"]
     
-    dealer = dealer_service.get_dealer_by_code(code, depot_id=depot_id)
+    dealer = await db.run_sync(
+        lambda sync_db: DealerService(sync_db).get_dealer_by_code(code, depot_id=depot_id)
+    )
     
     if not dealer:
         raise HTTPException(
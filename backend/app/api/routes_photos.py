@@ -5,7 +5,7 @@ from typing import List
 from app.db.session import get_db
 from app.services.auth_service import AuthService
 from app.services.photo_service import PhotoService
-from app.services.request_service import RequestService
+from app.services.authorization_service import AuthorizationService
 import os
 
 router = APIRouter()
@@ -29,34 +29,12 @@ async def upload_photos(
             detail="Talep bulunamadı"
         )
     
-    # Yetki kontrolü
-    if current_user["role"] == "admin":
-        # Admin her talebe fotoğraf ekleyebilir
-        pass
-    elif current_user["role"] == "tech":
-        # Tech kullanıcılar: Kendi depolarındaki taleplere fotoğraf ekleyebilir
-        user_depot_ids = current_user.get("depot_ids", [])
-        if not user_depot_ids and current_user.get("depot_id"):
-            user_depot_ids = [current_user["depot_id"]]
-        
-        if request.depot_id and request.depot_id not in user_depot_ids:
-            # Kendi talebi değilse ve kendi deposunda değilse erişim yok
-            request_service = RequestService(db)
-            user_requests = request_service.get_user_requests(current_user["email"])
-            if request_id not in [r.id for r in user_requests]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Bu talebe fotoğraf ekleme yetkiniz yok"
-                )
-    else:
-        # Normal kullanıcılar: Sadece kendi taleplerine fotoğraf ekleyebilir
-        request_service = RequestService(db)
-        user_requests = request_service.get_user_requests(current_user["email"])
-        if request_id not in [r.id for r in user_requests]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Bu talebe fotoğraf ekleme yetkiniz yok"
-            )
+    # Yetki kontrolü: admin her talebe, tech kendi depolarındaki taleplere, diğerleri kendi taleplerine
+    if not AuthorizationService(db).can_access(current_user, request):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu talebe fotoğraf ekleme yetkiniz yok"
+        )
     
     photo_service = PhotoService(db)
     
@@ -90,34 +68,12 @@ async def get_request_photos(
             detail="Talep bulunamadı"
         )
     
-    # Yetki kontrolü
-    if current_user["role"] == "admin":
-        # Admin her talebin fotoğraflarını görebilir
-        pass
-    elif current_user["role"] == "tech":
-        # Tech kullanıcılar: Kendi depolarındaki taleplerin fotoğraflarını görebilir
-        user_depot_ids = current_user.get("depot_ids", [])
-        if not user_depot_ids and current_user.get("depot_id"):
-            user_depot_ids = [current_user["depot_id"]]
-        
-        if request.depot_id and request.depot_id not in user_depot_ids:
-            # Kendi talebi değilse ve kendi deposunda değilse erişim yok
-            request_service = RequestService(db)
-            user_requests = request_service.get_user_requests(current_user["email"])
-            if request_id not in [r.id for r in user_requests]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Bu talebin fotoğraflarına erişim yetkiniz yok"
-                )
-    else:
-        # Normal kullanıcılar: Sadece kendi taleplerinin fotoğraflarını görebilir
-        request_service = RequestService(db)
-        user_requests = request_service.get_user_requests(current_user["email"])
-        if request_id not in [r.id for r in user_requests]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Bu talebin fotoğraflarına erişim yetkiniz yok"
-            )
+    # Yetki kontrolü: admin her talebin, tech kendi depolarındaki taleplerin, diğerleri kendi taleplerinin fotoğraflarını görür
+    if not AuthorizationService(db).can_access(current_user, request):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu talebin fotoğraflarına erişim yetkiniz yok"
+        )
     
     photo_service = PhotoService(db)
     photos = photo_service.get_request_photos(request_id)
@@ -153,32 +109,12 @@ async def get_photo_file(
             detail="Fotoğraf bulunamadı"
         )
     
-    # Yetki kontrolü: Kullanıcı sadece kendi taleplerinin fotoğraflarını görebilir (admin/tech hariç)
-    if current_user["role"] not in ["admin", "tech"]:
-        request_service = RequestService(db)
-        user_requests = request_service.get_user_requests(current_user["email"])
-        if photo.request_id not in [r.id for r in user_requests]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Bu fotoğrafa erişim yetkiniz yok"
-            )
-    elif current_user["role"] == "tech":
-        # Tech kullanıcılar: Kendi depolarındaki taleplerin fotoğraflarını görebilir
-        from app.models.request import Request
-        request = db.query(Request).filter(Request.id == photo.request_id).first()
-        if request:
-            user_depot_ids = current_user.get("depot_ids", [])
-            if not user_depot_ids and current_user.get("depot_id"):
-                user_depot_ids = [current_user["depot_id"]]
-            
-            if request.depot_id and request.depot_id not in user_depot_ids:
-                # Kendi talebi değilse ve kendi deposunda değilse erişim yok
-                user_requests = request_service.get_user_requests(current_user["email"])
-                if photo.request_id not in [r.id for r in user_requests]:
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail="Bu fotoğrafa erişim yetkiniz yok"
-                    )
+    # Yetki kontrolü: fotoğrafın talebine erişim (tek EXISTS sorgusu; admin için sorgu yok)
+    if not AuthorizationService(db).can_access_request(current_user, photo.request_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu fotoğrafa erişim yetkiniz yok"
+        )
     
     file_path = os.path.join(settings.UPLOAD_DIR, filename)
     
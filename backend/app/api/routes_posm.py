@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
-from app.db.session import get_db
+from app.core.reference_cache import POSM, serve_cached
+from app.db.session import get_db, get_async_db
 from app.services.auth_service import AuthService
 from app.services.posm_service import PosmService
+from app.services.posm_stock_service import PosmStockService
 from app.schemas.posm import (
     PosmResponse, PosmCreateRequest, PosmUpdateRequest, 
     PosmStockResponse, PosmTransferRequest, PosmTransferResponse
 )
-from app.models.depot import Depot
 from app.models.posm import Posm
 
 router = APIRouter()
@@ -16,80 +18,68 @@ router = APIRouter()
 
 @router.post("/sync-all-depots")
 async def sync_posm_to_all_depots(
+    dry_run: bool = False,
     db: Session = Depends(get_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
-    """Tüm mevcut POSM'leri tüm depolar için oluştur (stok 0 ile) - Admin only"""
+    """
+    Tüm mevcut POSM'leri tüm depolar için oluştur (stok 0 ile) - Admin only.
+    dry_run=true ile hiçbir şey yazılmadan depo bazında eklenecek POSM'ler döndürülür.
+    """
     if current_user["role"] != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Bu işlem için admin yetkisi gereklidir"
         )
     
-    # Tüm depoları getir
-    depots = db.query(Depot).all()
-    if not depots:
+    result = PosmService(db).sync_catalog_to_depots(dry_run=dry_run)
+    
+    if not result["total_depots"]:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Hiç depo bulunamadı"
         )
-    
-    # Tüm mevcut POSM isimlerini getir (benzersiz)
-    existing_posms = db.query(Posm.name).distinct().all()
-    unique_posm_names = [p[0] for p in existing_posms]
-    
-    if not unique_posm_names:
+    if not result["total_posms"]:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Hiç POSM bulunamadı"
         )
     
-    created_count = 0
-    skipped_count = 0
-    
-    # Her POSM için her depoyu kontrol et
-    for posm_name in unique_posm_names:
-        for depot in depots:
-            # Bu depoda bu POSM var mı kontrol et
-            existing = db.query(Posm).filter(
-                Posm.name == posm_name,
-                Posm.depot_id == depot.id
-            ).first()
-            
-            if not existing:
-                # Yeni POSM oluştur (stok 0 ile)
-                new_posm = Posm(
-                    name=posm_name,
-                    depot_id=depot.id,
-                    ready_count=0,
-                    repair_pending_count=0
-                )
-                db.add(new_posm)
-                created_count += 1
-            else:
-                skipped_count += 1
-    
-    db.commit()
-    
     return {
         "success": True,
-        "message": f"POSM senkronizasyonu tamamlandı",
-        "created": created_count,
-        "skipped": skipped_count,
-        "total_posms": len(unique_posm_names),
-        "total_depots": len(depots)
+        "message": "POSM senkronizasyonu önizlemesi" if dry_run else "POSM senkronizasyonu tamamlandı",
+        **result
     }
 
 
+@router.post("/stock/reconcile")
+async def reconcile_posm_stock(
+    fix: bool = False,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(AuthService.get_current_user)
+):
+    """
+    POSM stok sayaçlarını stok hareket defteriyle karşılaştır - Admin only.
+    fix=true ile sapan sayaçlar defter toplamından yeniden hesaplanır.
+    """
+    if current_user["role"] != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu işlem için admin yetkisi gereklidir"
+        )
+    
+    return PosmStockService(db).reconcile(fix=fix)
+
+
 @router.get("/", response_model=list[PosmResponse])
 async def get_posm_list(
+    request: Request,
+    response: Response,
     depot_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
-    """POSM listesini getir (depot filtresi ile)"""
-    posm_service = PosmService(db)
-    
+    """POSM listesini getir (depot filtresi ile, önbellekten; ETag ile 304 desteklenir)"""
     # Depot filtresi: Kullanıcının depot_ids'leri varsa onları kullan
     user_depot_ids = current_user.get("depot_ids", [])
     if not user_depot_ids and current_user.get("depot_id"):
@@ -99,45 +89,74 @@ async def get_posm_list(
     # Eğer parametre olarak depot_id verilmişse, sadece o depoyu kullan
     if depot_id:
         # Admin ise tüm depoları görebilir, diğerleri sadece kendi depolarını
-        if current_user["role"] == "admin" or depot_id in user_depot_ids:
-            return posm_service.get_all_posm(depot_id=depot_id)
-        else:
+        if current_user["role"] != "admin" and depot_id not in user_depot_ids:
             # Kullanıcı kendi deposu dışında bir depo seçemez
             return []
+        scope = depot_id
+    elif current_user["role"] == "admin" or not user_depot_ids:
+        # Admin ise tüm POSM'leri göster; depot bilgisi yoksa da tümü (backward compatibility)
+        scope = "all"
+    else:
+        scope = tuple(sorted(user_depot_ids))
     
-    # Admin ise tüm POSM'leri göster, diğerleri sadece kendi depolarındakileri
-    if current_user["role"] == "admin":
-        return posm_service.get_all_posm(depot_id=None)
-    elif user_depot_ids:
+    def load(sync_db: Session):
+        posm_service = PosmService(sync_db)
+        
+        if depot_id:
+            return posm_service.get_catalog(depot_id=depot_id)
+        if scope == "all":
+            return posm_service.get_catalog(depot_id=None)
+        
         # Kullanıcının tüm depolarındaki POSM'leri getir
         all_posms = []
         for dep_id in user_depot_ids:
-            posms = posm_service.get_all_posm(depot_id=dep_id)
-            all_posms.extend(posms)
+            all_posms.extend(posm_service.get_catalog(depot_id=dep_id))
         # Duplicate'leri kaldır (aynı POSM birden fazla depoda olabilir)
         seen = set()
         unique_posms = []
         for posm in all_posms:
-            if posm.id not in seen:
-                seen.add(posm.id)
+            if posm[0] not in seen:
+                seen.add(posm[0])
                 unique_posms.append(posm)
         return unique_posms
-    else:
-        # Depot bilgisi yoksa tüm POSM'leri göster (backward compatibility)
-        return posm_service.get_all_posm(depot_id=None)
+    
+    def with_counts(sync_db: Session, catalog):
+        # Stok sayaçları önbelleğe alınmaz: katalog bellekten, adetler tek sorguyla canlı okunur
+        if scope == "all":
+            count_depot_ids = None
+        else:
+            count_depot_ids = [depot_id] if depot_id else user_depot_ids
+        counts = PosmService(sync_db).get_stock_counts(depot_ids=count_depot_ids)
+        posms = [
+            PosmResponse(
+                id=posm_id,
+                name=name,
+                depot_id=posm_depot_id,
+                ready_count=counts[posm_id][0],
+                repair_pending_count=counts[posm_id][1]
+            )
+            for posm_id, name, posm_depot_id in catalog
+            if posm_id in counts
+        ]
+        return posms, sorted(counts.items())
+    
+    return await db.run_sync(
+        lambda sync_db: serve_cached(
+            request, response, sync_db, POSM, scope,
+            lambda: load(sync_db),
+            live=lambda catalog: with_counts(sync_db, catalog)
+        )
+    )
 
 
 @router.get("/{posm_id}", response_model=PosmResponse)
 async def get_posm_details(
     posm_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
     """POSM detaylarını getir"""
-    from app.models.posm import Posm
-    
-    posm_service = PosmService(db)
-    posm = posm_service.get_posm_by_id(posm_id)
+    posm = await db.run_sync(lambda sync_db: PosmService(sync_db).get_posm_by_id(posm_id))
     
     if not posm:
         raise HTTPException(
@@ -152,8 +171,7 @@ async def get_posm_details(
             user_depot_ids = [current_user["depot_id"]]
         
         # POSM'in depot_id'sini kontrol et
-        posm_obj = db.query(Posm).filter(Posm.id == posm_id).first()
-        if posm_obj and posm_obj.depot_id and posm_obj.depot_id not in user_depot_ids:
+        if posm.depot_id and posm.depot_id not in user_depot_ids:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Bu POSM'e erişim yetkiniz yok"
@@ -165,14 +183,15 @@ async def get_posm_details(
 @router.get("/{posm_id}/stock", response_model=PosmStockResponse)
 async def get_posm_stock(
     posm_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
     """POSM stok bilgisini getir"""
-    from app.models.posm import Posm
-    
-    posm_service = PosmService(db)
-    stock = posm_service.get_posm_stock(posm_id)
+    posm = await db.run_sync(lambda sync_db: PosmService(sync_db).get_posm_by_id(posm_id))
+    stock = PosmStockResponse(
+        hazirAdet=posm.ready_count,
+        tamirBekleyen=posm.repair_pending_count
+    ) if posm else None
     
     if not stock:
         raise HTTPException(
@@ -187,8 +206,7 @@ async def get_posm_stock(
             user_depot_ids = [current_user["depot_id"]]
         
         # POSM'in depot_id'sini kontrol et
-        posm_obj = db.query(Posm).filter(Posm.id == posm_id).first()
-        if posm_obj and posm_obj.depot_id and posm_obj.depot_id not in user_depot_ids:
+        if posm.depot_id and posm.depot_id not in user_depot_ids:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Bu POSM'in stok bilgisine erişim yetkiniz yok"
@@ -197,6 +215,47 @@ async def get_posm_stock(
     return stock
 
 
+@router.get("/{posm_id}/movements")
+async def get_posm_stock_movements(
+    posm_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(AuthService.get_current_user)
+):
+    """POSM stok hareketlerini getir (en yeni önce)"""
+    def load(sync_db: Session):
+        posm = PosmService(sync_db).get_posm_by_id(posm_id)
+        movements = PosmStockService(sync_db).get_movements(posm_id, limit=limit) if posm else []
+        return posm, movements
+    
+    posm, movements = await db.run_sync(load)
+    
+    if not posm:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="POSM bulunamadı"
+        )
+    
+    # Depot bazlı yetki kontrolü (admin hariç)
+    if current_user["role"] != "admin":
+        user_depot_ids = current_user.get("depot_ids", [])
+        if not user_depot_ids and current_user.get("depot_id"):
+            user_depot_ids = [current_user["depot_id"]]
+        
+        if posm.depot_id and posm.depot_id not in user_depot_ids:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Bu POSM'in stok bilgisine erişim yetkiniz yok"
+            )
+    
+    return {
+        "posm_id": posm.id,
+        "ready_count": posm.ready_count,
+        "repair_pending_count": posm.repair_pending_count,
+        "movements": movements
+    }
+
+
 @router.patch("/{posm_id}", response_model=PosmResponse)
 async def update_posm(
     posm_id: int,
@@ -229,7 +288,13 @@ async def update_posm(
     }
     
     posm_service = PosmService(db)
-    posm = posm_service.update_posm(posm_id, update_data)
+    try:
+        posm = posm_service.update_posm(posm_id, update_data, updated_by=current_user["id"])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     if not posm:
         raise HTTPException(
@@ -288,7 +353,7 @@ async def create_posm(
     
     posm_service = PosmService(db)
     try:
-        posm = posm_service.create_posm(posm_data)
+        posm = posm_service.create_posm(posm_data, created_by=current_user["id"])
         
         # Audit log oluştur
         try:
@@ -425,7 +490,7 @@ async def transfer_posm(
 @router.get("/transfers", response_model=List[PosmTransferResponse])
 async def get_transfers(
     depot_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
     """Transfer geçmişini getir (admin/tech)"""
@@ -444,6 +509,4 @@ async def get_transfers(
         # Burada filtreleme yapılabilir ama şimdilik tüm transferleri gösteriyoruz
         pass
     
-    posm_service = PosmService(db)
-    transfers = posm_service.get_transfers(depot_id=depot_id)
-    return transfers
+    return await db.run_sync(lambda sync_db: PosmService(sync_db).get_transfers(depot_id=depot_id))
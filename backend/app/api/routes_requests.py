@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi import Request as FastAPIRequest
-from app.db.session import SessionLocal, get_db
+from app.db.session import get_db, get_async_db
 from app.models.request import Request, RequestStatus
 from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List
+from datetime import date
 from app.db.session import get_db
 from app.services.auth_service import AuthService
+from app.services.authorization_service import AuthorizationService
 from app.services.request_service import RequestService
 from app.schemas.request import (
     RequestCreate, RequestResponse, RequestDetailResponse,
-    RequestUpdate, RequestStatsResponse
+    RequestUpdate, RequestStatsResponse, RequestListFilter, RequestPageResponse
 )
 
 router = APIRouter()
@@ -19,12 +22,10 @@ router = APIRouter()
 async def get_requests(
     mine: bool = Query(False),
     depot_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
     """Talepleri getir (kullanıcının kendi talepleri veya tüm talepler, depot filtresi ile)"""
-    request_service = RequestService(db)
-    
     # Depot filtresi: Kullanıcının depot_id'si varsa ve parametre yoksa onu kullan
     user_depot_ids = current_user.get("depot_ids", [])
     if not user_depot_ids and current_user.get("depot_id"):
@@ -37,10 +38,12 @@ async def get_requests(
         # Kullanıcının kendi talepleri
         # Tech kullanıcılar için kendi depolarındaki talepleri de dahil et
         include_depot = current_user["role"] in ["tech", "admin"]
-        return request_service.get_user_requests(
-            current_user["email"], 
-            depot_id=depot_id,
-            include_depot_requests=include_depot
+        return await db.run_sync(
+            lambda sync_db: RequestService(sync_db).get_user_requests(
+                current_user["email"],
+                depot_id=depot_id,
+                include_depot_requests=include_depot
+            )
         )
     else:
         # Tüm talepler (sadece admin)
@@ -49,19 +52,76 @@ async def get_requests(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Bu işlem için admin yetkisi gereklidir"
             )
-        return request_service.get_all_requests(depot_id=depot_id)
+        return await db.run_sync(
+            lambda sync_db: RequestService(sync_db).get_all_requests(depot_id=depot_id)
+        )
+
+
+@router.get("/page", response_model=RequestPageResponse)
+async def get_requests_page(
+    mine: bool = Query(False),
+    depot_id: Optional[int] = Query(None),
+    status_filter: Optional[List[str]] = Query(None, alias="status"),
+    job_type: Optional[List[str]] = Query(None),
+    priority: Optional[List[str]] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(AuthService.get_current_user)
+):
+    """Talepleri sayfalı getir (keyset cursor, sunucu taraflı filtreler ile)"""
+    # Depot filtresi: GET / ile aynı varsayılan davranış
+    user_depot_ids = current_user.get("depot_ids", [])
+    if not user_depot_ids and current_user.get("depot_id"):
+        user_depot_ids = [current_user["depot_id"]]
+    
+    if not depot_id and user_depot_ids:
+        depot_id = user_depot_ids[0]  # İlk depo varsayılan olarak
+    
+    if not mine and current_user["role"] != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu işlem için admin yetkisi gereklidir"
+        )
+    
+    filters = RequestListFilter(
+        depot_id=depot_id,
+        status=status_filter,
+        job_type=job_type,
+        priority=priority,
+        start_date=start_date,
+        end_date=end_date
+    )
+    
+    try:
+        return await db.run_sync(
+            lambda sync_db: RequestService(sync_db).get_requests_page(
+                filters,
+                user_email=current_user["email"] if mine else None,
+                include_depot_requests=current_user["role"] in ["tech", "admin"],
+                limit=limit,
+                cursor=cursor,
+                include_total=include_total
+            )
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 
 @router.get("/stats", response_model=RequestStatsResponse)
 async def get_request_stats(
     depot_id: Optional[int] = Query(None),
     user_email: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
     """Talep istatistiklerini getir (depot filtresi ile) - Tüm kullanıcılar için"""
-    request_service = RequestService(db)
-    
     # Eğer user_email parametresi verilmişse onu kullan, yoksa:
     # Admin ise tüm istatistikler, diğerleri sadece kendi istatistikleri
     if user_email is None:
@@ -90,63 +150,47 @@ async def get_request_stats(
     if not depot_id and user_depot_ids and current_user["role"] != "admin":
         depot_id = user_depot_ids[0]  # İlk depo varsayılan olarak
     
-    return request_service.get_request_stats(user_email=user_email, depot_id=depot_id)
+    return await db.run_sync(
+        lambda sync_db: RequestService(sync_db).get_request_stats(user_email=user_email, depot_id=depot_id)
+    )
 
 
 @router.get("/{request_id}", response_model=RequestDetailResponse)
 async def get_request_details(
     request_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
     """Talep detaylarını getir"""
-    request_service = RequestService(db)
-    
-    # Önce talebi getir
-    request = db.query(Request).filter(Request.id == request_id).first()
-    if not request:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Talep bulunamadı"
-        )
-    
-    # Yetki kontrolü: Admin tüm talepleri görebilir
-    # Tech kullanıcılar kendi depolarındaki talepleri görebilir
-    # Normal kullanıcılar sadece kendi taleplerini görebilir
-    if current_user["role"] != "admin":
-        if current_user["role"] == "tech":
-            # Tech kullanıcılar: Kendi depolarındaki talepleri görebilir
-            user_depot_ids = current_user.get("depot_ids", [])
-            if not user_depot_ids and current_user.get("depot_id"):
-                user_depot_ids = [current_user["depot_id"]]
-            
-            # Talep kendi depolarından birinde mi kontrol et
-            if request.depot_id and request.depot_id not in user_depot_ids:
-                # Kendi talebi değilse erişim yok
-                user_requests = request_service.get_user_requests(current_user["email"])
-                if request_id not in [r.id for r in user_requests]:
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail="Bu talebe erişim yetkiniz yok"
-                    )
-        else:
-            # Normal kullanıcılar: Sadece kendi taleplerini görebilir
-            user_requests = request_service.get_user_requests(current_user["email"])
-            if request_id not in [r.id for r in user_requests]:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Bu talebe erişim yetkiniz yok"
-                )
+    def load(sync_db: Session):
+        request_service = RequestService(sync_db)
+        
+        # Önce talebi getir
+        request = sync_db.query(Request).filter(Request.id == request_id).first()
+        if not request:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Talep bulunamadı"
+            )
+        
+        # Yetki kontrolü: Admin tüm talepleri görebilir
+        # Tech kullanıcılar kendi depolarındaki talepleri görebilir
+        # Normal kullanıcılar sadece kendi taleplerini görebilir
+        if not AuthorizationService(sync_db).can_access(current_user, request):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Bu talebe erişim yetkiniz yok"
+            )
+        
+        # Detayları getir
+        return request_service.get_request_by_id(request_id)
     
-    # Detayları getir
-    request_detail = request_service.get_request_by_id(request_id)
-    return request_detail
+    return await db.run_sync(load)
 
 
 @router.post("/", response_model=dict)
 async def create_request(
     request_data: RequestCreate,
-    background_tasks: BackgroundTasks,
     request: FastAPIRequest,
     db: Session = Depends(get_db),
     current_user: dict = Depends(AuthService.get_current_user)
@@ -217,66 +261,67 @@ async def create_request(
         except Exception as e:
             print(f"⚠️ Audit log oluşturma hatası: {e}")
         
-        # Talep oluşturulduğunda bildirim gönder (background task)
-        def send_notifications():
-            try:
+        # Talep oluşturulduğunda bildirim gönder (notification dispatcher)
+        from app.services.notification_dispatcher import notification_dispatcher
+        
+        new_request_id = new_request.id
+        new_request_depot_id = new_request.depot_id
+        creator_id = current_user["id"]
+        
+        async def notify_creator(bg_db: Session):
+            from app.services.notification_service import NotificationService
+            from app.models.user import User
+            
+            # Request'i kendi session'ında yeniden yükle (detached instance için)
+            request = bg_db.query(Request).filter(Request.id == new_request_id).first()
+            request_user = bg_db.query(User).filter(User.id == creator_id).first()
+            if request and request_user and request_user.email:
+                await NotificationService(bg_db).notify_request_created(request, request_user)
+        
+        def make_tech_job(tech_user_id: int):
+            async def notify_tech(bg_db: Session):
                 from app.services.notification_service import NotificationService
                 from app.models.user import User
-                import asyncio
                 
-                bg_db = SessionLocal()
-                try:
-                    notification_service = NotificationService(bg_db)
-                    
-                    # Request'i yeniden yükle (detached instance için)
-                    request = bg_db.query(Request).filter(Request.id == new_request.id).first()
-                    if not request:
-                        return
-                    
-                    # Talep oluşturana bildirim gönder
-                    request_user = bg_db.query(User).filter(User.id == current_user["id"]).first()
-                    if request_user and request_user.email:
-                        try:
-                            asyncio.run(notification_service.notify_request_created(
-                                request,
-                                request_user
-                            ))
-                        except Exception as e:
-                            print(f"⚠️ Talep oluşturana bildirim hatası: {e}")
-                    
-                    # Aynı depodaki teknik sorumlulara bildirim gönder (many-to-many)
-                    if request.depot_id:
-                        from app.models.user import user_depots
-                        tech_users = bg_db.query(User).join(user_depots).filter(
-                            user_depots.c.depot_id == request.depot_id,
-                            User.role.in_(["tech", "admin"])
-                        ).all()
-                        
-                        # Backward compatibility: depot_id ile de kontrol et
-                        if not tech_users:
-                            tech_users = bg_db.query(User).filter(
-                                User.depot_id == request.depot_id,
-                                User.role.in_(["tech", "admin"])
-                            ).all()
-                        
-                        for tech_user in tech_users:
-                            if tech_user.id != current_user["id"] and tech_user.email:
-                                try:
-                                    asyncio.run(notification_service.notify_new_request_to_tech(
-                                        request,
-                                        tech_user,
-                                        request_user
-                                    ))
-                                except Exception as e:
-                                    print(f"⚠️ Teknik sorumluya bildirim hatası (user {tech_user.id}): {e}")
-                finally:
-                    bg_db.close()
-            except Exception as e:
-                print(f"⚠️ Bildirim gönderme hatası: {e}")
-                import traceback
-                traceback.print_exc()
+                request = bg_db.query(Request).filter(Request.id == new_request_id).first()
+                tech_user = bg_db.query(User).filter(User.id == tech_user_id).first()
+                request_user = bg_db.query(User).filter(User.id == creator_id).first()
+                if request and tech_user:
+                    await NotificationService(bg_db).notify_new_request_to_tech(request, tech_user, request_user)
+            return notify_tech
+        
+        async def fan_out_to_techs(bg_db: Session):
+            from app.models.user import User, user_depots
+            
+            depot_id = new_request_depot_id
+            if not depot_id:
+                return
+            
+            # Aynı depodaki teknik sorumlular (many-to-many)
+            tech_user_ids = [row.id for row in bg_db.query(User.id).join(user_depots).filter(
+                user_depots.c.depot_id == depot_id,
+                User.role.in_(["tech", "admin"]),
+                User.email.isnot(None)
+            ).all()]
+            
+            # Backward compatibility: depot_id ile de kontrol et
+            if not tech_user_ids:
+                tech_user_ids = [row.id for row in bg_db.query(User.id).filter(
+                    User.depot_id == depot_id,
+                    User.role.in_(["tech", "admin"]),
+                    User.email.isnot(None)
+                ).all()]
+            
+            # Her teknik sorumlu ayrı bir iş olarak paralel bildirilir
+            for tech_user_id in tech_user_ids:
+                if tech_user_id != creator_id:
+                    notification_dispatcher.submit(
+                        make_tech_job(tech_user_id),
+                        label=f"Teknik sorumluya bildirim (user {tech_user_id})"
+                    )
         
-        background_tasks.add_task(send_notifications)
+        notification_dispatcher.submit(notify_creator, label="Talep oluşturana bildirim")
+        notification_dispatcher.submit(fan_out_to_techs, label="Teknik sorumlu bildirimleri")
         
         return {
             "success": True,
@@ -293,7 +338,6 @@ async def create_request(
 async def update_request(
     request_id: int,
     update_data: RequestUpdate,
-    background_tasks: BackgroundTasks,
     request: FastAPIRequest,
     db: Session = Depends(get_db),
     current_user: dict = Depends(AuthService.get_current_user)
@@ -394,72 +438,57 @@ async def update_request(
     except Exception as e:
         print(f"⚠️ Audit log oluşturma hatası: {e}")
     
-    # Bildirim gönder (background task)
-    def send_update_notifications():
-        try:
-            from app.services.notification_service import NotificationService
-            from app.models.user import User
-            import asyncio
-            
-            bg_db = SessionLocal()
-            try:
-                notification_service = NotificationService(bg_db)
-                
-                # Request'i yeniden yükle
-                request = bg_db.query(Request).filter(Request.id == request_id).first()
-                if not request:
-                    return
-                
-                updated_by_user = bg_db.query(User).filter(User.id == current_user["id"]).first()
-                if not updated_by_user:
-                    return
-                
-                changes = {}
-                if update_data.status and update_data.status != old_status:
-                    changes["status"] = update_data.status
-                if update_data.planned_date and update_data.planned_date != old_planned_date:
-                    changes["planned_date"] = update_data.planned_date.strftime("%d.%m.%Y")
-                if update_data.job_done_desc:
-                    changes["job_done_desc"] = True
-                
-                # Durum değişiklikleri için özel bildirimler
-                if update_data.status == RequestStatus.TAKVIME_EKLENDI.value and old_status == RequestStatus.BEKLEMEDE.value:
-                    if updated_by_user and request.planned_date:
-                        try:
-                            asyncio.run(notification_service.notify_request_planned(
-                                request,
-                                request.planned_date.strftime("%d.%m.%Y"),
-                                updated_by_user
-                            ))
-                        except Exception as e:
-                            print(f"⚠️ Planlama bildirimi hatası: {e}")
-                elif update_data.status == RequestStatus.TAMAMLANDI.value and old_status != RequestStatus.TAMAMLANDI.value:
-                    if updated_by_user and request.completed_date:
-                        try:
-                            asyncio.run(notification_service.notify_request_completed(
-                                request,
-                                request.completed_date.strftime("%d.%m.%Y"),
-                                updated_by_user
-                            ))
-                        except Exception as e:
-                            print(f"⚠️ Tamamlanma bildirimi hatası: {e}")
-                elif changes:
-                    # Diğer güncellemeler için genel bildirim
-                    try:
-                        asyncio.run(notification_service.notify_request_updated(
-                            request,
-                            updated_by_user,
-                            changes
-                        ))
-                    except Exception as e:
-                        print(f"⚠️ Güncelleme bildirimi hatası: {e}")
-            finally:
-                bg_db.close()
-        except Exception as e:
-            print(f"⚠️ Bildirim gönderme hatası: {e}")
-            import traceback
-            traceback.print_exc()
+    # Bildirim gönder (notification dispatcher)
+    from app.services.notification_dispatcher import notification_dispatcher
+    
+    updated_by_id = current_user["id"]
+    
+    async def send_update_notifications(bg_db: Session):
+        from app.services.notification_service import NotificationService
+        from app.models.user import User
+        
+        notification_service = NotificationService(bg_db)
+        
+        # Request'i yeniden yükle
+        request = bg_db.query(Request).filter(Request.id == request_id).first()
+        if not request:
+            return
+        
+        updated_by_user = bg_db.query(User).filter(User.id == updated_by_id).first()
+        if not updated_by_user:
+            return
+        
+        changes = {}
+        if update_data.status and update_data.status != old_status:
+            changes["status"] = update_data.status
+        if update_data.planned_date and update_data.planned_date != old_planned_date:
+            changes["planned_date"] = update_data.planned_date.strftime("%d.%m.%Y")
+        if update_data.job_done_desc:
+            changes["job_done_desc"] = True
+        
+        # Durum değişiklikleri için özel bildirimler
+        if update_data.status == RequestStatus.TAKVIME_EKLENDI.value and old_status == RequestStatus.BEKLEMEDE.value:
+            if request.planned_date:
+                await notification_service.notify_request_planned(
+                    request,
+                    request.planned_date.strftime("%d.%m.%Y"),
+                    updated_by_user
+                )
+        elif update_data.status == RequestStatus.TAMAMLANDI.value and old_status != RequestStatus.TAMAMLANDI.value:
+            if request.completed_date:
+                await notification_service.notify_request_completed(
+                    request,
+                    request.completed_date.strftime("%d.%m.%Y"),
+                    updated_by_user
+                )
+        elif changes:
+            # Diğer güncellemeler için genel bildirim
+            await notification_service.notify_request_updated(
+                request,
+                updated_by_user,
+                changes
+            )
     
-    background_tasks.add_task(send_update_notifications)
+    notification_dispatcher.submit(send_update_notifications, label=f"Talep {request_id} güncelleme bildirimi")
     
     return request_service._to_response(updated_request)
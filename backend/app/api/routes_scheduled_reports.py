@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.services.auth_service import AuthService
 from app.services.scheduled_report_service import ScheduledReportService
-from app.schemas.scheduled_report import ScheduledReportCreate, ScheduledReportUpdate, ScheduledReportResponse
-from typing import List
+from app.services.report_delivery_service import ReportDeliveryService
+from app.schemas.scheduled_report import (
+    ScheduledReportCreate, ScheduledReportUpdate, ScheduledReportResponse,
+    ReportRunResponse, ReportRunDetailResponse
+)
+from typing import List, Optional
 
 router = APIRouter()
 
@@ -78,6 +82,34 @@ async def get_scheduled_reports(
     return reports
 
 
+@router.get("/runs", response_model=List[ReportRunResponse])
+async def get_report_runs(
+    report_id: Optional[int] = Query(None),
+    report_key: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """Son rapor çalışmaları (alıcı sayıları ve çalışma süreleri)"""
+    return ReportDeliveryService(db).get_runs(scheduled_report_id=report_id, report_key=report_key, limit=limit)
+
+
+@router.get("/runs/{run_id}", response_model=ReportRunDetailResponse)
+async def get_report_run(
+    run_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """Rapor çalışmasının alıcı bazında gönderim kayıtları"""
+    run = ReportDeliveryService(db).get_run(run_id)
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Rapor çalışması bulunamadı"
+        )
+    return run
+
+
 @router.get("/{report_id}", response_model=ScheduledReportResponse)
 async def get_scheduled_report(
     report_id: int,
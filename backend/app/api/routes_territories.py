@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import Optional
+from app.core.reference_cache import TERRITORIES, serve_cached
 from app.db.session import get_db
 from app.services.auth_service import AuthService
 from app.services.territory_service import TerritoryService
@@ -11,11 +12,13 @@ router = APIRouter()
 
 @router.get("/", response_model=list[TerritoryResponse])
 async def get_territories(
+    request: Request,
+    response: Response,
     depot_id: Optional[int] = Query(None),
     db: Session = Depends(get_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
-    """Tüm territory'leri getir (depot filtresi ile)"""
+    """Tüm territory'leri getir (depot filtresi ile, önbellekten; ETag ile 304 desteklenir)"""
     territory_service = TerritoryService(db)
     
     # Depot filtresi: Kullanıcının depot_id'si varsa ve parametre yoksa onu kullan
@@ -26,22 +29,27 @@ async def get_territories(
     # Eğer parametre olarak depot_id verilmişse, sadece o depoyu kullan
     if depot_id:
         # Admin ise tüm depoları görebilir, diğerleri sadece kendi depolarını
-        if current_user["role"] == "admin" or depot_id in user_depot_ids:
-            return territory_service.get_all_territories(depot_id=depot_id)
-        else:
+        if current_user["role"] != "admin" and depot_id not in user_depot_ids:
             # Kullanıcı kendi deposu dışında bir depo seçemez
             return []
-    
-    # Admin ise tüm territory'leri göster, diğerleri sadece kendi depolarındakileri
-    if current_user["role"] == "admin":
-        return territory_service.get_all_territories()
+        scope = depot_id
+        loader = lambda: territory_service.get_all_territories(depot_id=depot_id)
+    elif current_user["role"] == "admin":
+        # Admin ise tüm territory'leri göster
+        scope = "all"
+        loader = lambda: territory_service.get_all_territories()
     else:
         # Kullanıcının depolarındaki territory'leri getir
-        all_territories = []
-        for user_depot_id in user_depot_ids:
-            territories = territory_service.get_all_territories(depot_id=user_depot_id)
-            # Duplicate'leri önlemek için
-            for t in territories:
-                if t not in all_territories:
-                    all_territories.append(t)
-        return all_territories
+        scope = tuple(sorted(user_depot_ids))
+        
+        def loader():
+            all_territories = []
+            for user_depot_id in user_depot_ids:
+                territories = territory_service.get_all_territories(depot_id=user_depot_id)
+                # Duplicate'leri önlemek için
+                for t in territories:
+                    if t not in all_territories:
+                        all_territories.append(t)
+            return all_territories
+    
+    return serve_cached(request, response, db, TERRITORIES, scope, loader)
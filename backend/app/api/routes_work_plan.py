@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request as FastAPIRequest
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import date
-from app.db.session import get_db, SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db, get_async_db
 from app.services.auth_service import AuthService
 from app.services.request_service import RequestService
-from app.schemas.request import RequestResponse, RequestUpdate
+from app.schemas.request import RequestResponse
 from app.schemas.work_plan import PlanRequestsRequest
-from app.models.request import Request, RequestStatus
+from app.models.request import Request
 
 router = APIRouter()
 
@@ -25,12 +26,10 @@ def require_tech_or_admin(current_user: dict = Depends(AuthService.get_current_u
 @router.get("/pending", response_model=List[RequestResponse])
 async def get_pending_requests(
     depot_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(require_tech_or_admin)
 ):
     """Bekleyen işleri getir (iş planı için)"""
-    request_service = RequestService(db)
-    
     # Depot filtresi: Kullanıcının depot_ids'leri varsa onları kullan
     user_depot_ids = current_user.get("depot_ids", [])
     if not user_depot_ids and current_user.get("depot_id"):
@@ -49,110 +48,82 @@ async def get_pending_requests(
                 detail="Bu depo için yetkiniz yok"
             )
     
-    # Sadece "Beklemede" durumundaki talepleri getir
-    query = db.query(Request).filter(Request.status == RequestStatus.BEKLEMEDE.value)
-    
     # Tech kullanıcılar sadece kendi depolarındaki işleri görebilir
+    depot_ids = None
     if current_user["role"] != "admin" and user_depot_ids:
-        query = query.filter(Request.depot_id.in_(user_depot_ids))
+        depot_ids = user_depot_ids
     elif depot_id:
-        query = query.filter(Request.depot_id == depot_id)
-    
-    requests = query.order_by(Request.requested_date.asc()).all()
+        depot_ids = [depot_id]
     
-    return [request_service._to_response(r, include_user=True) for r in requests]
+    # Sadece "Beklemede" durumundaki talepleri getir
+    return await db.run_sync(
+        lambda sync_db: RequestService(sync_db).get_pending_requests(depot_ids=depot_ids)
+    )
 
 
 @router.post("/plan", response_model=dict)
 async def plan_requests(
+    request: FastAPIRequest,
     plan_data: PlanRequestsRequest = Body(...),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_tech_or_admin)
 ):
-    """İşleri planla (planlanan tarih ekle ve durumu güncelle)"""
-    request_service = RequestService(db)
-    updated_count = 0
-    errors = []
+    """İşleri planla (planlanan tarih ekle ve durumu güncelle) - tek UPDATE, tek commit"""
+    from app.utils.ip_helper import get_client_ip
     
-    request_ids = plan_data.request_ids
-    planned_date = plan_data.planned_date
+    result = RequestService(db).plan_requests(
+        request_ids=plan_data.request_ids,
+        planned_date=plan_data.planned_date,
+        planned_by_id=current_user["id"],
+        ip_address=get_client_ip(request),
+        user_agent=request.headers.get("user-agent", "")
+    )
     
-    for request_id in request_ids:
-        try:
-            request = db.query(Request).filter(Request.id == request_id).first()
-            if not request:
-                errors.append(f"Talep {request_id} bulunamadı")
-                continue
-            
-            # Durum kontrolü - sadece "Beklemede" olanlar planlanabilir
-            if request.status != RequestStatus.BEKLEMEDE.value:
-                errors.append(f"Talep {request_id} zaten planlanmış veya tamamlanmış")
-                continue
-            
-            # Planlanan tarih ve durum güncelle
-            update_data = RequestUpdate(
-                status=RequestStatus.TAKVIME_EKLENDI.value,
-                planned_date=planned_date
-            )
-            
-            updated_request = request_service.update_request(
-                request_id=request_id,
-                update_data=update_data,
-                updated_by_id=current_user["id"]
-            )
-            if updated_request:
-                updated_count += 1
-            
-        except Exception as e:
-            errors.append(f"Talep {request_id}: {str(e)[:100]}")
-            continue
+    # Bildirim gönder (notification dispatcher - talep sahibi başına tek bildirim)
+    from app.services.notification_dispatcher import notification_dispatcher
     
-    db.commit()
+    planned_by_id = current_user["id"]
     
-    # Bildirim gönder (background task)
-    def send_plan_notifications():
-        try:
+    def make_plan_job(owner_id: int, owner_request_ids: List[int]):
+        async def send_plan_notification(bg_db: Session):
+            from sqlalchemy.orm import joinedload
             from app.services.notification_service import NotificationService
             from app.models.user import User
-            import asyncio
             
-            bg_db = SessionLocal()
-            try:
-                notification_service = NotificationService(bg_db)
-                updated_by_user = bg_db.query(User).filter(User.id == current_user["id"]).first()
-                
-                if not updated_by_user:
-                    return
-                
-                # Planlanan her talep için bildirim gönder
-                for request_id in request_ids:
-                    try:
-                        request = bg_db.query(Request).filter(Request.id == request_id).first()
-                        if request and request.planned_date:
-                            # Talep sahibine bildirim gönder
-                            request_owner = bg_db.query(User).filter(User.id == request.user_id).first()
-                            if request_owner and request_owner.email:
-                                asyncio.run(notification_service.notify_request_planned(
-                                    request,
-                                    request.planned_date.strftime("%d.%m.%Y"),
-                                    updated_by_user
-                                ))
-                    except Exception as e:
-                        print(f"⚠️ Talep {request_id} için bildirim hatası: {e}")
-            finally:
-                bg_db.close()
-        except Exception as e:
-            print(f"⚠️ Planlama bildirimi hatası: {e}")
-            import traceback
-            traceback.print_exc()
+            users = {
+                user.id: user
+                for user in bg_db.query(User).filter(User.id.in_({owner_id, planned_by_id}))
+            }
+            owner = users.get(owner_id)
+            updated_by_user = users.get(planned_by_id)
+            if not owner or not owner.email or not updated_by_user:
+                return
+            
+            requests = (
+                bg_db.query(Request)
+                .options(joinedload(Request.dealer))
+                .filter(Request.id.in_(owner_request_ids), Request.planned_date.isnot(None))
+                .order_by(Request.id)
+                .all()
+            )
+            await NotificationService(bg_db).notify_requests_planned(
+                owner,
+                requests,
+                plan_data.planned_date.strftime("%d.%m.%Y"),
+                updated_by_user
+            )
+        return send_plan_notification
     
-    background_tasks.add_task(send_plan_notifications)
+    for owner_id, owner_request_ids in result["owner_requests"].items():
+        notification_dispatcher.submit(
+            make_plan_job(owner_id, owner_request_ids),
+            label=f"Kullanıcı {owner_id} planlama bildirimi ({len(owner_request_ids)} talep)"
+        )
     
     return {
         "success": True,
-        "updated": updated_count,
-        "errors": errors[:10]
+        "updated": result["updated"],
+        "errors": result["errors"][:10]
     }
 
 
@@ -162,17 +133,17 @@ async def get_planned_requests(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     mine: bool = Query(False),  # Kullanıcının kendi talepleri
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(AuthService.get_current_user)
 ):
     """Planlanmış işleri getir (tech/admin tüm depo, user sadece kendi talepleri)"""
-    request_service = RequestService(db)
-    
     # Kullanıcı sadece kendi taleplerini görebilir
     if mine or current_user["role"] == "user":
-        user_requests = request_service.get_user_requests(
-            current_user["email"],
-            depot_id=current_user.get("depot_id")
+        user_requests = await db.run_sync(
+            lambda sync_db: RequestService(sync_db).get_user_requests(
+                current_user["email"],
+                depot_id=current_user.get("depot_id")
+            )
         )
         # Sadece planlanmış olanları filtrele
         planned_user_requests = [r for r in user_requests if r.planlananTarih]
@@ -183,25 +154,22 @@ async def get_planned_requests(
     if not user_depot_ids and current_user.get("depot_id"):
         user_depot_ids = [current_user["depot_id"]]
     
-    query = db.query(Request).filter(Request.status == RequestStatus.TAKVIME_EKLENDI.value)
-    
     # Tech kullanıcılar sadece kendi depolarındaki işleri görebilir
+    depot_ids = None
     if current_user["role"] == "tech" and user_depot_ids:
         if depot_id and depot_id not in user_depot_ids:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Bu depo için yetkiniz yok"
             )
-        query = query.filter(Request.depot_id.in_(user_depot_ids))
+        depot_ids = user_depot_ids
     elif depot_id:
-        query = query.filter(Request.depot_id == depot_id)
-    
-    if start_date:
-        query = query.filter(Request.planned_date >= start_date)
+        depot_ids = [depot_id]
     
-    if end_date:
-        query = query.filter(Request.planned_date <= end_date)
-    
-    requests = query.order_by(Request.planned_date.asc()).all()
-    
-    return [request_service._to_response(r, include_user=True) for r in requests]
+    return await db.run_sync(
+        lambda sync_db: RequestService(sync_db).get_planned_requests(
+            depot_ids=depot_ids,
+            start_date=start_date,
+            end_date=end_date
+        )
+    )
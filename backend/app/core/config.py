@@ -10,12 +10,23 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = "app_password"
     DB_NAME: str = "teknik_servis"
     DB_PORT: int = 5432
+    # Bağlantı havuzları (process başına). Üst sınır: worker sayısı x (sync + async pool_size + max_overflow);
+    # varsayılanlarla 4 worker x 20 = 80 bağlantı, Postgres max_connections=100'ün altında kalır
+    # (kalan bağlantılar migration, script ve yönetim oturumları için). Worker sayısı artarsa küçültün.
+    DB_POOL_SIZE: int = 5  # Sync engine: yazma route'ları, scheduler, background task'lar
+    DB_MAX_OVERFLOW: int = 5
+    DB_ASYNC_POOL_SIZE: int = 5  # Async engine (asyncpg): okuma route'ları
+    DB_ASYNC_MAX_OVERFLOW: int = 5
 
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    
+    # Principal cache (token -> kullanıcı bilgisi, process başına)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
 
     # CORS - string olarak alıp split ediyoruz
     CORS_ORIGINS_STR: str = "http://localhost:5173,http://localhost:3000"
@@ -44,7 +55,55 @@ class Settings(BaseSettings):
     
     # Rate Limiting (opsiyonel)
     RATE_LIMIT_ENABLED: bool = True
-    RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_PER_MINUTE: int = 60  # Varsayılan: kullanıcı (giriş yapılmamışsa IP) başına
+    # Rota bazlı limitler: "[METHOD ]path:istek/dakika[:ip|user]" virgülle ayrılmış, ilk eşleşen uygulanır
+    RATE_LIMIT_ROUTE_LIMITS: str = "POST /auth/login:10:ip,POST /auth/refresh:30:ip,/reports/export:10:user,/backup:10:user"
+    # Store: memory (process başına) | sqlite (aynı sunucudaki worker'lar arasında) | redis (tüm sunucular)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_SQLITE_PATH: str = "/tmp/teknik_servis_rate_limit.db"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    
+    # Email outbox (bildirimler kuyruğa yazılır, worker toplu gönderir)
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30
+    EMAIL_OUTBOX_LOCK_TIMEOUT_SECONDS: int = 600
+    SMTP_POOL_SIZE: int = 3
+    
+    # Bildirim dispatcher'ı (aynı anda çalışan en fazla bildirim işi)
+    NOTIFICATION_MAX_CONCURRENCY: int = 10
+    
+    # Özet bildirimler: planlama/durum bildirimleri alıcı başına bu pencere boyunca biriktirilip tek email olarak gönderilir
+    # (0 = kapalı, her bildirim ayrı ve hemen gönderilir). Bekleyen özetler POLL aralığıyla kontrol edilir.
+    NOTIFICATION_DIGEST_WINDOW_SECONDS: int = 300
+    NOTIFICATION_DIGEST_POLL_SECONDS: int = 60
+    
+    # Otomatik raporlar (alıcılara paralel gönderim, admin alıcı listesi önbelleği)
+    REPORT_DELIVERY_CONCURRENCY: int = 5
+    ADMIN_RECIPIENTS_CACHE_TTL_SECONDS: int = 300
+    
+    # Metrikler (Prometheus formatında /metrics, varsayılan kapalı). Token verilirse "Authorization: Bearer <token>" gerekir;
+    # production'da token zorunludur (token yoksa endpoint açılmaz)
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str = ""
+    
+    @property
+    def METRICS_EXPOSED(self) -> bool:
+        """/metrics açık mı (production'da METRICS_TOKEN olmadan açılmaz)"""
+        return self.METRICS_ENABLED and (bool(self.METRICS_TOKEN) or self.ENVIRONMENT != "production")
+    
+    # Diagnostik: yavaş sorgu log'u (eşik ms) ve örnekleyici profiler (çıktı dizini boşsa BACKUP_DIR/diagnostics)
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+    DIAGNOSTICS_DIR: str = ""
+    PROFILER_MAX_SECONDS: int = 300
+    
+    # Toplu import (her chunk tek INSERT ... ON CONFLICT ile yazılır ve ilerleme kaydedilir)
+    # Kaynak dosyalar iş bitene kadar IMPORT_DIR'de saklanır (boşsa BACKUP_DIR/imports)
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_DIR: str = ""
+    IMPORT_JOB_STALE_SECONDS: int = 600
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,218 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import add_statement_observer, current_request_route
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+def get_diagnostics_dir() -> str:
+    """Profil çıktılarının yazıldığı dizin (DIAGNOSTICS_DIR yoksa BACKUP_DIR/diagnostics)"""
+    return settings.DIAGNOSTICS_DIR or os.path.join(settings.BACKUP_DIR, "diagnostics")
+
+
+# ---------- Yavaş sorgu log'u ----------
+
+class SlowQueryLog:
+    """
+    Eşik süresini aşan SQL ifadelerini parametreleri ve çalıştıran route ile kaydeder.
+    Son kayıtlar bellekte tutulur (admin endpoint'i), her kayıt ayrıca 'app.slow_query' logger'ına yazılır.
+    Eşik ve açık/kapalı durumu çalışma anında değiştirilebilir (process başına).
+    """
+
+    MAX_STATEMENT_CHARS = 4000
+    MAX_PARAMETER_CHARS = 1000
+
+    def __init__(self, threshold_ms: int, enabled: bool = True, max_entries: int = 200):
+        self.threshold_ms = threshold_ms
+        self.enabled = enabled
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def configure(self, threshold_ms: Optional[int] = None, enabled: Optional[bool] = None) -> None:
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        if enabled is not None:
+            self.enabled = enabled
+
+    def observe(self, engine_name: str, statement: str, parameters, elapsed: float) -> None:
+        """Her SQL ifadesinden sonra çağrılır (metrics.add_statement_observer)"""
+        if not self.enabled:
+            return
+        duration_ms = elapsed * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        entry = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "duration_ms": round(duration_ms, 1),
+            "engine": engine_name,
+            "route": current_request_route() or "-",
+            "statement": statement[:self.MAX_STATEMENT_CHARS],
+            "parameters": repr(parameters)[:self.MAX_PARAMETER_CHARS],
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.total += 1
+        slow_query_logger.warning(
+            f"🐢 Yavaş sorgu {entry['duration_ms']} ms [{entry['route']}]: "
+            f"{' '.join(entry['statement'].split())} | params: {entry['parameters']}"
+        )
+
+    def get_entries(self, limit: int = 50) -> List[dict]:
+        """Son kayıtlar (en yeni önce)"""
+        with self._lock:
+            entries = list(self._entries)
+        return entries[::-1][:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_status(self) -> dict:
+        with self._lock:
+            buffered = len(self._entries)
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "total": self.total,
+            "buffered": buffered,
+        }
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    enabled=settings.SLOW_QUERY_LOG_ENABLED
+)
+add_statement_observer(slow_query_log.observe)
+
+
+# ---------- Örnekleyici profiler ----------
+
+class SamplingProfiler:
+    """
+    İstek üzerine, belirli bir süre boyunca tüm thread'lerin stack'lerini sys._current_frames() ile örnekler.
+    Uygulama kodu değiştirilmez ve yeniden başlatma gerekmez; örnekleme kendi thread'inde çalışır.
+    Çıktı 'collapsed stack' formatındadır (her satır "çerçeve;çerçeve;... sayı"): flamegraph.pl,
+    speedscope ve inferno ile doğrudan açılabilir.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.current: Optional[dict] = None
+        self.last: Optional[dict] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration_seconds: float, interval_ms: int = 10) -> dict:
+        """Profili arka planda başlat; zaten çalışıyorsa RuntimeError"""
+        with self._lock:
+            if self.running:
+                raise RuntimeError("Profiler zaten çalışıyor")
+            started_at = datetime.now()
+            filename = f"profile_{started_at.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.folded"
+            self.current = {
+                "filename": filename,
+                "pid": os.getpid(),
+                "started_at": started_at.isoformat(timespec="seconds"),
+                "duration_seconds": duration_seconds,
+                "interval_ms": interval_ms,
+                "samples": 0,
+            }
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(duration_seconds, interval_ms / 1000, filename),
+                name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+            return dict(self.current)
+
+    def stop(self) -> None:
+        """Çalışan profili erken bitir (o ana kadarki örnekler yazılır)"""
+        self._stop.set()
+
+    def _run(self, duration_seconds: float, interval: float, filename: str) -> None:
+        own_id = threading.get_ident()
+        thread_names = {}
+        stacks: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + duration_seconds
+
+        try:
+            while time.monotonic() < deadline and not self._stop.is_set():
+                if len(thread_names) != threading.active_count():
+                    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    stacks[self._collapse(frame, thread_names.get(thread_id, str(thread_id)))] += 1
+                samples += 1
+                self.current["samples"] = samples
+                time.sleep(interval)
+
+            path = os.path.join(get_diagnostics_dir(), filename)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+
+            result = dict(self.current, path=path, unique_stacks=len(stacks), finished_at=datetime.now().isoformat(timespec="seconds"))
+            logger.info(f"✅ Profil yazıldı: {path} ({samples} örnek, {len(stacks)} farklı stack)")
+        except Exception as e:
+            result = dict(self.current, error=str(e))
+            logger.error(f"❌ Profil hatası: {e}", exc_info=True)
+
+        with self._lock:
+            self.last = result
+            self.current = None
+
+    @staticmethod
+    def _collapse(frame, thread_name: str) -> str:
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        parts.append(f"thread:{thread_name}")
+        # Collapsed formatta kök solda ve ';' çerçeve ayırıcısıdır
+        return ";".join(part.replace(";", ",") for part in reversed(parts))
+
+    def get_status(self) -> dict:
+        with self._lock:
+            return {
+                "running": self.running,
+                "current": dict(self.current) if self.current else None,
+                "last": self.last,
+            }
+
+
+def list_profiles() -> List[Dict]:
+    """Diagnostics dizinindeki profil dosyaları (en yeni önce)"""
+    directory = get_diagnostics_dir()
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if name.endswith(".folded"):
+            stat = os.stat(os.path.join(directory, name))
+            profiles.append({
+                "filename": name,
+                "size": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
+            })
+    return sorted(profiles, key=lambda profile: profile["created_at"], reverse=True)
+
+
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,309 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Prometheus text formatı (0.0.4) ile dışa aktarılan basit, process içi metrikler.
+# Birden fazla uvicorn worker'ı varsa her worker kendi değerlerini raporlar (scrape worker'a göre değişir).
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+JOB_DURATION_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Etiket değerleri başına artan sayaç"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in sorted(items):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Etiket değerleri başına sabit bucket'lı histogram (bucket sayıları kümülatif yazılır)"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labelvalues -> [bucket sayıları..., +Inf sayısı, toplam]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labelvalues, list(state)) for labelvalues, state in self._values.items()]
+        for labelvalues, state in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackGauge:
+    """Değeri scrape anında callback ile okunan gauge. callback: [(etiket değerleri, değer), ...]"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labelvalues, value in self.callback():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Tüm metrikleri Prometheus text formatında döndür"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# ---------- HTTP ----------
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "Tamamlanan HTTP istekleri", ("method", "route", "status")
+))
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP istek süresi (saniye)", ("method", "route")
+))
+HTTP_REQUEST_DB_STATEMENTS = registry.register(Histogram(
+    "http_request_db_statements", "İstek başına çalıştırılan SQL ifadesi sayısı", ("method", "route"),
+    buckets=STATEMENT_COUNT_BUCKETS
+))
+HTTP_REQUEST_DB_SECONDS = registry.register(Histogram(
+    "http_request_db_seconds", "İstek başına toplam SQL süresi (saniye)", ("method", "route")
+))
+
+# ---------- Veritabanı ----------
+
+DB_STATEMENT_DURATION = registry.register(Histogram(
+    "db_statement_duration_seconds", "SQL ifadesi süresi (saniye)", ("engine",)
+))
+DB_POOL_CHECKOUT_WAIT = registry.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Connection pool'dan bağlantı alma bekleme süresi (saniye)", ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+))
+
+# ---------- Arka plan işleri ----------
+
+JOB_DURATION = registry.register(Histogram(
+    "job_duration_seconds", "Arka plan / zamanlanmış iş süresi (saniye)", ("job", "status"),
+    buckets=JOB_DURATION_BUCKETS
+))
+
+
+def observe_job(job: str, seconds: float, ok: bool = True) -> None:
+    JOB_DURATION.observe(seconds, job, "success" if ok else "error")
+
+
+# ---------- İstek bazında SQL istatistikleri ----------
+
+class RequestDbStats:
+    __slots__ = ("route", "statements", "seconds")
+
+    def __init__(self, route: str = ""):
+        self.route = route  # "GET /requests/12" - yavaş sorgu log'unda kaynağı göstermek için
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Middleware istek başında set eder; sync route'ların thread'lerine ve run_sync greenlet'lerine de taşınır
+_request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def begin_request_db_stats(route: str = ""):
+    """İstek için yeni bir sayaç başlat; (stats, reset token) döndürür"""
+    stats = RequestDbStats(route)
+    return stats, _request_db_stats.set(stats)
+
+
+def current_request_route() -> Optional[str]:
+    """SQL'i çalıştıran isteğin "METHOD yol" bilgisi (istek dışında None)"""
+    stats = _request_db_stats.get()
+    return stats.route if stats is not None else None
+
+
+def end_request_db_stats(token) -> None:
+    _request_db_stats.reset(token)
+
+
+# ---------- Engine / pool enstrümantasyonu ----------
+
+class InstrumentedQueuePool(QueuePool):
+    """Bağlantı alma (checkout) bekleme süresini ölçen QueuePool"""
+
+    metrics_engine = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, self.metrics_engine)
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Bağlantı alma (checkout) bekleme süresini ölçen asyncio pool'u"""
+
+    metrics_engine = "async"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, self.metrics_engine)
+
+
+_pool_engines: Dict[str, Engine] = {}
+
+# Her SQL ifadesinden sonra çağrılır: (engine adı, statement, parameters, süre) - ör. yavaş sorgu log'u
+StatementObserver = Callable[[str, str, object, float], None]
+_statement_observers: List[StatementObserver] = []
+
+
+def add_statement_observer(observer: StatementObserver) -> None:
+    if observer not in _statement_observers:
+        _statement_observers.append(observer)
+
+
+def _pool_gauge(read: Callable) -> Callable:
+    def callback():
+        samples = []
+        for name, engine in list(_pool_engines.items()):
+            try:
+                samples.append(((name,), read(engine.pool)))
+            except Exception:
+                # Pool tipi bu değeri desteklemiyor (ör. NullPool)
+                pass
+        return samples
+    return callback
+
+
+registry.register(CallbackGauge(
+    "db_pool_checked_out", "Kullanımdaki bağlantı sayısı", ("engine",), _pool_gauge(lambda pool: pool.checkedout())
+))
+registry.register(CallbackGauge(
+    "db_pool_size", "Pool boyutu", ("engine",), _pool_gauge(lambda pool: pool.size())
+))
+registry.register(CallbackGauge(
+    "db_pool_overflow", "Pool boyutunu aşan bağlantı sayısı", ("engine",), _pool_gauge(lambda pool: max(0, pool.overflow()))
+))
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """SQL ifadelerinin süresini ve sayısını (istek bazında da) ölç, pool durumunu metriklere ekle"""
+    _pool_engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_stack = conn.info.get("metrics_query_started")
+        if not started_stack:
+            return
+        elapsed = time.perf_counter() - started_stack.pop()
+        DB_STATEMENT_DURATION.observe(elapsed, name)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.seconds += elapsed
+        for observer in _statement_observers:
+            observer(name, statement, parameters, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # Hatalı ifadede after_cursor_execute çalışmaz; başlangıç zamanını yığından çıkar
+        conn = exception_context.connection
+        if conn is not None:
+            started_stack = conn.info.get("metrics_query_started")
+            if started_stack:
+                started_stack.pop()
@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+from app.core.config import settings
+
+
+class PrincipalCache:
+    """
+    Access token -> kullanıcı bilgisi (principal) önbelleği.
+    Anahtar (user_id, token); kayıt ömrü token'ın exp süresini ve PRINCIPAL_CACHE_TTL_SECONDS'ı aşmaz.
+    Önbellek process başınadır; her kayıt yüklendiği "principals" referans veri sürümünü taşır.
+    Kullanıcı güncelleme/silme/import'u sürümü commit anında artırır, okuyan sürümü (tek PK sorgusu)
+    verir ve sürüm değiştiyse kayıt kullanılmaz: değişiklik tüm worker'larda bir sonraki istekte geçerlidir.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: Dict[Tuple[int, str], Tuple[dict, float, int]] = {}
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, token: str, version: int = 0) -> Optional[dict]:
+        """Verilen sürümde yüklenmiş, süresi dolmamış kayıt varsa principal'ın kopyasını döndür"""
+        key = (user_id, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            principal, expires_at, entry_version = entry
+            if expires_at <= time.time() or entry_version != version:
+                self._remove(key)
+                return None
+            return {**principal, "depot_ids": list(principal["depot_ids"])}
+
+    def set(
+        self,
+        user_id: int,
+        token: str,
+        principal: dict,
+        token_exp: Optional[float] = None,
+        version: int = 0
+    ) -> None:
+        """Principal'ı yüklendiği sürümle kaydet (token'ın süresi dolmuşsa kaydetme)"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        if expires_at <= now:
+            return
+
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._evict_expired(now)
+                if len(self._entries) >= self.max_size:
+                    # Hâlâ doluysa en eski kaydı at (dict ekleme sırasını korur)
+                    self._remove(next(iter(self._entries)))
+            self._entries[(user_id, token)] = (principal, expires_at, version)
+            self._tokens_by_user.setdefault(user_id, set()).add(token)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Kullanıcının bu process'teki kayıtlarını hemen sil (diğer worker'lar sürüm kontrolüyle bırakır)"""
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, set()):
+                self._entries.pop((user_id, token), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _evict_expired(self, now: float) -> None:
+        for key in [k for k, (_, expires_at, _) in self._entries.items() if expires_at <= now]:
+            self._remove(key)
+
+    def _remove(self, key: Tuple[int, str]) -> None:
+        self._entries.pop(key, None)
+        user_id, token = key
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE
+)
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import math
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # Saniye (izin verildiyse 0)
+    reset_after: int  # Kova tamamen dolana kadar geçecek saniye
+
+
+class RateLimitRule(NamedTuple):
+    """
+    Rota bazlı limit kuralı.
+    path_prefix ile başlayan (ve method eşleşen) isteklere uygulanır; scope 'user' ise
+    giriş yapmış kullanıcı bazında, 'ip' ise client IP bazında sayılır.
+    """
+    name: str
+    path_prefix: str
+    per_minute: int
+    method: Optional[str] = None
+    scope: str = "user"
+
+    def matches(self, method: str, path: str) -> bool:
+        return path.startswith(self.path_prefix) and (self.method is None or self.method == method)
+
+
+def parse_route_limits(value: str) -> List[RateLimitRule]:
+    """
+    "POST /auth/login:10:ip,/reports/export:10:user" formatındaki kuralları parse et.
+    Her kural: [METHOD ]path:istek_sayısı_dakika[:ip|user]
+    """
+    rules = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        parts = item.split(":")
+        if len(parts) < 2:
+            raise ValueError(f"Geçersiz rate limit kuralı: {item}")
+        target = parts[0].strip().split()
+        method, path = (target[0].upper(), target[1]) if len(target) == 2 else (None, target[0])
+        scope = parts[2].strip() if len(parts) > 2 else "user"
+        if scope not in ("ip", "user"):
+            raise ValueError(f"Geçersiz rate limit kapsamı: {scope}")
+        rules.append(RateLimitRule(
+            name=f"{method or '*'} {path}",
+            path_prefix=path,
+            per_minute=int(parts[1]),
+            method=method,
+            scope=scope
+        ))
+    return rules
+
+
+# ---------- Token bucket store'ları ----------
+
+def _refill(tokens: float, updated_at: float, now: float, capacity: int, rate: float) -> float:
+    return min(float(capacity), tokens + max(0.0, now - updated_at) * rate)
+
+
+class InMemoryTokenBucketStore:
+    """Process içi token bucket'lar (varsayılan). Anahtar başına O(1) durum: (token, son güncelleme)."""
+
+    # Bu kadar süredir dokunulmayan kovalar temizlenir
+    IDLE_SECONDS = 600
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._last_cleanup = time.monotonic()
+
+    async def take(self, key: str, capacity: int, rate: float, cost: int = 1) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(capacity), now))
+            tokens = _refill(tokens, updated_at, now, capacity, rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+
+            if now - self._last_cleanup > self.IDLE_SECONDS:
+                cutoff = now - self.IDLE_SECONDS
+                for stale in [k for k, (_, ts) in self._buckets.items() if ts < cutoff]:
+                    del self._buckets[stale]
+                self._last_cleanup = now
+        return allowed, tokens
+
+
+class SqliteTokenBucketStore:
+    """
+    Aynı sunucudaki tüm uvicorn worker'larının paylaştığı token bucket'lar.
+    SQLite dosyası tmpfs'te (ör. /dev/shm) tutulursa paylaşımlı bellek gibi davranır;
+    her take() tek bir BEGIN IMMEDIATE transaction'ıdır.
+    """
+
+    IDLE_SECONDS = 600
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._last_cleanup = time.time()
+
+    def _take(self, key: str, capacity: int, rate: float, cost: int) -> Tuple[bool, float]:
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = _refill(row[0], row[1], now, capacity, rate) if row else float(capacity)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                conn.execute(
+                    "INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                    (key, tokens, now)
+                )
+                if now - self._last_cleanup > self.IDLE_SECONDS:
+                    conn.execute("DELETE FROM rate_limit_buckets WHERE updated_at < ?", (now - self.IDLE_SECONDS,))
+                    self._last_cleanup = now
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed, tokens
+
+    async def take(self, key: str, capacity: int, rate: float, cost: int = 1) -> Tuple[bool, float]:
+        # BEGIN IMMEDIATE başka bir worker'ın yazma kilidini bekleyebilir (timeout=5): event loop'u bloklamasın
+        return await asyncio.to_thread(self._take, key, capacity, rate, cost)
+
+
+class RedisTokenBucketStore:
+    """
+    Redis (veya Redis uyumlu bir sunucu) üzerinde token bucket - tüm sunucular ortak limit kullanır.
+    Kova güncellemesi tek bir Lua script'i ile atomik yapılır. client, eval() destekleyen
+    herhangi bir asyncio Redis istemcisi olabilir (redis.asyncio, test için fakeredis).
+    """
+
+    SCRIPT = """
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisTokenBucketStore":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis için 'redis' paketi kurulu olmalı (pip install redis)") from e
+        return cls(redis_asyncio.from_url(url))
+
+    async def take(self, key: str, capacity: int, rate: float, cost: int = 1) -> Tuple[bool, float]:
+        allowed, tokens = await self.client.eval(
+            self.SCRIPT, 1, self.prefix + key, capacity, rate, time.time(), cost
+        )
+        if isinstance(tokens, bytes):
+            tokens = tokens.decode()
+        return bool(int(allowed)), float(tokens)
+
+
+def create_store(backend: str):
+    """RATE_LIMIT_BACKEND ayarına göre store oluştur: memory | sqlite | redis"""
+    if backend == "memory":
+        return InMemoryTokenBucketStore()
+    if backend == "sqlite":
+        return SqliteTokenBucketStore(settings.RATE_LIMIT_SQLITE_PATH)
+    if backend == "redis":
+        return RedisTokenBucketStore.from_url(settings.RATE_LIMIT_REDIS_URL)
+    raise ValueError(f"Bilinmeyen rate limit backend: {backend}")
+
+
+# ---------- Limiter ----------
+
+class RateLimiter:
+    """
+    İsteği ilk eşleşen rota kuralına (yoksa varsayılan limite) göre token bucket'tan düşer.
+    Kova kapasitesi dakikalık limit kadardır ve saniyede limit/60 token dolar (ani yığılmalara
+    dakikalık limit kadar izin verir, ortalamada limiti aşmaz).
+    """
+
+    def __init__(self, store, default_per_minute: int, rules: Optional[List[RateLimitRule]] = None):
+        self.store = store
+        self.default_per_minute = default_per_minute
+        self.rules = rules or []
+
+    def resolve(self, method: str, path: str) -> Tuple[str, int, str]:
+        """(kural adı, dakikalık limit, kapsam)"""
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule.name, rule.per_minute, rule.scope
+        return "default", self.default_per_minute, "user"
+
+    async def hit(self, method: str, path: str, client_ip: str, user_key: Optional[str] = None) -> RateLimitResult:
+        rule_name, per_minute, scope = self.resolve(method, path)
+        subject = f"user:{user_key}" if scope == "user" and user_key else f"ip:{client_ip}"
+        rate = per_minute / 60.0
+
+        try:
+            allowed, tokens = await self.store.take(f"{rule_name}|{subject}", per_minute, rate)
+        except Exception as e:
+            # Store'a ulaşılamıyorsa isteği engelleme (fail-open)
+            logger.error(f"Rate limit store hatası: {e}")
+            return RateLimitResult(True, per_minute, per_minute, 0, 0)
+
+        if not allowed:
+            logger.warning(f"Rate limit exceeded: {rule_name} {subject}")
+        retry_after = 0 if allowed else max(1, math.ceil((1 - tokens) / rate))
+        reset_after = math.ceil((per_minute - tokens) / rate)
+        return RateLimitResult(allowed, per_minute, int(tokens), retry_after, reset_after)
+
+
+def create_rate_limiter() -> RateLimiter:
+    return RateLimiter(
+        store=create_store(settings.RATE_LIMIT_BACKEND),
+        default_per_minute=settings.RATE_LIMIT_PER_MINUTE,
+        rules=parse_route_limits(settings.RATE_LIMIT_ROUTE_LIMITS)
+    )
@@ -0,0 +1,173 @@
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import BigInteger, event, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.depot import Depot
+from app.models.reference_data_version import ReferenceDataVersion
+
+# Önbelleğe alınan referans veri setleri
+DEPOTS = "depots"
+TERRITORIES = "territories"  # depo bazlı liste bayilerden türetilir: bayi yazımları da sürümü artırır
+POSM = "posm"  # yalnızca katalog (id, isim, depo); stok sayaçları canlı okunur, stok hareketleri sürümü artırmaz
+PRINCIPALS = "principals"  # kullanıcı rol/depo/silme: worker'lardaki principal önbelleği (bkz. principal_cache)
+ALL_DATASETS = (DEPOTS, TERRITORIES, POSM, PRINCIPALS)
+
+_PENDING_KEY = "reference_data_changed"
+
+
+def mark_changed(db: Session, *names: str) -> None:
+    """
+    Session'ın bir sonraki commit'inde verilen veri setlerinin sürümünü artır.
+    Sürüm satırları commit'ten hemen önce, flush'tan sonra ve isim sırasıyla güncellenir: sürüm kilidi
+    transaction'daki son kilittir (stok/bayi satır kilitleriyle kilitlenme olmaz). Rollback işareti siler.
+    """
+    db.info.setdefault(_PENDING_KEY, set()).update(names)
+
+
+def _clock_version():
+    # Mikro saniye cinsinden veritabanı saati: yedekten geri yükleme sürümleri geri alsa da bir sonraki
+    # artış geri yüklemeden önce verilmiş hiçbir sürümle çakışmaz (aynı sürüm farklı veriyi göstermez)
+    return func.cast(func.extract("epoch", func.clock_timestamp()) * 1000000, BigInteger)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session: Session) -> None:
+    names = session.info.pop(_PENDING_KEY, None)
+    if not names:
+        return
+    session.flush()
+    for name in sorted(names):
+        stmt = insert(ReferenceDataVersion).values(name=name, version=_clock_version())
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[ReferenceDataVersion.name],
+            set_={
+                "version": func.greatest(ReferenceDataVersion.version + 1, _clock_version()),
+                "updated_at": func.now()
+            }
+        ))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class ReferenceDataCache:
+    """
+    Depo, territory ve POSM listelerinin bellek önbelleği (process başına).
+    Her kayıt (veri seti, kapsam) anahtarıyla yüklendiği sürümü taşır; okuma başına tek PK sorgusuyla
+    güncel sürüm alınır, değişmediyse liste bellekten döner. Sürüm veritabanında tutulduğu için
+    bir worker'daki yazım diğer worker'ların önbelleğini de bir sonraki okumada geçersiz kılar.
+    """
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._entries: Dict[Tuple[str, Hashable], Tuple[int, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_version(db: Session, name: str) -> int:
+        version = db.execute(
+            select(ReferenceDataVersion.version).where(ReferenceDataVersion.name == name)
+        ).scalar()
+        return version or 0
+
+    def get(
+        self,
+        db: Session,
+        name: str,
+        scope: Hashable,
+        loader: Callable[[], Any],
+        version: Optional[int] = None
+    ) -> Tuple[Any, int]:
+        """
+        (değer, sürüm) döner. Sürüm yüklemeden önce okunur: arada bir yazım commit edilirse önbellekteki
+        değer sürümünden yeni olur (bir sonraki okumada gereksiz ama zararsız yeniden yükleme).
+        """
+        if version is None:
+            version = self.get_version(db, name)
+        key = (name, scope)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[1], version
+
+        value = loader()
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._entries.clear()
+            current = self._entries.get(key)
+            if current is None or current[0] <= version:
+                self._entries[key] = (version, value)
+        return value, version
+
+
+reference_cache = ReferenceDataCache()
+
+
+def get_depot_names(db: Session) -> Dict[int, str]:
+    """Depo ID -> isim (istatistik ve rapor üreticileri için; önbellekteki sözlüğün kopyası)"""
+    names, _ = reference_cache.get(db, DEPOTS, "names", lambda: dict(db.query(Depot.id, Depot.name).all()))
+    return dict(names)
+
+
+def mark_all_changed(db: Session) -> None:
+    """Tüm veri setlerinin sürümünü artır (yedekten geri yükleme sonrası: worker önbellekleri yeniden yüklenir)"""
+    mark_changed(db, *ALL_DATASETS)
+
+
+def make_etag(name: str, version: int, scope: Hashable, fingerprint: str = "") -> str:
+    """
+    Kapsam (depo filtresi, rol) aynı sürümde farklı listeler ürettiği için ETag'e dahildir.
+    fingerprint: önbelleğe alınmayan canlı alanların özeti (bkz. serve_cached live parametresi)
+    """
+    if isinstance(scope, (tuple, list, frozenset, set)):
+        scope = "-".join(str(part) for part in sorted(scope, key=str))
+    suffix = f".{fingerprint}" if fingerprint else ""
+    return f'W/"{name}.{version}.{scope}{suffix}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "")
+    return if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+def serve_cached(
+    request: Request,
+    response: Response,
+    db: Session,
+    name: str,
+    scope: Hashable,
+    loader: Callable[[], Any],
+    live: Optional[Callable[[Any], Tuple[Any, Any]]] = None
+) -> Any:
+    """
+    Route'lar için: sürümü oku, ETag başlığını ekle; istemcinin If-None-Match'i eşleşiyorsa gövdesiz 304
+    döndür (liste yüklenmez), değilse listeyi önbellekten (gerekirse loader ile) döndür.
+    no-cache: tarayıcı listeyi saklar ama her kullanımda ETag ile doğrular.
+    
+    live: sürümlenmeyen canlı alanlar için (ör. POSM stok sayaçları). Önbellekteki değeri alıp
+    (son değer, canlı durum) döner; durumun özeti ETag'e eklenir. Bu durumda 304 kararı canlı sorgudan
+    sonra verilir (gövde yine gönderilmez).
+    """
+    version = reference_cache.get_version(db, name)
+    headers = {"Cache-Control": "private, no-cache"}
+    
+    if live is None:
+        headers["ETag"] = make_etag(name, version, scope)
+        if _not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        value, _ = reference_cache.get(db, name, scope, loader, version=version)
+    else:
+        cached, _ = reference_cache.get(db, name, scope, loader, version=version)
+        value, state = live(cached)
+        fingerprint = hashlib.blake2b(repr(state).encode(), digest_size=8).hexdigest()
+        headers["ETag"] = make_etag(name, version, scope, fingerprint)
+        if _not_modified(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return value
@@ -1,12 +1,16 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from app.core.config import settings
+from app.core.metrics import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool, instrument_engine
 
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     connect_args={
         "options": "-c client_encoding=UTF8"
     }
@@ -14,6 +18,22 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg) - FastAPI okuma route'ları için
+# Sync engine scheduler, background task'lar ve script'ler için kullanılmaya devam eder
+async_engine = create_async_engine(
+    make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    pool_pre_ping=True,
+    pool_size=settings.DB_ASYNC_POOL_SIZE,
+    max_overflow=settings.DB_ASYNC_MAX_OVERFLOW
+)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# SQL süresi/sayısı ve pool checkout bekleme metrikleri (/metrics)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+
 
 def get_db():
     """Database session dependency"""
@@ -22,3 +42,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Async database session dependency
+    
+    Servis katmanı sync Session API'si ile yazıldığı için route'lar servisleri
+    `await db.run_sync(lambda sync_db: Service(sync_db).method(...))` ile çağırır;
+    sorgular event loop'u bloklamadan asyncpg bağlantısı üzerinden çalışır.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
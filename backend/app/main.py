@@ -3,15 +3,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.core.logging_config import setup_logging
-from app.middleware.error_handler import error_handler_middleware
+from app.middleware.error_handler import ErrorHandlerMiddleware
 from app.middleware.security_headers import SecurityHeadersMiddleware
 from app.middleware.rate_limiter import RateLimiterMiddleware
+from app.middleware.metrics import MetricsMiddleware
 from app.api import routes_auth, routes_requests, routes_posm, routes_dealers, routes_photos, routes_territories, routes_admin, routes_work_plan, routes_reports, routes_audit_logs, routes_backup, routes_scheduled_reports
 from fastapi.staticfiles import StaticFiles
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.events import EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
+import time
 import os
 import asyncio
+import hmac
 import logging
 
 # Logging yapılandırması
@@ -21,6 +28,24 @@ logger = logging.getLogger(__name__)
 # Scheduler'ı global olarak tanımla
 scheduler = AsyncIOScheduler()
 
+# Zamanlanmış iş süreleri (/metrics): iş başlatıldığında zamanı tut, bittiğinde ölç
+_job_started_at = {}
+
+
+def _track_scheduler_job(event):
+    from app.core.metrics import observe_job
+    if event.code == EVENT_JOB_SUBMITTED:
+        _job_started_at[event.job_id] = time.perf_counter()
+        return
+    started = _job_started_at.pop(event.job_id, None)
+    if started is not None:
+        # Veritabanından yüklenen raporlar tek etikette toplanır
+        job_name = "scheduled_report" if event.job_id.startswith("scheduled_report_") else event.job_id
+        observe_job(job_name, time.perf_counter() - started, ok=event.code == EVENT_JOB_EXECUTED)
+
+
+scheduler.add_listener(_track_scheduler_job, EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Uygulama başlatma ve kapatma işlemleri"""
@@ -86,12 +111,45 @@ async def lifespan(app: FastAPI):
     # İlk yükleme
     load_scheduled_reports()
     
+    # Özet bildirimler: penceresi dolan alıcıların bekleyen bildirimleri tek email olarak outbox'a yazılır
+    # (özet kapatılsa bile kuyrukta kalmış bildirimler bu işle gönderilir)
+    from app.services.notification_service import flush_notification_digests
+    scheduler.add_job(
+        flush_notification_digests,
+        trigger=IntervalTrigger(seconds=settings.NOTIFICATION_DIGEST_POLL_SECONDS),
+        id="notification_digest_flush",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    
     scheduler.start()
     logger.info("✅ Scheduled tasks başlatıldı")
     
+    # Yavaş sorgu log'u (eşik ve profiler admin panelinden çalışma anında değiştirilir)
+    from app.core.diagnostics import slow_query_log
+    logger.info(f"✅ Yavaş sorgu log'u: {'aktif' if slow_query_log.enabled else 'kapalı'} (eşik {slow_query_log.threshold_ms} ms)")
+    
+    if settings.METRICS_ENABLED and not settings.METRICS_EXPOSED:
+        logger.warning("⚠️ METRICS_ENABLED açık ama METRICS_TOKEN boş: production'da /metrics kapalı tutuluyor")
+    
+    # Email şablonlarını bir kez yükle ve derle
+    from app.services.email_templates import load_email_templates
+    logger.info(f"✅ {load_email_templates()} email şablonu yüklendi")
+    
+    # Bildirim maillerini outbox tablosundan gönderen worker
+    from app.services.email_outbox_service import email_outbox_worker
+    email_outbox_worker.start()
+    
+    # Route'lardan gelen bildirim işlerini çalıştıran dispatcher (tek, uzun ömürlü event loop)
+    from app.services.notification_dispatcher import notification_dispatcher
+    notification_dispatcher.start()
+    
     yield
     
     # Shutdown
+    await asyncio.to_thread(notification_dispatcher.stop)
+    await email_outbox_worker.stop()
     scheduler.shutdown()
     logger.info("✅ Scheduled tasks durduruldu")
 
@@ -102,6 +160,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Middleware'ler saf ASGI: header'lar http.response.start'ta eklenir, response gövdesi kopyalanmaz
+# (StreamingResponse'lar, ör. Excel export, parça parça akmaya devam eder)
+
 # Security headers middleware (en üstte)
 app.add_middleware(SecurityHeadersMiddleware)
 
@@ -112,7 +173,7 @@ if getattr(settings, 'RATE_LIMIT_ENABLED', False):
     logger.info(f"Rate limiting aktif: {requests_per_minute} istek/dakika")
 
 # Error handler middleware
-app.middleware("http")(error_handler_middleware)
+app.add_middleware(ErrorHandlerMiddleware)
 
 # CORS middleware - Config'den alınan origin'leri kullan
 app.add_middleware(
@@ -124,6 +185,10 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Metrik middleware'i en dışta: süre diğer middleware'leri de kapsar
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Routes
 app.include_router(routes_auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(routes_requests.router, prefix="/requests", tags=["Requests"])
@@ -171,3 +236,21 @@ async def health():
             "database": "disconnected",
             "error": str(e) if settings.DEBUG else "Database connection failed"
         }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus formatında metrikler (route gecikme histogramları, SQL, pool, iş süreleri)"""
+    from app.core.metrics import registry
+    from fastapi import HTTPException
+    
+    if not settings.METRICS_EXPOSED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN:
+        # Sabit süreli karşılaştırma: yanıt süresinden token'ın öneki tahmin edilemesin
+        provided = request.headers.get("Authorization", "").encode()
+        expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+        if not hmac.compare_digest(provided, expected):
+            raise HTTPException(status_code=401, detail="Geçersiz metrik token'ı")
+    
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
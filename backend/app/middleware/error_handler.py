@@ -1,7 +1,8 @@
-from fastapi import Request, status
+from fastapi import status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
 import traceback
 from app.core.config import settings
@@ -9,12 +10,9 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 
-async def error_handler_middleware(request: Request, call_next):
-    """Global error handler middleware"""
-    try:
-        response = await call_next(request)
-        return response
-    except RequestValidationError as e:
+def build_error_response(e: Exception) -> JSONResponse:
+    """Yakalanan exception için JSON hata response'u"""
+    if isinstance(e, RequestValidationError):
         # Validation hataları - production'da detayları gizle
         logger.warning(f"Validation error: {e.errors()}")
         return JSONResponse(
@@ -24,24 +22,57 @@ async def error_handler_middleware(request: Request, call_next):
                 "errors": e.errors() if getattr(settings, 'DEBUG', False) else None
             }
         )
-    except StarletteHTTPException as e:
+    if isinstance(e, StarletteHTTPException):
         # HTTP exception'lar
         logger.warning(f"HTTP exception: {e.status_code} - {e.detail}")
         return JSONResponse(
             status_code=e.status_code,
             content={"detail": e.detail}
         )
-    except Exception as e:
-        # Beklenmeyen hatalar
-        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+    
+    # Beklenmeyen hatalar
+    logger.error(f"Unexpected error: {str(e)}", exc_info=e)
+    
+    # Production'da detaylı hata mesajı gösterme
+    error_detail = "Bir hata oluştu" if not getattr(settings, 'DEBUG', False) else str(e)
+    
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={
+            "detail": error_detail,
+            "traceback": "".join(traceback.format_exception(e)) if getattr(settings, 'DEBUG', False) else None
+        }
+    )
+
+
+class ErrorHandlerMiddleware:
+    """
+    Global error handler middleware (saf ASGI).
+    Response başlamadan önce oluşan hataları JSON'a çevirir. Response başladıktan sonraki
+    hatalar (ör. streaming sırasında) yeniden fırlatılır; sunucu bağlantıyı kapatır.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Production'da detaylı hata mesajı gösterme
-        error_detail = "Bir hata oluştu" if not getattr(settings, 'DEBUG', False) else str(e)
+        response_started = False
         
-        return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                "detail": error_detail,
-                "traceback": traceback.format_exc() if getattr(settings, 'DEBUG', False) else None
-            }
-        )
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_tracking)
+        except Exception as e:
+            if response_started:
+                logger.error(f"Error after response started: {str(e)}", exc_info=e)
+                raise
+            response = build_error_response(e)
+            await response(scope, receive, send)
@@ -0,0 +1,80 @@
+import time
+from typing import Dict
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import (
+    HTTP_REQUESTS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUEST_DB_STATEMENTS,
+    HTTP_REQUEST_DB_SECONDS,
+    begin_request_db_stats,
+    end_request_db_stats,
+)
+
+# Eşleşmeyen yollar tek etikette toplanır (etiket sayısı sınırsız büyümesin)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    İstek süresi, durum kodu ve istek başına SQL sayısı/süresi metriklerini toplar (saf ASGI).
+    Route etiketi yol şablonudur (/requests/{request_id}); gerçek yol kullanılmaz.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._route_paths: Dict[object, str] = {}
+
+    def _route_label(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            # Router eşleşen route'un endpoint'ini scope'a yazar; şablonu uygulamanın route listesinden bul
+            app = scope.get("app")
+            for route in getattr(app, "routes", []):
+                if getattr(route, "endpoint", getattr(route, "app", None)) is endpoint:
+                    path = route.path
+                    break
+            path = path or UNMATCHED_ROUTE
+            self._route_paths[endpoint] = path
+        return path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        recorded = False
+        stats, token = begin_request_db_stats(f"{scope['method']} {scope['path']}")
+
+        def record() -> None:
+            # Yanıt gövdesi bittiği anda ölçülür: Starlette BackgroundTasks aynı app çağrısı içinde,
+            # gövde gönderildikten sonra çalışır (import işleri route gecikmesine/SQL sayısına eklenmesin)
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            method = scope["method"]
+            route = self._route_label(scope)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method, route)
+            HTTP_REQUEST_DB_STATEMENTS.observe(stats.statements, method, route)
+            HTTP_REQUEST_DB_SECONDS.observe(stats.seconds, method, route)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            end_request_db_stats(token)
+            # Yanıt hiç tamamlanmadıysa (hata, bağlantı kopması) burada kaydedilir
+            record()
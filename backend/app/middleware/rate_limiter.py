@@ -1,88 +1,87 @@
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.requests import Request
 from starlette.responses import JSONResponse
-from collections import defaultdict
-from datetime import datetime, timedelta
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional
 import time
 from app.core.config import settings
+from app.core.rate_limit import RateLimiter, create_rate_limiter
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware - IP bazlı"""
+def _get_user_key(request: Request) -> Optional[str]:
+    """Bearer token'dan kullanıcı kimliği (sub) - giriş yapılmamışsa None"""
+    authorization = request.headers.get("Authorization")
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    from app.core.security import decode_token
+    payload = decode_token(authorization[7:])
+    if not payload or payload.get("type") == "refresh":
+        return None
+    sub = payload.get("sub")
+    return str(sub) if sub is not None else None
+
+
+class RateLimiterMiddleware:
+    """
+    Rate limiting middleware - token bucket (saf ASGI).
+    Giriş yapmış kullanıcılar kullanıcı bazında, diğerleri IP bazında sınırlanır; rota bazlı kurallar
+    RATE_LIMIT_ROUTE_LIMITS ile tanımlanır. Kovalar RATE_LIMIT_BACKEND store'unda tutulur
+    (memory: process başına, sqlite: aynı sunucudaki worker'lar arasında, redis: tüm sunucular).
+    """
     
-    def __init__(self, app, requests_per_minute: int = 60):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, requests_per_minute: int = 60, limiter: Optional[RateLimiter] = None):
+        self.app = app
         self.requests_per_minute = requests_per_minute
-        self.requests = defaultdict(list)  # IP -> [timestamp1, timestamp2, ...]
-        self.cleanup_interval = timedelta(minutes=5)
-        self.last_cleanup = datetime.now()
+        self.limiter = limiter or create_rate_limiter()
+        self.limiter.default_per_minute = requests_per_minute
     
-    def _cleanup_old_requests(self):
-        """Eski request kayıtlarını temizle"""
-        now = datetime.now()
-        if now - self.last_cleanup > self.cleanup_interval:
-            cutoff = now - timedelta(minutes=1)
-            for ip in list(self.requests.keys()):
-                self.requests[ip] = [
-                    ts for ts in self.requests[ip] 
-                    if ts > cutoff
-                ]
-                if not self.requests[ip]:
-                    del self.requests[ip]
-            self.last_cleanup = now
-    
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Rate limiting aktif değilse geç
-        if not getattr(settings, 'RATE_LIMIT_ENABLED', False):
-            return await call_next(request)
+        if scope["type"] != "http" or not getattr(settings, 'RATE_LIMIT_ENABLED', False):
+            await self.app(scope, receive, send)
+            return
         
-        # Health check ve static files için rate limiting yok
-        if request.url.path in ['/health', '/'] or request.url.path.startswith('/uploads'):
-            return await call_next(request)
+        # Health check, metrikler ve static files için rate limiting yok
+        path = scope["path"]
+        if path in ['/health', '/', '/metrics'] or path.startswith('/uploads'):
+            await self.app(scope, receive, send)
+            return
         
-        # Client IP'yi al (gerçek ISP IP'si)
+        # Client IP'yi al (gerçek ISP IP'si) - Request sadece header/client okumak için, body'ye dokunmaz
         from app.utils.ip_helper import get_client_ip
+        request = Request(scope)
         client_ip = get_client_ip(request) or "unknown"
         
-        # Eski kayıtları temizle
-        self._cleanup_old_requests()
-        
-        # Son 1 dakikadaki request sayısını kontrol et
-        now = datetime.now()
-        cutoff = now - timedelta(minutes=1)
+        result = await self.limiter.hit(scope["method"], path, client_ip, _get_user_key(request))
+        reset = str(int(time.time()) + result.reset_after)
         
-        # Bu IP'nin son 1 dakikadaki request'lerini filtrele
-        recent_requests = [
-            ts for ts in self.requests[client_ip]
-            if ts > cutoff
-        ]
-        
-        # Rate limit kontrolü
-        requests_per_minute = getattr(settings, 'RATE_LIMIT_PER_MINUTE', 60)
-        if len(recent_requests) >= requests_per_minute:
-            logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-            return JSONResponse(
+        if not result.allowed:
+            response = JSONResponse(
                 status_code=429,
                 content={
-                    "detail": f"Çok fazla istek. Lütfen {requests_per_minute} istek/dakika limitine dikkat edin.",
-                    "retry_after": 60
+                    "detail": f"Çok fazla istek. Lütfen {result.limit} istek/dakika limitine dikkat edin.",
+                    "retry_after": result.retry_after
                 },
-                headers={"Retry-After": "60"}
+                headers={
+                    "Retry-After": str(result.retry_after),
+                    "X-RateLimit-Limit": str(result.limit),
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset": reset
+                }
             )
+            await response(scope, receive, send)
+            return
         
-        # Request'i kaydet
-        self.requests[client_ip].append(now)
-        
-        # Response'u al
-        response = await call_next(request)
-        
-        # Rate limit bilgisini header'a ekle
-        remaining = requests_per_minute - len(recent_requests) - 1
-        response.headers["X-RateLimit-Limit"] = str(requests_per_minute)
-        response.headers["X-RateLimit-Remaining"] = str(max(0, remaining))
-        response.headers["X-RateLimit-Reset"] = str(int((now + timedelta(minutes=1)).timestamp()))
+        async def send_with_headers(message: Message) -> None:
+            # Rate limit bilgisini header'a ekle
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(result.limit)
+                headers["X-RateLimit-Remaining"] = str(max(0, result.remaining))
+                headers["X-RateLimit-Reset"] = reset
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_headers)
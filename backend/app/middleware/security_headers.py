@@ -1,24 +1,38 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+# Her response'a eklenen header'lar
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "X-XSS-Protection": "1; mode=block",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    # HSTS (HTTPS kullanıyorsanız)
+    # "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
+    # Content Security Policy (CSP) - ihtiyaca göre ayarlayın
+    # "Content-Security-Policy": "default-src 'self'",
+}
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Security headers ekleyen middleware"""
+
+class SecurityHeadersMiddleware:
+    """
+    Security headers ekleyen middleware (saf ASGI).
+    Header'lar http.response.start mesajına eklenir; response gövdesine dokunulmaz (streaming bozulmaz).
+    """
     
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        
-        # HSTS (HTTPS kullanıyorsanız)
-        # response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Content Security Policy (CSP) - ihtiyaca göre ayarlayın
-        # response.headers["Content-Security-Policy"] = "default-src 'self'"
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for key, value in SECURITY_HEADERS.items():
+                    headers[key] = value
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_headers)
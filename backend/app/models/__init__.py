@@ -4,10 +4,16 @@ from app.models.territory import Territory
 from app.models.dealer import Dealer
 from app.models.posm import Posm
 from app.models.posm_transfer import PosmTransfer
+from app.models.posm_stock_movement import PosmStockMovement
 from app.models.request import Request
 from app.models.photo import Photo
 from app.models.depot import Depot
 from app.models.audit_log import AuditLog
 from app.models.scheduled_report import ScheduledReport
+from app.models.email_outbox import EmailOutbox
+from app.models.report_delivery import ReportRun, ReportDelivery
+from app.models.import_job import ImportJob
+from app.models.notification_digest_item import NotificationDigestItem
+from app.models.reference_data_version import ReferenceDataVersion
 
-__all__ = ["User", "Territory", "Dealer", "Posm", "PosmTransfer", "Request", "Photo", "Depot", "AuditLog", "ScheduledReport"]
+__all__ = ["User", "Territory", "Dealer", "Posm", "PosmTransfer", "PosmStockMovement", "Request", "Photo", "Depot", "AuditLog", "ScheduledReport", "EmailOutbox", "ReportRun", "ReportDelivery", "ImportJob", "NotificationDigestItem", "ReferenceDataVersion"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -20,3 +20,9 @@ class AuditLog(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     user = relationship("User", backref="audit_logs")
+
+    __table_args__ = (
+        Index("ix_audit_logs_created_at", created_at.desc()),
+        Index("ix_audit_logs_entity_created_at", entity_type, entity_id, created_at.desc()),
+        Index("ix_audit_logs_user_created_at", user_id, created_at.desc()),
+    )
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 
 class Dealer(Base):
     __tablename__ = "dealers"
+    __table_args__ = (
+        # Toplu import INSERT ... ON CONFLICT (code, depot_id) bu index'e dayanır
+        Index("ix_dealers_code_depot", "code", "depot_id", unique=True),
+        # Arama index'leri tr_fold(code/name) ifadeleri üzerindedir (trigram GIN + önek), bkz. alembic c9d0e1f2a3b4
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     territory_id = Column(Integer, ForeignKey("territories.id"), nullable=True)
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class EmailOutboxStatus:
+    PENDING = "pending"    # Gönderilmeyi bekliyor (veya tekrar denenecek)
+    SENDING = "sending"    # Bir worker tarafından alındı
+    SENT = "sent"
+    SKIPPED = "skipped"    # SMTP ayarları yok, sadece log'a yazıldı
+    FAILED = "failed"      # Maksimum deneme sayısına ulaşıldı
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(500), nullable=False)
+    body_html = Column(Text, nullable=False)
+    body_text = Column(Text, nullable=True)
+    
+    status = Column(String(20), nullable=False, default=EmailOutboxStatus.PENDING, server_default=EmailOutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+    
+    # Bir sonraki deneme zamanı (retry backoff)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Worker'ın kaydı aldığı zaman (çöken worker'ın kayıtlarını geri almak için)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class ImportJob(Base):
+    """Arka planda çalışan bir toplu import işi (ilerleme, sonuç sayıları ve hata raporu)"""
+    __tablename__ = "import_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False, index=True)  # 'dealers', 'posm', 'users'
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending, running, completed, failed
+    filename = Column(String(255), nullable=True)
+    depot_id = Column(Integer, ForeignKey("depots.id", ondelete="SET NULL"), nullable=True)
+    
+    # Kaynak dosya (iş tamamlanana kadar saklanır; kaldığı yerden devam için yeniden okunur)
+    source_type = Column(String(20), nullable=False, default="csv")  # csv, xlsx, sheets
+    source_path = Column(String(500), nullable=True)
+    options = Column(JSON, nullable=True)  # {"create_territories": true}
+    
+    # İlerleme ve sonuç
+    total_rows = Column(Integer, nullable=False, default=0)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    inserted_count = Column(Integer, nullable=False, default=0)
+    updated_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    error_report = Column(Text, nullable=True)  # CSV: Satır, Kayıt, Hata
+    message = Column(Text, nullable=True)
+    
+    # Yazılmış (commit edilmiş) temiz kayıt sayısı; devam eden iş bu noktadan sürer
+    checkpoint_row = Column(Integer, nullable=False, default=0)
+    
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class NotificationDigestItem(Base):
+    """
+    Özet (digest) bildirimine girecek tek bir talep bildirimi.
+    Tek başına gönderilecek email'in kendisi de saklanır: pencere içinde kullanıcının tek bildirimi
+    varsa o email aynen gönderilir, birden fazlaysa tek özet email'de birleştirilir.
+    """
+    __tablename__ = "notification_digest_items"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    request_id = Column(Integer, ForeignKey("requests.id", ondelete="CASCADE"), nullable=True)
+    kind = Column(String(20), nullable=False)  # planned, completed, updated
+    dealer_label = Column(String(255), nullable=True)  # "Bayi Adı (KOD)"
+    detail = Column(Text, nullable=True)  # Özet satırındaki açıklama
+    
+    subject = Column(String(500), nullable=False)
+    body_html = Column(Text, nullable=False)
+    body_text = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Özet email'ine alındığı zaman (NULL = bekliyor)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_notification_digest_items_pending", "user_id", "created_at", postgresql_where=text("sent_at IS NULL")),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -15,3 +15,7 @@ class Photo(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     request = relationship("Request", backref="photos")
+
+    __table_args__ = (
+        Index("ix_photos_request_id", "request_id"),
+    )
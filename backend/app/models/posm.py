@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, CheckConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -6,6 +6,13 @@ from app.db.base import Base
 
 class Posm(Base):
     __tablename__ = "posm"
+    __table_args__ = (
+        # Import INSERT ... ON CONFLICT (name, depot_id) bu index'e dayanır
+        Index("ix_posm_name_depot", "name", "depot_id", unique=True),
+        # Stok hareketleri koşullu UPDATE ile uygulanır; negatif stok ayrıca veritabanında engellenir
+        CheckConstraint("ready_count >= 0", name="ck_posm_ready_count_non_negative"),
+        CheckConstraint("repair_pending_count >= 0", name="ck_posm_repair_pending_count_non_negative"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)  # unique kaldırıldı, depot bazında unique olacak
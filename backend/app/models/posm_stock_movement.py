@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class PosmStockMovement(Base):
+    """
+    POSM stok hareket defteri: her stok değişikliği bir satırdır (yalnızca eklenir).
+    posm.ready_count / repair_pending_count bu defterin toplamıdır; sayaçlar hareketle aynı transaction'da güncellenir.
+    """
+    __tablename__ = "posm_stock_movements"
+    __table_args__ = (
+        Index("ix_posm_stock_movements_posm_created", "posm_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    posm_id = Column(Integer, ForeignKey("posm.id", ondelete="CASCADE"), nullable=False)
+    ready_delta = Column(Integer, nullable=False, default=0)
+    repair_pending_delta = Column(Integer, nullable=False, default=0)
+    # opening_balance, montaj, demontaj, transfer_out, transfer_in, adjustment, import
+    reason = Column(String(30), nullable=False)
+    request_id = Column(Integer, ForeignKey("requests.id", ondelete="SET NULL"), nullable=True, index=True)
+    transfer_id = Column(Integer, ForeignKey("posm_transfers.id", ondelete="SET NULL"), nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    posm = relationship("Posm", backref="stock_movements")
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, BigInteger, String, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class ReferenceDataVersion(Base):
+    """
+    Referans veri setlerinin (depolar, territory'ler, POSM kataloğu) sürüm sayacı.
+    Veri setini değiştiren her transaction commit anında sürümü artırır (max(sürüm + 1, veritabanı saati µs):
+    yedekten geri yüklemeden sonra da eski sürümler tekrar verilmez); worker'lardaki bellek önbelleği
+    ve HTTP ETag'leri bu sürüme bağlıdır (bkz. app/core/reference_cache.py).
+    """
+    __tablename__ = "reference_data_versions"
+    
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
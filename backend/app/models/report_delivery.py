@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class ReportRun(Base):
+    """Bir otomatik raporun tek bir çalışması (render + tüm alıcılara gönderim)"""
+    __tablename__ = "report_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    report_key = Column(String(100), nullable=False, index=True)  # 'weekly_completed_report_default', 'scheduled_report_5'
+    scheduled_report_id = Column(Integer, ForeignKey("scheduled_reports.id", ondelete="SET NULL"), nullable=True, index=True)
+    subject = Column(String(500), nullable=True)
+    
+    recipient_count = Column(Integer, nullable=False, default=0)
+    success_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    
+    # Süreler (milisaniye)
+    render_ms = Column(Integer, nullable=True)
+    duration_ms = Column(Integer, nullable=True)  # Veri çekme + render + gönderim
+    
+    started_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    deliveries = relationship("ReportDelivery", back_populates="run", cascade="all, delete-orphan")
+
+
+class ReportDelivery(Base):
+    """Rapor çalışmasının alıcı bazında gönderim sonucu"""
+    __tablename__ = "report_deliveries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("report_runs.id", ondelete="CASCADE"), nullable=False, index=True)
+    recipient_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    recipient_email = Column(String(255), nullable=False)
+    status = Column(String(20), nullable=False)  # 'sent', 'failed', 'skipped'
+    error = Column(Text, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    run = relationship("ReportRun", back_populates="deliveries")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Numeric, Enum
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Numeric, Enum, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -57,3 +57,15 @@ class Request(Base):
     posm = relationship("Posm", backref="requests")
     updated_by_user = relationship("User", foreign_keys=[updated_by])
     completed_by_user = relationship("User", foreign_keys=[completed_by])
+
+    # Index'ler sorgu şekillerine göre (bkz. alembic d4e5f6a7b8c9, scripts/check_index_usage.py)
+    __table_args__ = (
+        Index("ix_requests_request_date_id", request_date.desc(), id.desc()),
+        Index("ix_requests_depot_request_date", depot_id, request_date.desc(), id.desc()),
+        Index("ix_requests_user_request_date", user_id, request_date.desc(), id.desc()),
+        Index("ix_requests_status_completed_date", status, completed_date),
+        Index("ix_requests_pending_depot_requested_date", depot_id, requested_date,
+              postgresql_where=text("status = 'Beklemede'")),
+        Index("ix_requests_planned_depot_planned_date", depot_id, planned_date,
+              postgresql_where=text("status = 'TakvimeEklendi'")),
+    )
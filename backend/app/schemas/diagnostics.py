@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class SlowQuerySettingsUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    threshold_ms: Optional[int] = Field(None, ge=0)
+
+
+class ProfileStartRequest(BaseModel):
+    duration_seconds: float = Field(30, gt=0)
+    interval_ms: int = Field(10, ge=1, le=1000)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -54,6 +54,7 @@ class RequestDetailResponse(BaseModel):
     latitude: Optional[Decimal] = None
     longitude: Optional[Decimal] = None
     photos: list = []
+    fotografSayisi: int = 0
     tamamlayanKullanici: Optional[str] = None
     guncelleyenKullanici: Optional[str] = None
 
@@ -70,3 +71,19 @@ class RequestStatsResponse(BaseModel):
     open: int
     completed: int
     pending: int
+
+
+class RequestListFilter(BaseModel):
+    depot_id: Optional[int] = None
+    status: Optional[List[str]] = None
+    job_type: Optional[List[str]] = None
+    priority: Optional[List[str]] = None
+    start_date: Optional[date] = None  # request_date >= start_date
+    end_date: Optional[date] = None  # request_date <= end_date
+
+
+class RequestPageResponse(BaseModel):
+    items: List[RequestResponse]
+    next_cursor: Optional[str] = None  # Son sayfada None
+    limit: int
+    total: Optional[int] = None  # Sadece include_total=true ise hesaplanır
@@ -46,3 +46,37 @@ class ScheduledReportResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class ReportDeliveryResponse(BaseModel):
+    id: int
+    recipient_user_id: Optional[int]
+    recipient_email: str
+    status: str  # 'sent', 'failed', 'skipped'
+    error: Optional[str]
+    duration_ms: Optional[int]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class ReportRunResponse(BaseModel):
+    id: int
+    report_key: str
+    scheduled_report_id: Optional[int]
+    subject: Optional[str]
+    recipient_count: int
+    success_count: int
+    error_count: int
+    render_ms: Optional[int]
+    duration_ms: Optional[int]
+    started_at: datetime
+    finished_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
+class ReportRunDetailResponse(ReportRunResponse):
+    deliveries: List[ReportDeliveryResponse] = []
@@ -1,6 +1,6 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, insert, or_
 from datetime import datetime
 from app.models.audit_log import AuditLog
 from app.models.user import User
@@ -40,6 +40,17 @@ class AuditService:
         self.db.refresh(log)
         return log
 
+    def create_logs(self, entries: List[dict]) -> int:
+        """
+        Birden çok audit log kaydını tek toplu INSERT ile yaz (toplu işlemler için).
+        Her kayıt create_log parametreleriyle aynı anahtarları taşır; session'daki bekleyen değişikliklerle birlikte commit edilir.
+        """
+        if not entries:
+            return 0
+        self.db.execute(insert(AuditLog), entries)
+        self.db.commit()
+        return len(entries)
+
     def get_logs(
         self,
         filter_params: Optional[AuditLogFilter] = None,
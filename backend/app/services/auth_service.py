@@ -2,7 +2,7 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.core.security import (
     verify_password,
@@ -10,6 +10,8 @@ from app.core.security import (
     create_refresh_token,
     decode_token,
 )
+from app.core.principal_cache import principal_cache
+from app.core.reference_cache import PRINCIPALS, reference_cache
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.auth import TokenResponse, UserResponse
@@ -78,8 +80,16 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token'da kullanıcı bilgisi bulunamadı",
             )
+        user_id = int(user_id)
 
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        # Önbellekte güncel sürümle varsa kullanıcı/depo sorgularına gitme (sürüm tek PK sorgusu;
+        # başka bir worker'daki rol/depo değişikliği veya silme sürümü artırır)
+        version = reference_cache.get_version(db, PRINCIPALS)
+        cached = principal_cache.get(user_id, token, version)
+        if cached is not None:
+            return cached
+
+        user = db.query(User).options(selectinload(User.depots)).filter(User.id == user_id).first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -92,7 +102,7 @@ class AuthService:
         if not depot_ids and user.depot_id:
             depot_ids = [user.depot_id]
         
-        return {
+        principal = {
             "id": user.id,
             "name": user.name,
             "email": user.email,
@@ -100,6 +110,9 @@ class AuthService:
             "depot_id": user.depot_id,  # Backward compatibility
             "depot_ids": depot_ids,  # New: list of depot IDs
         }
+        principal_cache.set(user_id, token, principal, token_exp=payload.get("exp"), version=version)
+
+        return {**principal, "depot_ids": list(depot_ids)}
 
     # --------- Internal helpers ---------
 
@@ -0,0 +1,55 @@
+from typing import List
+from sqlalchemy import exists, or_, select
+from sqlalchemy.orm import Session
+from app.models.request import Request
+
+
+class AuthorizationService:
+    """
+    Talep erişim kontrolü: "U kullanıcısı R talebine erişebilir mi?"
+    Admin her talebe, tech kendi depolarındaki (ve depo atanmamış) taleplere ve kendi taleplerine,
+    diğer kullanıcılar sadece kendi taleplerine erişir. Depo seti önbellekteki principal'dan okunur;
+    kullanıcının tüm talepleri hiçbir zaman yüklenmez.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def principal_depot_ids(current_user: dict) -> List[int]:
+        """Principal'ın depo ID'leri (çoklu depo yoksa eski depot_id alanı)"""
+        depot_ids = current_user.get("depot_ids", [])
+        if not depot_ids and current_user.get("depot_id"):
+            depot_ids = [current_user["depot_id"]]
+        return depot_ids
+
+    def can_access(self, current_user: dict, request: Request) -> bool:
+        """Yüklenmiş talep için kontrol: sorgu çalıştırmaz (depo ve sahip talep satırında)"""
+        role = current_user["role"]
+        if role == "admin":
+            return True
+        if role == "tech" and (not request.depot_id or request.depot_id in self.principal_depot_ids(current_user)):
+            return True
+        return request.user_id == current_user["id"]
+
+    def can_access_request(self, current_user: dict, request_id: int) -> bool:
+        """
+        Talep ID'si ile kontrol: tek EXISTS sorgusu (requests PK üzerinden).
+        Talep yoksa False döner; 404 ayrımı gerekiyorsa çağıran talebi yükleyip can_access kullanmalıdır.
+        """
+        role = current_user["role"]
+        if role == "admin":
+            return True
+
+        allowed = Request.user_id == current_user["id"]
+        if role == "tech":
+            depot_ids = self.principal_depot_ids(current_user)
+            depot_condition = Request.depot_id.is_(None)
+            if depot_ids:
+                depot_condition = or_(depot_condition, Request.depot_id.in_(depot_ids))
+            allowed = or_(allowed, depot_condition)
+
+        return bool(self.db.execute(
+            select(exists().where(Request.id == request_id, allowed))
+        ).scalar())
+
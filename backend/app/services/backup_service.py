@@ -125,11 +125,28 @@ class BackupService:
         try:
             result = subprocess.run(cmd, env=env, capture_output=True, text=True, check=True)
             print(f"✅ Yedek geri yüklendi: {backup_path}")
+            self._invalidate_reference_cache()
             return True
         except subprocess.CalledProcessError as e:
             print(f"❌ Yedek geri yükleme hatası: {e.stderr}")
             raise
 
+    def _invalidate_reference_cache(self):
+        """
+        Geri yükleme referans veri sürümlerini de yedekteki değerlere döndürür; tüm sürümler artırılır ki
+        worker'lar önbellekteki (geri yükleme öncesi) listeleri yeniden yüklesin.
+        """
+        from app.core.reference_cache import mark_all_changed
+        from app.db.session import SessionLocal
+        db = SessionLocal()
+        try:
+            mark_all_changed(db)
+            db.commit()
+        except Exception as e:
+            print(f"⚠️ Referans veri önbelleği geçersiz kılınamadı: {e}")
+        finally:
+            db.close()
+
     def export_all_tables_to_excel(self, db: Session) -> str:
         """Tüm tabloları Excel formatında export et"""
         from app.models import (
@@ -375,9 +392,9 @@ class BackupService:
         """ScheduledReport modelini dict'e çevir"""
         depot_names = []
         if report.depot_ids:
-            from app.models.depot import Depot
-            depots = db.query(Depot).filter(Depot.id.in_(report.depot_ids)).all()
-            depot_names = [d.name for d in depots]
+            from app.core.reference_cache import get_depot_names
+            all_depot_names = get_depot_names(db)
+            depot_names = [all_depot_names[depot_id] for depot_id in report.depot_ids if depot_id in all_depot_names]
         
         user_names = []
         if report.recipient_user_ids:
@@ -1,18 +1,46 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import case, func, or_
 from app.models.dealer import Dealer
 from app.models.territory import Territory
 from app.schemas.dealer import DealerResponse, DealerSearchResponse
 
 
 class DealerService:
+    # Türkçe harf katlama: büyük/küçük harf ve I/İ/ı/i farkı aramada yok sayılır (klavye/yazım farkı).
+    # Veritabanında aynı dönüşümü tr_fold() SQL fonksiyonu yapar (alembic e1f2a3b4c5d6); iki taraf aynı kalmalı.
+    # ASCII dışı her büyük harf burada olmalı: C collation'da SQL lower() yalnızca ASCII harfleri küçültür.
+    _TR_FOLD = str.maketrans("İIıÇĞÖŞÜÂÎÛ", "iiiçğöşüâîû")
+    # Bu uzunluktan kısa terimler trigram index'ini kullanamaz; sadece önek eşleşmesi yapılır
+    TRIGRAM_MIN_LENGTH = 3
+    DEFAULT_SEARCH_LIMIT = 50
+
     def __init__(self, db: Session):
         self.db = db
 
-    def search_dealers(self, territory: Optional[str] = None, search_term: Optional[str] = None, depot_id: Optional[int] = None) -> List[DealerSearchResponse]:
-        """Bayileri ara (depot filtresi ile)"""
-        query = self.db.query(Dealer)
+    @classmethod
+    def fold_search_text(cls, value: str) -> str:
+        return value.translate(cls._TR_FOLD).lower()
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    def search_dealers(
+        self,
+        territory: Optional[str] = None,
+        search_term: Optional[str] = None,
+        depot_id: Optional[int] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[DealerSearchResponse]:
+        """
+        Bayileri ara (depot filtresi ile). Kod/ad Türkçe harf katlamasıyla eşleşir; sonuçlar sıralanır:
+        tam kod, kod öneki, ad öneki, diğer eşleşmeler (ad benzerliğine göre). Territory adı aynı sorguda gelir.
+        """
+        query = (
+            self.db.query(Dealer.code, Dealer.name, Territory.name.label("territory_name"))
+            .outerjoin(Territory, Territory.id == Dealer.territory_id)
+        )
         
         # Depot filtresi
         if depot_id:
@@ -20,35 +48,50 @@ class DealerService:
         
         # Territory filtresi
         if territory:
-            territory_obj = self.db.query(Territory).filter(Territory.name == territory).first()
-            if territory_obj:
-                query = query.filter(Dealer.territory_id == territory_obj.id)
+            territory_id = self.db.query(Territory.id).filter(Territory.name == territory).scalar()
+            if territory_id:
+                query = query.filter(Dealer.territory_id == territory_id)
         
         # Arama terimi filtresi
-        if search_term:
-            search_lower = search_term.lower()
-            query = query.filter(
-                or_(
-                    Dealer.code.ilike(f"%{search_lower}%"),
-                    Dealer.name.ilike(f"%{search_lower}%")
-                )
-            )
-        
-        dealers = query.all()
-        
-        results = []
-        for dealer in dealers:
-            territory_name = None
-            if dealer.territory:
-                territory_name = dealer.territory.name
+        term = self.fold_search_text(search_term.strip()) if search_term else ""
+        if term:
+            folded_code = func.tr_fold(Dealer.code)
+            folded_name = func.tr_fold(Dealer.name)
+            escaped = self._escape_like(term)
+            prefix = f"{escaped}%"
+            
+            if len(term) < self.TRIGRAM_MIN_LENGTH:
+                # ix_dealers_code_prefix / ix_dealers_name_prefix
+                query = query.filter(or_(
+                    folded_code.like(prefix, escape="\\"),
+                    folded_name.like(prefix, escape="\\")
+                ))
+            else:
+                # ix_dealers_code_trgm / ix_dealers_name_trgm
+                contains = f"%{escaped}%"
+                query = query.filter(or_(
+                    folded_code.like(contains, escape="\\"),
+                    folded_name.like(contains, escape="\\")
+                ))
             
-            results.append(DealerSearchResponse(
-                territory=territory_name,
-                bayiKodu=dealer.code,
-                bayiAdi=dealer.name
-            ))
+            rank = case(
+                (folded_code == term, 0),
+                (folded_code.like(prefix, escape="\\"), 1),
+                (folded_name.like(prefix, escape="\\"), 2),
+                else_=3
+            )
+            query = query.order_by(rank, func.similarity(folded_name, term).desc(), Dealer.code)
+        else:
+            query = query.order_by(Dealer.code)
         
-        return results
+        return [
+            DealerSearchResponse(
+                territory=row.territory_name,
+                bayiKodu=row.code,
+                bayiAdi=row.name
+            )
+            for row in query.limit(limit).all()
+        ]
 
     def get_dealer_by_code(self, code: str, depot_id: Optional[int] = None) -> Optional[DealerResponse]:
         """Bayi bilgilerini kod ile getir (depot filtresi ile)"""
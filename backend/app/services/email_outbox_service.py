@@ -0,0 +1,367 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from email.mime.multipart import MIMEMultipart
+import aiosmtplib
+from sqlalchemy import func, or_, and_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import observe_job
+from app.db.session import SessionLocal
+from app.models.email_outbox import EmailOutbox, EmailOutboxStatus
+from app.services.notification_service import get_smtp_settings, create_smtp_tls_context, build_email_message
+
+logger = logging.getLogger(__name__)
+
+# Başarısız gönderimler arasındaki en uzun bekleme
+MAX_RETRY_DELAY_SECONDS = 3600
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class SmtpConnectionPool:
+    """
+    Kimliği doğrulanmış SMTP bağlantılarını mesajlar arasında yeniden kullanır.
+    Aynı anda en fazla `size` bağlantı açılır; her mesaj için yeni TLS el sıkışması + login yapılmaz.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: List[aiosmtplib.SMTP] = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def _connect(self, smtp: dict) -> aiosmtplib.SMTP:
+        # Port 465 için SSL/TLS, diğerleri için STARTTLS (sertifika doğrulaması kapalı)
+        use_tls = smtp["port"] == 465
+        client = aiosmtplib.SMTP(
+            hostname=smtp["host"],
+            port=smtp["port"],
+            username=smtp["user"],
+            password=smtp["password"],
+            use_tls=use_tls,
+            start_tls=not use_tls,
+            tls_context=create_smtp_tls_context()
+        )
+        await client.connect()
+        return client
+
+    def _discard(self, client: aiosmtplib.SMTP) -> None:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    async def _acquire(self, smtp: dict) -> Tuple[aiosmtplib.SMTP, bool]:
+        """(bağlantı, havuzdan mı geldi)"""
+        while self._idle:
+            client = self._idle.pop()
+            if client.is_connected:
+                return client, True
+            self._discard(client)
+        return await self._connect(smtp), False
+
+    async def send(self, message: MIMEMultipart, smtp: dict) -> None:
+        async with self._semaphore:
+            client, reused = await self._acquire(smtp)
+            try:
+                await client.send_message(message)
+            except aiosmtplib.SMTPServerDisconnected:
+                self._discard(client)
+                if not reused:
+                    raise
+                # Havuzda beklerken sunucu bağlantıyı kapatmış; yeni bağlantıyla bir kez daha dene
+                client = await self._connect(smtp)
+                try:
+                    await client.send_message(message)
+                except Exception:
+                    self._discard(client)
+                    raise
+            except Exception:
+                self._discard(client)
+                raise
+            self._idle.append(client)
+
+    async def close(self) -> None:
+        """Boştaki bağlantıları QUIT ile kapat"""
+        idle, self._idle = self._idle, []
+        for client in idle:
+            try:
+                await client.quit()
+            except Exception:
+                self._discard(client)
+
+
+class EmailOutboxWorker:
+    """
+    email_outbox tablosundaki bekleyen mailleri toplu halde gönderir.
+    - Kayıtlar SELECT ... FOR UPDATE SKIP LOCKED ile alınır; birden fazla uvicorn worker'ı aynı maili göndermez.
+    - Başarısız gönderimler üstel bekleme (RETRY_BASE * 2^(deneme-1)) ile tekrar denenir,
+      EMAIL_OUTBOX_MAX_ATTEMPTS sonunda 'failed' olarak bırakılır.
+    - Çöken worker'ın 'sending' durumunda kalan kayıtları LOCK_TIMEOUT sonunda tekrar kuyruğa alınır.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        poll_seconds: float,
+        max_attempts: int,
+        retry_base_seconds: int,
+        lock_timeout_seconds: int,
+        pool_size: int
+    ):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self.pool_size = pool_size
+        self.pool: Optional[SmtpConnectionPool] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Metrikler (process başına)
+        self.sent_total = 0
+        self.skipped_total = 0
+        self.retried_total = 0
+        self.failed_total = 0
+        self.batches_total = 0
+        self.last_batch_size = 0
+        self.last_batch_seconds = 0.0
+        self.delivery_latency_seconds_sum = 0.0
+        self.delivery_latency_count = 0
+        self.last_delivery_latency_seconds: Optional[float] = None
+
+    # ---------- Yaşam döngüsü ----------
+
+    def start(self) -> None:
+        """Worker'ı çalışan event loop'ta başlat (lifespan içinden çağrılır)"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.pool = SmtpConnectionPool(self.pool_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info("✅ Email outbox worker başlatıldı")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=30)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+        await self.pool.close()
+        logger.info("✅ Email outbox worker durduruldu")
+
+    def wake(self) -> None:
+        """Yeni kayıt eklendiğini bildir (herhangi bir thread'den çağrılabilir)"""
+        loop = self._loop
+        if loop is None or loop.is_closed() or self._wakeup is None:
+            return
+        loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"❌ Email outbox batch hatası: {e}", exc_info=True)
+                processed = 0
+
+            # Batch doluysa kuyrukta başka kayıt olabilir; beklemeden devam et
+            if processed >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    # ---------- Gönderim ----------
+
+    async def process_batch(self) -> int:
+        """Bir batch kaydı al, eşzamanlı gönder ve sonuçları yaz. İşlenen kayıt sayısını döndürür."""
+        started = time.perf_counter()
+        batch = await asyncio.to_thread(self._claim_batch)
+        if not batch:
+            return 0
+
+        if self.pool is None:
+            self.pool = SmtpConnectionPool(self.pool_size)
+
+        smtp = get_smtp_settings()
+        results = await asyncio.gather(*(self._deliver(item, smtp) for item in batch))
+        await asyncio.to_thread(self._record_results, batch, results)
+
+        self.batches_total += 1
+        self.last_batch_size = len(batch)
+        self.last_batch_seconds = time.perf_counter() - started
+        observe_job("email_outbox_batch", self.last_batch_seconds)
+        return len(batch)
+
+    async def _deliver(self, item: dict, smtp: Optional[dict]) -> Tuple[str, Optional[str]]:
+        """(yeni durum, hata mesajı)"""
+        if smtp is None:
+            logger.warning(f"📧 [EMAIL - SMTP AYARLARI YOK] To: {item['to_email']}, Subject: {item['subject']}")
+            return EmailOutboxStatus.SKIPPED, None
+
+        try:
+            message = build_email_message(
+                smtp["from"], item["to_email"], item["subject"], item["body_html"], item["body_text"]
+            )
+            await self.pool.send(message, smtp)
+            logger.info(f"✅ Email başarıyla gönderildi: {item['to_email']}, Subject: {item['subject']}")
+            return EmailOutboxStatus.SENT, None
+        except Exception as e:
+            logger.warning(f"⚠️ Email gönderilemedi (deneme {item['attempts']}): {item['to_email']}, Error: {e}")
+            return EmailOutboxStatus.PENDING, f"{type(e).__name__}: {e}"
+
+    def _claim_batch(self) -> List[dict]:
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            stale_before = now - timedelta(seconds=self.lock_timeout_seconds)
+
+            rows = (
+                db.query(EmailOutbox)
+                .filter(or_(
+                    and_(EmailOutbox.status == EmailOutboxStatus.PENDING, EmailOutbox.next_attempt_at <= now),
+                    and_(EmailOutbox.status == EmailOutboxStatus.SENDING, EmailOutbox.locked_at < stale_before)
+                ))
+                .order_by(EmailOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+
+            batch = []
+            for row in rows:
+                row.status = EmailOutboxStatus.SENDING
+                row.locked_at = now
+                row.attempts = (row.attempts or 0) + 1
+                batch.append({
+                    "id": row.id,
+                    "to_email": row.to_email,
+                    "subject": row.subject,
+                    "body_html": row.body_html,
+                    "body_text": row.body_text,
+                    "attempts": row.attempts,
+                    "created_at": _as_utc(row.created_at),
+                })
+            db.commit()
+            return batch
+        finally:
+            db.close()
+
+    def _record_results(self, batch: List[dict], results: List[Tuple[str, Optional[str]]]) -> None:
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            delivered = {EmailOutboxStatus.SENT: [], EmailOutboxStatus.SKIPPED: []}
+
+            for item, (new_status, error) in zip(batch, results):
+                if new_status in delivered:
+                    delivered[new_status].append(item["id"])
+                    if item["created_at"] is not None:
+                        latency = max((now - item["created_at"]).total_seconds(), 0.0)
+                        self.delivery_latency_seconds_sum += latency
+                        self.delivery_latency_count += 1
+                        self.last_delivery_latency_seconds = latency
+                    continue
+
+                if item["attempts"] >= self.max_attempts:
+                    values = {"status": EmailOutboxStatus.FAILED}
+                    self.failed_total += 1
+                    logger.error(f"❌ Email {item['attempts']} denemede gönderilemedi, bırakıldı: {item['to_email']}")
+                else:
+                    delay = min(self.retry_base_seconds * 2 ** (item["attempts"] - 1), MAX_RETRY_DELAY_SECONDS)
+                    values = {"status": EmailOutboxStatus.PENDING, "next_attempt_at": now + timedelta(seconds=delay)}
+                    self.retried_total += 1
+                values.update(last_error=(error or "")[:2000], locked_at=None)
+                db.query(EmailOutbox).filter(EmailOutbox.id == item["id"]).update(values, synchronize_session=False)
+
+            for new_status, ids in delivered.items():
+                if ids:
+                    db.query(EmailOutbox).filter(EmailOutbox.id.in_(ids)).update(
+                        {"status": new_status, "sent_at": now, "locked_at": None, "last_error": None},
+                        synchronize_session=False
+                    )
+            db.commit()
+
+            self.sent_total += len(delivered[EmailOutboxStatus.SENT])
+            self.skipped_total += len(delivered[EmailOutboxStatus.SKIPPED])
+        finally:
+            db.close()
+
+    # ---------- Metrikler ----------
+
+    def get_metrics(self, db: Session) -> dict:
+        """Kuyruk derinliği (DB) + bu process'in gönderim sayaçları ve gecikmeleri"""
+        depth = dict(
+            db.query(EmailOutbox.status, func.count())
+            .filter(EmailOutbox.status.in_([
+                EmailOutboxStatus.PENDING, EmailOutboxStatus.SENDING, EmailOutboxStatus.FAILED
+            ]))
+            .group_by(EmailOutbox.status)
+            .all()
+        )
+        oldest_pending = (
+            db.query(func.min(EmailOutbox.created_at))
+            .filter(EmailOutbox.status == EmailOutboxStatus.PENDING)
+            .scalar()
+        )
+        oldest_pending_age = None
+        if oldest_pending is not None:
+            oldest_pending_age = round((datetime.now(timezone.utc) - _as_utc(oldest_pending)).total_seconds(), 3)
+
+        avg_latency = None
+        if self.delivery_latency_count:
+            avg_latency = round(self.delivery_latency_seconds_sum / self.delivery_latency_count, 3)
+
+        return {
+            "queue": {
+                "pending": depth.get(EmailOutboxStatus.PENDING, 0),
+                "sending": depth.get(EmailOutboxStatus.SENDING, 0),
+                "failed": depth.get(EmailOutboxStatus.FAILED, 0),
+                "oldest_pending_age_seconds": oldest_pending_age,
+            },
+            "worker": {
+                "running": self._task is not None and not self._task.done(),
+                "sent_total": self.sent_total,
+                "skipped_total": self.skipped_total,
+                "retried_total": self.retried_total,
+                "failed_total": self.failed_total,
+                "batches_total": self.batches_total,
+                "last_batch_size": self.last_batch_size,
+                "last_batch_seconds": round(self.last_batch_seconds, 3),
+                "avg_delivery_latency_seconds": avg_latency,
+                "last_delivery_latency_seconds": (
+                    round(self.last_delivery_latency_seconds, 3)
+                    if self.last_delivery_latency_seconds is not None else None
+                ),
+                "smtp_pool_size": self.pool_size,
+            },
+        }
+
+
+email_outbox_worker = EmailOutboxWorker(
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    poll_seconds=settings.EMAIL_OUTBOX_POLL_SECONDS,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    retry_base_seconds=settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS,
+    lock_timeout_seconds=settings.EMAIL_OUTBOX_LOCK_TIMEOUT_SECONDS,
+    pool_size=settings.SMTP_POOL_SIZE
+)
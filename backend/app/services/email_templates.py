@@ -0,0 +1,105 @@
+import html
+import os
+import re
+from functools import lru_cache
+from typing import Iterable, Mapping
+
+# app/templates/email
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "email")
+
+# $$ (kaçış), ${name} veya $name
+_PLACEHOLDER = re.compile(r"\$(?:(\$)|\{([A-Za-z_][A-Za-z0-9_]*)\}|([A-Za-z_][A-Za-z0-9_]*))")
+
+# HTML'de kaçış gerektiren karakterler
+_NEEDS_ESCAPE = re.compile(r"[&<>\"']").search
+_escape = html.escape
+
+
+class SafeHtml(str):
+    """Escape edilmeden şablona yerleştirilecek, önceden oluşturulmuş HTML parçası"""
+
+
+class EmailTemplate:
+    """
+    $name / ${name} yer tutuculu email şablonu.
+    Kaynak yüklemede bir kez str.format kalıbına derlenir; render sadece değerleri yerleştirir.
+    HTML şablonlarında (autoescape) SafeHtml olmayan değerler escape edilir.
+    """
+
+    def __init__(self, source: str, autoescape: bool = True, name: str = "<string>"):
+        self.name = name
+        self.source = source
+        self.autoescape = autoescape
+        self.fields = set()
+        self._format = self._compile(source)
+
+    def _compile(self, source: str):
+        parts = []
+        pos = 0
+        for match in _PLACEHOLDER.finditer(source):
+            parts.append(source[pos:match.start()].replace("{", "{{").replace("}", "}}"))
+            field = match.group(2) or match.group(3)
+            if field is None:
+                parts.append("$")
+            else:
+                self.fields.add(field)
+                parts.append("{" + field + "}")
+            pos = match.end()
+        parts.append(source[pos:].replace("{", "{{").replace("}", "}}"))
+        return "".join(parts).format_map
+
+    def _prepare(self, values: Mapping) -> dict:
+        if not self.autoescape:
+            return {key: "" if value is None else value for key, value in values.items()}
+        prepared = {}
+        for key, value in values.items():
+            value_type = type(value)
+            if value_type is str:
+                # Kaçış gerektiren karakter yoksa escape maliyetinden kaçın
+                prepared[key] = _escape(value) if _NEEDS_ESCAPE(value) else value
+            elif value_type is SafeHtml or value_type is int:
+                prepared[key] = value
+            elif value is None:
+                prepared[key] = ""
+            else:
+                prepared[key] = _escape(str(value))
+        return prepared
+
+    def render(self, **values) -> str:
+        """Şablonu render et (eksik yer tutucu KeyError fırlatır)"""
+        result = self._format(self._prepare(values))
+        return SafeHtml(result) if self.autoescape else result
+
+    def render_many(self, rows: Iterable[Mapping]) -> SafeHtml:
+        """Satır şablonunu her satır için render edip birleştir (rapor tabloları)"""
+        format_row = self._format
+        prepare = self._prepare
+        return SafeHtml("".join([format_row(prepare(row)) for row in rows]))
+
+    def partial(self, **values) -> "EmailTemplate":
+        """Verilen (statik) değerleri kaynağa gömüp yeni bir derlenmiş şablon döndür"""
+        prepared = self._prepare(values)
+
+        def replace(match):
+            field = match.group(2) or match.group(3)
+            if field in prepared:
+                return str(prepared[field]).replace("$", "$$")
+            return match.group(0)
+
+        return EmailTemplate(_PLACEHOLDER.sub(replace, self.source), self.autoescape, self.name)
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> EmailTemplate:
+    """app/templates/email altındaki şablonu yükle ve derle (process başına bir kez)"""
+    with open(os.path.join(TEMPLATE_DIR, name), encoding="utf-8") as f:
+        source = f.read()
+    return EmailTemplate(source, autoescape=name.endswith(".html"), name=name)
+
+
+def load_email_templates() -> int:
+    """Tüm şablonları önceden yükle (uygulama başlangıcında çağrılır). Yüklenen şablon sayısını döndürür."""
+    names = sorted(f for f in os.listdir(TEMPLATE_DIR) if f.endswith((".html", ".txt")))
+    for name in names:
+        get_template(name)
+    return len(names)
@@ -0,0 +1,512 @@
+import csv
+import io
+import logging
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import pandas as pd
+from sqlalchemy import and_, func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import observe_job
+from app.core.reference_cache import POSM, PRINCIPALS, TERRITORIES, mark_changed
+from app.core.security import get_password_hash
+from app.db.session import SessionLocal
+from app.models.dealer import Dealer
+from app.models.import_job import ImportJob
+from app.models.posm import Posm
+from app.models.territory import Territory
+from app.models.user import User, UserRole
+from app.services.import_sources import SOURCE_EXTENSIONS, SOURCE_READERS, read_source
+from app.services.posm_stock_service import PosmStockService
+
+logger = logging.getLogger(__name__)
+
+ERROR_REPORT_COLUMNS = ["Satır", "Kayıt", "Hata"]
+DEFAULT_PASSWORD = "Password123!"
+
+# (dosyadaki satır no, kaydın anahtarı, hata)
+RowError = Tuple[int, str, str]
+ProgressCallback = Callable[[ImportJob], None]
+
+
+def get_import_dir() -> str:
+    """Yüklenen import dosyalarının saklandığı dizin (IMPORT_DIR yoksa BACKUP_DIR/imports)"""
+    return settings.IMPORT_DIR or os.path.join(settings.BACKUP_DIR, "imports")
+
+
+# ---------- Vektörel temizlik yardımcıları ----------
+
+def _find_column(df: pd.DataFrame, aliases: List[str]) -> Optional[str]:
+    for alias in aliases:
+        if alias in df.columns:
+            return alias
+    return None
+
+
+def _text(df: pd.DataFrame, aliases: List[str]) -> pd.Series:
+    column = _find_column(df, aliases)
+    if column is None:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[column].fillna("").astype(str).str.strip()
+
+
+def _number(df: pd.DataFrame, aliases: List[str]) -> pd.Series:
+    """Ondalık virgülü de kabul eder; sayı olmayan değerler NaN olur"""
+    return pd.to_numeric(_text(df, aliases).str.replace(",", ".", regex=False), errors="coerce")
+
+
+def _reject(rows: pd.DataFrame, mask: pd.Series, message: str, key: str, errors: List[RowError]) -> pd.DataFrame:
+    """Maskedeki satırları hata listesine ekleyip çıkar"""
+    errors.extend((row, value, message) for row, value in zip(rows.loc[mask, "row"], rows.loc[mask, key]))
+    return rows[~mask]
+
+
+def _reject_duplicates(rows: pd.DataFrame, key: str, errors: List[RowError]) -> pd.DataFrame:
+    """Dosya içinde tekrar eden anahtarlarda son satır kullanılır (tek INSERT aynı satırı iki kez güncelleyemez)"""
+    return _reject(rows, rows[key].duplicated(keep="last"), "Tekrar eden kayıt - son görünen değer kullanıldı", key, errors)
+
+
+def _to_records(rows: pd.DataFrame) -> List[dict]:
+    values = rows.drop(columns="row")
+    return values.astype(object).where(values.notna(), None).to_dict("records")
+
+
+def build_error_report(errors: List[RowError]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    writer.writerow(ERROR_REPORT_COLUMNS)
+    writer.writerows(sorted(errors))
+    return buffer.getvalue()
+
+
+# ---------- Import tipleri ----------
+
+class BaseImporter:
+    """
+    Bir import tipinin kolon eşlemesi, vektörel temizliği ve chunk yazımı.
+    prepare() deterministiktir: aynı dosya her okunduğunda aynı sırada aynı kayıtları üretir,
+    böylece yarıda kalan iş checkpoint'ten devam edebilir.
+    """
+    
+    kind = ""
+    label = ""
+    sheet_candidates: List[str] = []
+    columns: Dict[str, List[str]] = {}  # alan -> kabul edilen kolon başlıkları
+    required_fields: Tuple[str, ...] = ()
+    requires_depot = False
+    
+    def __init__(self, db: Session, job: ImportJob):
+        self.db = db
+        self.job = job
+        self.options = job.options or {}
+    
+    def check_columns(self, df: pd.DataFrame) -> None:
+        missing = [self.columns[field][0] for field in self.required_fields if _find_column(df, self.columns[field]) is None]
+        if missing:
+            required = ", ".join(self.columns[field][0] for field in self.required_fields)
+            raise ValueError(f"Eksik kolon: {', '.join(missing)}. Gerekli kolonlar: {required}")
+    
+    def prepare(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[RowError]]:
+        """Temiz kayıtlar ('row' kolonu dosyadaki satır numarasıdır) ve satır hataları"""
+        raise NotImplementedError
+    
+    def write(self, records: List[dict]) -> int:
+        """Chunk'ı tek ifadeyle yaz; yeni eklenen kayıt sayısını döndür"""
+        raise NotImplementedError
+
+
+class DealerImporter(BaseImporter):
+    kind = "dealers"
+    label = "Bayi"
+    sheet_candidates = ["Bayiler", "Bayi", "Dealer", "Bayiler Listesi"]
+    columns = {
+        "code": ["Bayi Kodu"],
+        "name": ["Bayi Adı"],
+        "territory": ["Territory"],
+        "latitude": ["Latitude"],
+        "longitude": ["Longitude"],
+    }
+    required_fields = ("code", "name")
+    requires_depot = True
+    
+    def prepare(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[RowError]]:
+        territory_names = _text(df, self.columns["territory"])
+        if self.options.get("create_territories"):
+            self._create_territories(set(territory_names) - {""})
+        territory_ids = {name: territory_id for territory_id, name in self.db.query(Territory.id, Territory.name)}
+        self.existing_codes: Set[str] = {
+            code for (code,) in self.db.query(Dealer.code).filter(Dealer.depot_id == self.job.depot_id)
+        }
+        
+        latitude = _number(df, self.columns["latitude"])
+        longitude = _number(df, self.columns["longitude"])
+        rows = pd.DataFrame({
+            "row": df.index + 2,  # Başlık satırı + 1 tabanlı numara (Excel'deki satır)
+            "code": _text(df, self.columns["code"]),
+            "name": _text(df, self.columns["name"]),
+            "territory_id": territory_names.map(territory_ids).astype("Int64"),
+            # Sayı olmayan veya aralık dışı koordinatlar boş bırakılır
+            "latitude": latitude.where(latitude.abs() <= 90),
+            "longitude": longitude.where(longitude.abs() <= 180),
+        })
+        errors: List[RowError] = []
+        rows = _reject(rows, (rows["code"] == "") | (rows["name"] == ""), "Kod veya isim boş", "code", errors)
+        rows = _reject_duplicates(rows, "code", errors)
+        return rows, errors
+    
+    def _create_territories(self, names: Set[str]) -> None:
+        if names:
+            stmt = insert(Territory).values([{"name": name} for name in sorted(names)])
+            self.db.execute(stmt.on_conflict_do_nothing(index_elements=[Territory.name]))
+            mark_changed(self.db, TERRITORIES)
+    
+    def write(self, records: List[dict]) -> int:
+        for record in records:
+            record["depot_id"] = self.job.depot_id
+        stmt = insert(Dealer).values(records)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Dealer.code, Dealer.depot_id],
+            set_={
+                "name": stmt.excluded.name,
+                "territory_id": stmt.excluded.territory_id,
+                "latitude": stmt.excluded.latitude,
+                "longitude": stmt.excluded.longitude,
+            }
+        )
+        self.db.execute(stmt)
+        # Depo bazlı territory listesi bayilerden türetilir
+        mark_changed(self.db, TERRITORIES)
+        return sum(1 for record in records if record["code"] not in self.existing_codes)
+
+
+class PosmImporter(BaseImporter):
+    kind = "posm"
+    label = "POSM"
+    sheet_candidates = ["POSM", "Posm", "Posm Listesi", "POSM List"]
+    columns = {
+        "name": ["Posm Adı", "POSM Adı", "Posm", "POSM"],
+        "ready_count": ["Hazır Adet"],
+        "repair_pending_count": ["Tamir Bekleyen Adet"],
+    }
+    required_fields = ("name",)
+    requires_depot = True
+    
+    def prepare(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[RowError]]:
+        self.existing_names: Set[str] = {
+            name for (name,) in self.db.query(Posm.name).filter(Posm.depot_id == self.job.depot_id)
+        }
+        rows = pd.DataFrame({
+            "row": df.index + 2,
+            "name": _text(df, self.columns["name"]),
+            # Boş veya sayı olmayan adetler 0 kabul edilir
+            "ready_count": _number(df, self.columns["ready_count"]).fillna(0).clip(lower=0).astype(int),
+            "repair_pending_count": _number(df, self.columns["repair_pending_count"]).fillna(0).clip(lower=0).astype(int),
+        })
+        errors: List[RowError] = []
+        rows = _reject(rows, rows["name"] == "", "POSM adı boş", "name", errors)
+        rows = _reject_duplicates(rows, "name", errors)
+        return rows, errors
+    
+    def write(self, records: List[dict]) -> int:
+        for record in records:
+            record["depot_id"] = self.job.depot_id
+        stmt = insert(Posm).values(records)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Posm.name, Posm.depot_id],
+            set_={
+                "ready_count": stmt.excluded.ready_count,
+                "repair_pending_count": stmt.excluded.repair_pending_count,
+                "updated_at": func.now(),
+            }
+        )
+        posm_ids = [posm_id for (posm_id,) in self.db.execute(stmt.returning(Posm.id))]
+        # Adetler mutlak yazıldı; fark stok defterine import hareketi olarak eklenir (upsert satırları kilitli tutar)
+        PosmStockService(self.db).record_balances(posm_ids, "import", created_by=self.job.created_by)
+        created = sum(1 for record in records if record["name"] not in self.existing_names)
+        if created:
+            # Katalog yalnızca yeni POSM eklendiğinde değişir (adet güncellemeleri önbelleği etkilemez)
+            mark_changed(self.db, POSM)
+        return created
+
+
+ROLE_ALIASES = {
+    "admin": UserRole.ADMIN.value,
+    "administrator": UserRole.ADMIN.value,
+    "yönetici": UserRole.ADMIN.value,
+    "tech": UserRole.TECH.value,
+    "technical": UserRole.TECH.value,
+    "teknik": UserRole.TECH.value,
+    "teknik sorumlu": UserRole.TECH.value,
+}
+
+
+class UserImporter(BaseImporter):
+    kind = "users"
+    label = "Kullanıcı"
+    sheet_candidates = ["User", "Users", "Kullanıcılar"]
+    columns = {
+        "name": ["İsim Soyisim", "Name", "İsim"],
+        "email": ["E-Mail", "Email", "E-posta"],
+        "role": ["Rol", "Role"],
+        "password": ["Şifre", "Password"],
+    }
+    required_fields = ("name", "email")
+    
+    def prepare(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[RowError]]:
+        self.existing_emails: Set[str] = {email for (email,) in self.db.query(User.email)}
+        self._default_password_hash: Optional[str] = None
+        rows = pd.DataFrame({
+            "row": df.index + 2,
+            "name": _text(df, self.columns["name"]),
+            "email": _text(df, self.columns["email"]),
+            "role": _text(df, self.columns["role"]).str.lower().map(ROLE_ALIASES).fillna(UserRole.USER.value),
+            "password": _text(df, self.columns["password"]),
+        })
+        errors: List[RowError] = []
+        rows = _reject(rows, (rows["name"] == "") | (rows["email"] == ""), "İsim veya e-posta boş", "email", errors)
+        rows = _reject_duplicates(rows, "email", errors)
+        return rows, errors
+    
+    def write(self, records: List[dict]) -> int:
+        # Şifresi verilen kullanıcıların şifresi güncellenir; verilmeyenlerde mevcut şifre korunur,
+        # yeni kullanıcılar varsayılan şifreyle oluşturulur (hash iş başına bir kez hesaplanır)
+        with_password = []
+        without_password = []
+        for record in records:
+            password = record.pop("password")
+            if password:
+                with_password.append(dict(record, password_hash=get_password_hash(password)))
+            else:
+                if self._default_password_hash is None:
+                    self._default_password_hash = get_password_hash(DEFAULT_PASSWORD)
+                without_password.append(dict(record, password_hash=self._default_password_hash))
+        
+        for group, update_password in ((with_password, True), (without_password, False)):
+            if not group:
+                continue
+            stmt = insert(User).values(group)
+            update = {"name": stmt.excluded.name, "role": stmt.excluded.role, "updated_at": func.now()}
+            if update_password:
+                update["password_hash"] = stmt.excluded.password_hash
+            self.db.execute(stmt.on_conflict_do_update(index_elements=[User.email], set_=update))
+        # Mevcut kullanıcıların rolü/ismi değişmiş olabilir: önbellekteki principal'lar yeniden yüklensin
+        mark_changed(self.db, PRINCIPALS)
+        
+        return sum(1 for record in records if record["email"] not in self.existing_emails)
+
+
+IMPORTERS: Dict[str, type] = {importer.kind: importer for importer in (DealerImporter, PosmImporter, UserImporter)}
+
+
+# ---------- İş yönetimi ----------
+
+class ImportJobService:
+    """
+    Import işleri: kaynak dosya diske kaydedilir, iş import_jobs tablosunda izlenir ve arka planda
+    (admin API) ya da doğrudan (CLI script'leri) çalıştırılır. Temiz kayıtlar IMPORT_CHUNK_SIZE'lık gruplar
+    halinde INSERT ... ON CONFLICT DO UPDATE ile yazılır; her chunk checkpoint ile aynı transaction'da commit
+    edilir, yarıda kalan iş yeniden çalıştırıldığında yazılmış chunk'ları atlar.
+    Birden fazla worker olduğu için iş durumu veritabanındadır; çalıştırma hakkı koşullu UPDATE ile alınır.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def create_job(
+        self,
+        kind: str,
+        source_type: str,
+        filename: str,
+        contents: bytes,
+        depot_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        options: Optional[dict] = None
+    ) -> ImportJob:
+        importer = IMPORTERS.get(kind)
+        if importer is None:
+            raise ValueError(f"Bilinmeyen import tipi: {kind}. Desteklenenler: {', '.join(IMPORTERS)}")
+        if source_type not in SOURCE_READERS:
+            raise ValueError(f"Bilinmeyen kaynak tipi: {source_type}. Desteklenenler: {', '.join(SOURCE_READERS)}")
+        if not filename.lower().endswith(SOURCE_EXTENSIONS[source_type]):
+            raise ValueError(f"{source_type} kaynağı için desteklenen formatlar: {', '.join(SOURCE_EXTENSIONS[source_type])}")
+        if importer.requires_depot and not depot_id:
+            raise ValueError(f"{importer.label} import'u için depot_id gereklidir")
+        
+        job = ImportJob(
+            kind=kind,
+            status="pending",
+            source_type=source_type,
+            filename=os.path.basename(filename),
+            depot_id=depot_id,
+            options=options or None,
+            created_by=user_id
+        )
+        self.db.add(job)
+        self.db.flush()
+        
+        # Dosya adı yalnızca görüntüleme içindir; diskteki ad iş id'si ile güvenli hale getirilir
+        safe_name = re.sub(r"[^\w.\-]", "_", job.filename) or "import"
+        path = os.path.join(get_import_dir(), f"{job.id}_{safe_name}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(contents)
+        job.source_path = path
+        
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+    
+    def get_job(self, job_id: int, kind: Optional[str] = None) -> Optional[ImportJob]:
+        query = self.db.query(ImportJob).filter(ImportJob.id == job_id)
+        if kind:
+            query = query.filter(ImportJob.kind == kind)
+        return query.first()
+    
+    def list_jobs(self, kind: Optional[str] = None, limit: int = 50) -> List[ImportJob]:
+        query = self.db.query(ImportJob)
+        if kind:
+            query = query.filter(ImportJob.kind == kind)
+        return query.order_by(ImportJob.id.desc()).limit(limit).all()
+    
+    def _claim(self, job_id: int) -> bool:
+        """Bekleyen, başarısız olmuş veya IMPORT_JOB_STALE_SECONDS boyunca ilerlemeyen işi çalıştırmak üzere al"""
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+        claimed = self.db.query(ImportJob).filter(
+            ImportJob.id == job_id,
+            or_(
+                ImportJob.status.in_(("pending", "failed")),
+                and_(ImportJob.status == "running", ImportJob.updated_at < stale_before)
+            )
+        ).update({"status": "running", "message": None, "updated_at": now}, synchronize_session=False)
+        self.db.commit()
+        return claimed == 1
+    
+    def run_job(self, job_id: int, progress: Optional[ProgressCallback] = None) -> ImportJob:
+        """
+        İşi çalıştır veya kaldığı yerden devam ettir. Hata olursa iş 'failed' olarak işaretlenir;
+        commit edilmiş chunk'lar kalır ve iş tekrar çalıştırıldığında checkpoint'ten devam eder.
+        """
+        if not self._claim(job_id):
+            raise ValueError("İş çalıştırılamaz: bulunamadı, tamamlanmış veya başka bir işlem tarafından çalıştırılıyor")
+        
+        job = self.get_job(job_id)
+        if job.started_at is None:
+            job.started_at = datetime.now(timezone.utc)
+        importer = IMPORTERS[job.kind](self.db, job)
+        
+        try:
+            self._import(job, importer, progress)
+            job.status = "completed"
+            job.message = f"{importer.label} import'u tamamlandı"
+            self._remove_source(job)
+        except Exception as e:
+            self.db.rollback()
+            job.status = "failed"
+            job.message = str(e)[:1000]
+            if not isinstance(e, (ValueError, FileNotFoundError)):
+                logger.error(f"❌ Import hatası (iş {job.id}, {job.kind}): {e}", exc_info=True)
+        
+        job.finished_at = datetime.now(timezone.utc)
+        self.db.commit()
+        return job
+    
+    def _import(self, job: ImportJob, importer: BaseImporter, progress: Optional[ProgressCallback]) -> None:
+        with open(job.source_path, "rb") as f:
+            contents = f.read()
+        df = read_source(job.source_type, contents, job.filename, importer.sheet_candidates)
+        importer.check_columns(df)
+        rows, errors = importer.prepare(df)
+        records = _to_records(rows)
+        
+        if job.checkpoint_row == 0:
+            # İlk çalışma (veya hiçbir chunk yazılmadan kesilmiş iş): sayaçlar baştan
+            job.total_rows = len(df)
+            job.processed_rows = len(errors)
+            job.inserted_count = 0
+            job.updated_count = 0
+            job.error_count = len(errors)
+            job.error_report = build_error_report(errors) if errors else None
+        self.db.commit()
+        
+        chunk_size = max(1, settings.IMPORT_CHUNK_SIZE)
+        for start in range(job.checkpoint_row, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            inserted = importer.write(chunk)
+        
+            job.inserted_count += inserted
+            job.updated_count += len(chunk) - inserted
+            job.processed_rows += len(chunk)
+            job.checkpoint_row = start + len(chunk)
+            self.db.commit()
+            if progress:
+                progress(job)
+    
+    def _remove_source(self, job: ImportJob) -> None:
+        if job.source_path and os.path.exists(job.source_path):
+            try:
+                os.remove(job.source_path)
+            except OSError as e:
+                logger.warning(f"⚠️ Import dosyası silinemedi ({job.source_path}): {e}")
+        job.source_path = None
+
+
+def error_preview(job: ImportJob, limit: int = 10) -> List[str]:
+    """Hata raporunun ilk satırları ("Satır 5: ..." biçiminde)"""
+    if not job.error_report:
+        return []
+    reader = csv.reader(io.StringIO(job.error_report), delimiter=";")
+    next(reader, None)
+    preview = []
+    for row_number, key, error in reader:
+        preview.append(f"Satır {row_number}: {error}" + (f" ('{key}')" if key else ""))
+        if len(preview) >= limit:
+            break
+    return preview
+
+
+def job_to_dict(job: ImportJob) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "source_type": job.source_type,
+        "filename": job.filename,
+        "depot_id": job.depot_id,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "checkpoint_row": job.checkpoint_row,
+        "imported": job.inserted_count,
+        "updated": job.updated_count,
+        "error_count": job.error_count,
+        "errors": error_preview(job),
+        "message": job.message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def run_import_job(job_id: int) -> None:
+    """Arka plan görevi: kendi session'ı ile import işini çalıştırır veya devam ettirir"""
+    db = SessionLocal()
+    started = time.perf_counter()
+    ok = False
+    kind = "unknown"
+    try:
+        job = ImportJobService(db).run_job(job_id)
+        kind = job.kind
+        ok = job.status == "completed"
+        logger.info(
+            f"📥 Import işi {job_id} ({job.kind}) {job.status}: {job.inserted_count} yeni, "
+            f"{job.updated_count} güncellenen, {job.error_count} hata"
+        )
+    except Exception as e:
+        logger.error(f"❌ Import işi {job_id} çalıştırılamadı: {e}", exc_info=True)
+    finally:
+        db.close()
+        observe_job(f"import.{kind}", time.perf_counter() - started, ok)
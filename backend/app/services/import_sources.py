@@ -0,0 +1,93 @@
+import io
+import os
+from typing import Callable, Dict, List, Optional
+import pandas as pd
+
+# Import kaynak okuyucuları: (dosya içeriği, dosya adı, sheet aday isimleri) -> tüm hücreleri metin olan DataFrame.
+# Değerler metin olarak okunur (bayi kodlarındaki baştaki sıfırlar korunur); sayı dönüşümü import tarafında yapılır.
+
+SourceReader = Callable[[bytes, str, List[str]], pd.DataFrame]
+
+
+def _finalize(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = [str(column).strip() for column in df.columns]
+    # Tamamen boş satırlar (Excel/Sheets'in sondaki boş satırları) atlanır; index korunur (satır numarası için)
+    return df.dropna(how="all")
+
+
+def _find_sheet(sheet_names: List[str], candidates: List[str]) -> Optional[str]:
+    wanted = {candidate.strip().lower() for candidate in candidates}
+    for name in sheet_names:
+        if name.strip().lower() in wanted:
+            return name
+    return None
+
+
+def read_csv_source(contents: bytes, filename: str, sheet_candidates: List[str]) -> pd.DataFrame:
+    """Tek tablo içeren CSV dosyası (UTF-8, BOM'lu olabilir)"""
+    return _finalize(pd.read_csv(io.BytesIO(contents), dtype=str, encoding="utf-8-sig"))
+
+
+def read_excel_source(contents: bytes, filename: str, sheet_candidates: List[str]) -> pd.DataFrame:
+    """Excel dosyası: aday isimlerden biriyle eşleşen sheet, tek sheet varsa o sheet"""
+    workbook = pd.ExcelFile(io.BytesIO(contents))
+    sheet_name = _find_sheet(workbook.sheet_names, sheet_candidates)
+    if sheet_name is None:
+        if len(workbook.sheet_names) != 1:
+            raise ValueError(
+                f"Sheet bulunamadı (beklenen: {', '.join(sheet_candidates)}; dosyadaki: {', '.join(workbook.sheet_names)})"
+            )
+        sheet_name = workbook.sheet_names[0]
+    return _finalize(workbook.parse(sheet_name, dtype=str))
+
+
+def read_sheets_export_source(contents: bytes, filename: str, sheet_candidates: List[str]) -> pd.DataFrame:
+    """
+    Google Sheets dışa aktarımı: tüm spreadsheet .xlsx olarak (sheet isimleri korunur) ya da tek sayfa .csv olarak.
+    Sheets tek sayfa CSV'yi "<Spreadsheet adı> - <Sayfa adı>.csv" diye adlandırır; sayfa adı biliniyorsa kontrol edilir.
+    """
+    if filename.lower().endswith(".csv"):
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        if " - " in stem:
+            page = stem.rsplit(" - ", 1)[1]
+            if _find_sheet([page], sheet_candidates) is None:
+                raise ValueError(f"Dosya '{page}' sayfasına ait; beklenen: {', '.join(sheet_candidates)}")
+        return read_csv_source(contents, filename, sheet_candidates)
+
+    workbook = pd.ExcelFile(io.BytesIO(contents))
+    sheet_name = _find_sheet(workbook.sheet_names, sheet_candidates)
+    if sheet_name is None:
+        raise ValueError(f"Sheets dışa aktarımında sayfa bulunamadı: {', '.join(sheet_candidates)}")
+    return _finalize(workbook.parse(sheet_name, dtype=str))
+
+
+SOURCE_READERS: Dict[str, SourceReader] = {
+    "csv": read_csv_source,
+    "xlsx": read_excel_source,
+    "sheets": read_sheets_export_source,
+}
+
+SOURCE_EXTENSIONS = {
+    "csv": (".csv",),
+    "xlsx": (".xlsx", ".xls"),
+    "sheets": (".xlsx", ".csv"),
+}
+
+
+def detect_source_type(filename: str) -> str:
+    """Dosya uzantısından kaynak tipi (Sheets dışa aktarımı açıkça seçilmelidir)"""
+    lower_name = filename.lower()
+    if lower_name.endswith(".csv"):
+        return "csv"
+    if lower_name.endswith((".xlsx", ".xls")):
+        return "xlsx"
+    raise ValueError("Desteklenen formatlar: .xlsx, .xls, .csv")
+
+
+def read_source(source_type: str, contents: bytes, filename: str, sheet_candidates: List[str]) -> pd.DataFrame:
+    reader = SOURCE_READERS.get(source_type)
+    if reader is None:
+        raise ValueError(f"Bilinmeyen kaynak tipi: {source_type}")
+    if not filename.lower().endswith(SOURCE_EXTENSIONS[source_type]):
+        raise ValueError(f"{source_type} kaynağı için desteklenen formatlar: {', '.join(SOURCE_EXTENSIONS[source_type])}")
+    return reader(contents, filename, sheet_candidates)
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import observe_job
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Bildirim işi: kendi DB session'ı ile çalışan coroutine fonksiyonu
+NotificationJob = Callable[[Session], Awaitable[None]]
+
+
+class NotificationDispatcher:
+    """
+    Bildirim işlerini tek, uzun ömürlü bir event loop üzerinde çalıştırır.
+    Loop kendi thread'inde döner (lifespan başlatır/durdurur); submit() herhangi bir thread'den çağrılabilir.
+    Aynı anda en fazla max_concurrency iş çalışır, her iş kendi DB session'ını alır.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: set = set()
+        # Dispatcher çalışmıyorken çağıranın loop'unda başlatılan işler (GC'ye karşı referans tutulur)
+        self._local_tasks: set = set()
+        self._accepting = False
+        self._lock = threading.Lock()
+
+        # Metrikler
+        self.submitted_total = 0
+        self.completed_total = 0
+        self.failed_total = 0
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run_loop():
+            asyncio.set_event_loop(loop)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            loop.call_soon(started.set)
+            loop.run_forever()
+            loop.close()
+
+        self._loop = loop
+        self._thread = threading.Thread(target=run_loop, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+        started.wait()
+        with self._lock:
+            self._accepting = True
+        logger.info(f"✅ Bildirim dispatcher başlatıldı (eşzamanlılık: {self.max_concurrency})")
+
+    def stop(self, timeout: float = 30) -> None:
+        """
+        Yeni işleri reddet, bekleyen işlerin bitmesini bekle (en fazla timeout saniye), sonra loop'u durdur.
+        Durdurulurken dışarıdan gelen işler çağıranın loop'unda çalışır; çalışan işlerin kendi loop'tan
+        eklediği alt işler (ör. teknik sorumlulara dağıtım) kabul edilir ve onlar da beklenir.
+        """
+        if self._thread is None:
+            return
+        with self._lock:
+            self._accepting = False
+        
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                break
+            for future in pending:
+                try:
+                    future.result(timeout=max(0, deadline - time.monotonic()))
+                except Exception:
+                    pass
+            if time.monotonic() >= deadline:
+                logger.warning(f"⚠️ Bildirim dispatcher durdurulurken {self.in_flight} iş tamamlanmadı")
+                break
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        self._loop = None
+        logger.info("✅ Bildirim dispatcher durduruldu")
+
+    def submit(self, job: NotificationJob, label: str = "bildirim") -> Optional[Future]:
+        """
+        İşi kuyruğa al ve hemen dön. Dispatcher çalışmıyorsa veya durduruluyorsa (script, lifespan'siz test,
+        kapanış sırasında biten istek) iş çağıranın event loop'unda task olarak başlatılır; loop yoksa
+        çağıran thread'de çalıştırılır.
+        """
+        self.submitted_total += 1
+        future = None
+        with self._lock:
+            # Kapanışta sadece dispatcher loop'undaki işlerin eklediği alt işler kabul edilir
+            own_thread = threading.current_thread() is self._thread
+            if self.running and (self._accepting or own_thread):
+                future = asyncio.run_coroutine_threadsafe(self._run_limited(job, label), self._loop)
+                self._pending.add(future)
+        if future is not None:
+            future.add_done_callback(self._discard)
+            return future
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self._run_job(job, label))
+            return None
+        task = loop.create_task(self._run_job(job, label))
+        self._local_tasks.add(task)
+        task.add_done_callback(self._local_tasks.discard)
+        return None
+
+    def _discard(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    async def _run_limited(self, job: NotificationJob, label: str) -> None:
+        async with self._semaphore:
+            await self._run_job(job, label)
+
+    async def _run_job(self, job: NotificationJob, label: str) -> None:
+        db = SessionLocal()
+        started = time.perf_counter()
+        ok = False
+        try:
+            await job(db)
+            self.completed_total += 1
+            ok = True
+        except Exception as e:
+            self.failed_total += 1
+            logger.error(f"⚠️ {label} hatası: {e}", exc_info=True)
+        finally:
+            db.close()
+            # label talep id'si içerebilir; metrik etiketi olarak fonksiyon adı kullanılır
+            observe_job(f"notification.{getattr(job, '__name__', 'job')}", time.perf_counter() - started, ok)
+
+
+notification_dispatcher = NotificationDispatcher(max_concurrency=settings.NOTIFICATION_MAX_CONCURRENCY)
@@ -1,13 +1,81 @@
 import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.models.request import Request
+from app.models.email_outbox import EmailOutbox
+from app.models.notification_digest_item import NotificationDigestItem
+from app.services.email_templates import get_template
 from app.core.config import settings
+from app.core.metrics import observe_job
 import os
 import ssl
+import time
+from datetime import datetime, timedelta, timezone
+
+
+def get_smtp_settings() -> Optional[dict]:
+    """SMTP ayarlarını env'den oku (host/kullanıcı/şifre eksikse None)"""
+    smtp_host = os.getenv("SMTP_HOST")
+    smtp_port = int(os.getenv("SMTP_PORT", "587"))
+    smtp_user = os.getenv("SMTP_USER")
+    smtp_password = os.getenv("SMTP_PASSWORD")
+    smtp_from_env = os.getenv("SMTP_FROM", smtp_user)
+    # SMTP_FROM email adresi olmalı, domain değil
+    # Eğer SMTP_FROM bir email değilse (domain ise), SMTP_USER'ı kullan
+    if smtp_from_env and "@" in smtp_from_env:
+        smtp_from = smtp_from_env
+    else:
+        smtp_from = smtp_user if smtp_user else smtp_from_env
+    
+    if not smtp_host or not smtp_user or not smtp_password:
+        return None
+    
+    return {
+        "host": smtp_host,
+        "port": smtp_port,
+        "user": smtp_user,
+        "password": smtp_password,
+        "from": smtp_from,
+    }
+
+
+def create_smtp_tls_context() -> ssl.SSLContext:
+    """SSL context oluştur (sertifika doğrulaması kapalı)"""
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
+
+def build_email_message(
+    smtp_from: str,
+    to_email: str,
+    subject: str,
+    body_html: str,
+    body_text: Optional[str] = None
+) -> MIMEMultipart:
+    """HTML (ve opsiyonel düz metin) gövdeli MIME mesajı oluştur"""
+    message = MIMEMultipart("alternative")
+    message["From"] = smtp_from
+    message["To"] = to_email
+    message["Subject"] = subject
+    
+    if body_text:
+        message.attach(MIMEText(body_text, "plain"))
+    message.attach(MIMEText(body_html, "html"))
+    return message
+
+
+# Özet email'indeki bildirim türü etiketleri
+DIGEST_EVENT_LABELS = {
+    "planned": "İş planlandı",
+    "completed": "İş tamamlandı",
+    "updated": "Talep güncellendi",
+}
 
 
 class NotificationService:
@@ -23,19 +91,9 @@ class NotificationService:
     ) -> bool:
         """Email gönder (opsiyonel - SMTP ayarları yoksa log'a yazar)"""
         # SMTP ayarları yoksa sadece log'a yaz
-        smtp_host = os.getenv("SMTP_HOST")
-        smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        smtp_user = os.getenv("SMTP_USER")
-        smtp_password = os.getenv("SMTP_PASSWORD")
-        smtp_from_env = os.getenv("SMTP_FROM", smtp_user)
-        # SMTP_FROM email adresi olmalı, domain değil
-        # Eğer SMTP_FROM bir email değilse (domain ise), SMTP_USER'ı kullan
-        if smtp_from_env and "@" in smtp_from_env:
-            smtp_from = smtp_from_env
-        else:
-            smtp_from = smtp_user if smtp_user else smtp_from_env
+        smtp = get_smtp_settings()
         
-        if not smtp_host or not smtp_user or not smtp_password:
+        if smtp is None:
             # SMTP ayarları yoksa sadece log
             import logging
             logger = logging.getLogger(__name__)
@@ -46,20 +104,15 @@ class NotificationService:
             print(f"   {body_text or body_html[:200]}")
             return True
         
+        smtp_host = smtp["host"]
+        smtp_port = smtp["port"]
+        smtp_user = smtp["user"]
+        smtp_password = smtp["password"]
+        smtp_from = smtp["from"]
+        
         try:
-            message = MIMEMultipart("alternative")
-            message["From"] = smtp_from
-            message["To"] = to_email
-            message["Subject"] = subject
-            
-            if body_text:
-                message.attach(MIMEText(body_text, "plain"))
-            message.attach(MIMEText(body_html, "html"))
-            
-            # SSL context oluştur (sertifika doğrulaması kapalı)
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
+            message = build_email_message(smtp_from, to_email, subject, body_html, body_text)
+            ssl_context = create_smtp_tls_context()
             
             # Port 587 için STARTTLS kullan
             # Port 465 için SSL/TLS kullan
@@ -129,6 +182,93 @@ class NotificationService:
             traceback.print_exc()
             return False
     
+    def enqueue_email(
+        self,
+        to_email: str,
+        subject: str,
+        body_html: str,
+        body_text: Optional[str] = None
+    ) -> EmailOutbox:
+        """Email'i outbox tablosuna yaz ve hemen dön (gönderimi EmailOutboxWorker yapar)"""
+        from app.services.email_outbox_service import email_outbox_worker
+        
+        outbox = EmailOutbox(
+            to_email=to_email,
+            subject=subject,
+            body_html=body_html,
+            body_text=body_text
+        )
+        self.db.add(outbox)
+        self.db.commit()
+        
+        # Worker bir sonraki poll'u beklemeden kuyruğu işlesin
+        email_outbox_worker.wake()
+        return outbox
+    
+    @staticmethod
+    def digest_enabled() -> bool:
+        """Planlama/durum bildirimleri özet kuyruğuna mı yazılıyor"""
+        return settings.NOTIFICATION_DIGEST_WINDOW_SECONDS > 0
+    
+    def _queue_digest_item(
+        self,
+        user: User,
+        request: Request,
+        kind: str,
+        detail: str,
+        subject: str,
+        body_html: str,
+        body_text: Optional[str]
+    ) -> None:
+        self.db.add(NotificationDigestItem(
+            user_id=user.id,
+            request_id=request.id,
+            kind=kind,
+            dealer_label=f"{request.dealer.name} ({request.dealer.code})",
+            detail=detail,
+            subject=subject,
+            body_html=body_html,
+            body_text=body_text
+        ))
+    
+    def _deliver(
+        self,
+        user: User,
+        request: Request,
+        kind: str,
+        detail: str,
+        subject: str,
+        body_html: str,
+        body_text: Optional[str]
+    ) -> None:
+        """Özet açıksa bildirimi alıcının özet kuyruğuna yaz, kapalıysa email'i hemen outbox'a ekle"""
+        if self.digest_enabled():
+            self._queue_digest_item(user, request, kind, detail, subject, body_html, body_text)
+            self.db.commit()
+        else:
+            self.enqueue_email(user.email, subject, body_html, body_text)
+    
+    def _render_request_planned(
+        self,
+        user: User,
+        request: Request,
+        planned_date: str,
+        updated_by_user: User
+    ) -> Tuple[str, str, str]:
+        subject = f"İş Planlama Bildirimi - Talep No: {request.id}"
+        context = {
+            "user_name": user.name,
+            "request_id": request.id,
+            "dealer_name": request.dealer.name,
+            "dealer_code": request.dealer.code,
+            "job_type": request.job_type,
+            "planned_date": planned_date,
+            "updated_by_name": updated_by_user.name,
+        }
+        body_html = get_template("request_planned.html").render(**context)
+        body_text = get_template("request_planned.txt").render(**context)
+        return subject, body_html, body_text
+    
     async def notify_request_planned(
         self,
         request: Request,
@@ -140,110 +280,61 @@ class NotificationService:
         if not user or not user.email:
             return
         
-        subject = f"İş Planlama Bildirimi - Talep No: {request.id}"
-        body_html = f"""
-        <html>
-        <head>
-            <meta charset="UTF-8">
-        </head>
-        <body style="font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #2d3748; background-color: #f7fafc; margin: 0; padding: 0;">
-            <div style="max-width: 650px; margin: 30px auto; background-color: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                <!-- Header -->
-                <div style="background: linear-gradient(135deg, #4299e1 0%, #3182ce 100%); padding: 30px; text-align: center; color: #ffffff;">
-                    <h1 style="margin: 0; font-size: 24px; font-weight: 600;">İş Planlama Bildirimi</h1>
-                </div>
-                
-                <!-- Content -->
-                <div style="padding: 30px;">
-                    <p style="font-size: 16px; color: #2d3748; margin-bottom: 20px;">Sayın {user.name},</p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-bottom: 25px;">
-                        Oluşturduğunuz teknik servis talebi planlama sürecine alınmıştır. Aşağıda talebinize ilişkin detaylı bilgiler yer almaktadır.
-                    </p>
-                    
-                    <div style="background: #f7fafc; border-left: 4px solid #4299e1; padding: 20px; border-radius: 6px; margin: 25px 0;">
-                        <table style="width: 100%; border-collapse: collapse;">
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748; width: 140px;">Talep Numarası:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">#{request.id}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Bayi Bilgisi:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{request.dealer.name} ({request.dealer.code})</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">İş Tipi:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{request.job_type}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Planlanan Tarih:</td>
-                                <td style="padding: 8px 0; color: #4299e1; font-weight: 600;">{planned_date}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Planlayan Personel:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{updated_by_user.name}</td>
-                            </tr>
-                        </table>
-                    </div>
-                    
-                    <div style="background: #edf2f7; padding: 15px; border-radius: 6px; margin: 25px 0;">
-                        <p style="margin: 0; font-size: 14px; color: #2d3748; font-weight: 600;">
-                            📅 İşin gerçekleştirilmesi planlanan tarih: <span style="color: #4299e1;">{planned_date}</span>
-                        </p>
-                    </div>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 25px;">
-                        Planlanan tarihte işinizin gerçekleştirilmesi için gerekli hazırlıklar yapılmaktadır. Herhangi bir değişiklik olması durumunda size bilgi verilecektir.
-                    </p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 20px;">
-                        Sorularınız için lütfen bizimle iletişime geçmekten çekinmeyiniz.
-                    </p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 30px;">
-                        Saygılarımızla,<br>
-                        <strong>Teknik Servis Yönetim Sistemi</strong>
-                    </p>
-                </div>
-                
-                <!-- Footer -->
-                <div style="background: #edf2f7; padding: 20px; text-align: center; border-top: 1px solid #e2e8f0;">
-                    <p style="margin: 0; font-size: 12px; color: #718096;">
-                        Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermeyiniz.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
+        subject, body_html, body_text = self._render_request_planned(user, request, planned_date, updated_by_user)
+        self._deliver(
+            user, request, "planned", f"Planlanan tarih: {planned_date} - {updated_by_user.name}",
+            subject, body_html, body_text
+        )
+    
+    async def notify_requests_planned(
+        self,
+        user: User,
+        requests: List[Request],
+        planned_date: str,
+        updated_by_user: User
+    ):
         """
-        
-        body_text = f"""
-İŞ PLANLAMA BİLDİRİMİ
-
-Sayın {user.name},
-
-Oluşturduğunuz teknik servis talebi planlama sürecine alınmıştır. Aşağıda talebinize ilişkin detaylı bilgiler yer almaktadır.
-
-TALEP DETAYLARI:
-----------------
-Talep Numarası: #{request.id}
-Bayi Bilgisi: {request.dealer.name} ({request.dealer.code})
-İş Tipi: {request.job_type}
-Planlanan Tarih: {planned_date}
-Planlayan Personel: {updated_by_user.name}
-
-Planlanan tarihte işinizin gerçekleştirilmesi için gerekli hazırlıklar yapılmaktadır. Herhangi bir değişiklik olması durumunda size bilgi verilecektir.
-
-Sorularınız için lütfen bizimle iletişime geçmekten çekinmeyiniz.
-
-Saygılarımızla,
-Teknik Servis Yönetim Sistemi
-
----
-Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermeyiniz.
+        Toplu planlamada talep sahibine tek bildirim gönder (tek talepse standart planlama bildirimi).
+        Özet açıksa talepler alıcının özet kuyruğuna eklenir; pencere içindeki diğer bildirimlerle birleşir.
         """
+        if not requests or not user.email:
+            return
+        if self.digest_enabled():
+            detail = f"Planlanan tarih: {planned_date} - {updated_by_user.name}"
+            for request in requests:
+                subject, body_html, body_text = self._render_request_planned(user, request, planned_date, updated_by_user)
+                self._queue_digest_item(user, request, "planned", detail, subject, body_html, body_text)
+            self.db.commit()
+            return
+        if len(requests) == 1:
+            await self.notify_request_planned(requests[0], planned_date, updated_by_user)
+            return
+        
+        subject = f"İş Planlama Bildirimi - {len(requests)} Talep ({planned_date})"
+        rows = [
+            {
+                "request_id": request.id,
+                "dealer_name": request.dealer.name,
+                "dealer_code": request.dealer.code,
+                "job_type": request.job_type,
+            }
+            for request in requests
+        ]
+        context = {
+            "user_name": user.name,
+            "request_count": len(requests),
+            "planned_date": planned_date,
+            "updated_by_name": updated_by_user.name,
+        }
+        body_html = get_template("requests_planned.html").render(
+            rows=get_template("requests_planned_row.html").render_many(rows), **context
+        )
+        request_lines = "\n".join(
+            f"#{row['request_id']} - {row['dealer_name']} ({row['dealer_code']}) - {row['job_type']}" for row in rows
+        )
+        body_text = get_template("requests_planned.txt").render(request_lines=request_lines, **context)
         
-        await self.send_email(user.email, subject, body_html, body_text)
+        self.enqueue_email(user.email, subject, body_html, body_text)
     
     async def notify_request_completed(
         self,
@@ -257,111 +348,27 @@ Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermey
             return
         
         subject = f"İş Tamamlanma Bildirimi - Talep No: {request.id}"
-        body_html = f"""
-        <html>
-        <head>
-            <meta charset="UTF-8">
-        </head>
-        <body style="font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #2d3748; background-color: #f7fafc; margin: 0; padding: 0;">
-            <div style="max-width: 650px; margin: 30px auto; background-color: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                <!-- Header -->
-                <div style="background: linear-gradient(135deg, #10b981 0%, #059669 100%); padding: 30px; text-align: center; color: #ffffff;">
-                    <h1 style="margin: 0; font-size: 24px; font-weight: 600;">İş Tamamlanma Bildirimi</h1>
-                </div>
-                
-                <!-- Content -->
-                <div style="padding: 30px;">
-                    <p style="font-size: 16px; color: #2d3748; margin-bottom: 20px;">Sayın {user.name},</p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-bottom: 25px;">
-                        Oluşturduğunuz teknik servis talebi başarıyla tamamlanmıştır. Aşağıda işlem detayları yer almaktadır.
-                    </p>
-                    
-                    <div style="background: #f7fafc; border-left: 4px solid #10b981; padding: 20px; border-radius: 6px; margin: 25px 0;">
-                        <table style="width: 100%; border-collapse: collapse;">
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748; width: 140px;">Talep Numarası:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">#{request.id}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Bayi Bilgisi:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{request.dealer.name} ({request.dealer.code})</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Yapılan İş:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{request.job_type}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Tamamlanma Tarihi:</td>
-                                <td style="padding: 8px 0; color: #10b981; font-weight: 600;">{completed_date}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Görevli Personel:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{completed_by_user.name}</td>
-                            </tr>
-                            {f'<tr><td style="padding: 8px 0; font-weight: 600; color: #2d3748; vertical-align: top;">Yapılan İşlemler:</td><td style="padding: 8px 0; color: #4a5568;">{request.job_done_desc}</td></tr>' if request.job_done_desc else ''}
-                        </table>
-                    </div>
-                    
-                    <div style="background: #d1fae5; padding: 15px; border-radius: 6px; margin: 25px 0; border-left: 4px solid #10b981;">
-                        <p style="margin: 0; font-size: 14px; color: #065f46; font-weight: 600;">
-                            ✅ İşleminiz başarıyla tamamlanmıştır.
-                        </p>
-                    </div>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 25px;">
-                        İşleminizle ilgili herhangi bir sorunuz veya görüşünüz bulunması durumunda, lütfen bizimle iletişime geçmekten çekinmeyiniz.
-                    </p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 20px;">
-                        Bize güvendiğiniz için teşekkür ederiz.
-                    </p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 30px;">
-                        Saygılarımızla,<br>
-                        <strong>Teknik Servis Yönetim Sistemi</strong>
-                    </p>
-                </div>
-                
-                <!-- Footer -->
-                <div style="background: #edf2f7; padding: 20px; text-align: center; border-top: 1px solid #e2e8f0;">
-                    <p style="margin: 0; font-size: 12px; color: #718096;">
-                        Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermeyiniz.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        context = {
+            "user_name": user.name,
+            "request_id": request.id,
+            "dealer_name": request.dealer.name,
+            "dealer_code": request.dealer.code,
+            "job_type": request.job_type,
+            "completed_date": completed_date,
+            "completed_by_name": completed_by_user.name,
+        }
+        job_done_row = ""
+        job_done_line = ""
+        if request.job_done_desc:
+            job_done_row = get_template("request_completed_job_done_row.html").render(job_done_desc=request.job_done_desc)
+            job_done_line = f"Yapılan İşlemler: {request.job_done_desc}"
+        body_html = get_template("request_completed.html").render(job_done_row=job_done_row, **context)
+        body_text = get_template("request_completed.txt").render(job_done_line=job_done_line, **context)
         
-        body_text = f"""
-İŞ TAMAMLANMA BİLDİRİMİ
-
-Sayın {user.name},
-
-Oluşturduğunuz teknik servis talebi başarıyla tamamlanmıştır. Aşağıda işlem detayları yer almaktadır.
-
-İŞLEM DETAYLARI:
-----------------
-Talep Numarası: #{request.id}
-Bayi Bilgisi: {request.dealer.name} ({request.dealer.code})
-Yapılan İş: {request.job_type}
-Tamamlanma Tarihi: {completed_date}
-Görevli Personel: {completed_by_user.name}
-{f'Yapılan İşlemler: {request.job_done_desc}' if request.job_done_desc else ''}
-
-İşleminizle ilgili herhangi bir sorunuz veya görüşünüz bulunması durumunda, lütfen bizimle iletişime geçmekten çekinmeyiniz.
-
-Bize güvendiğiniz için teşekkür ederiz.
-
-Saygılarımızla,
-Teknik Servis Yönetim Sistemi
-
----
-Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermeyiniz.
-        """
-        
-        await self.send_email(user.email, subject, body_html, body_text)
+        self._deliver(
+            user, request, "completed", f"Tamamlanma tarihi: {completed_date} - {completed_by_user.name}",
+            subject, body_html, body_text
+        )
     
     async def notify_request_updated(
         self,
@@ -386,99 +393,23 @@ Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermey
             return
         
         subject = f"Talep Güncelleme Bildirimi - Talep No: {request.id}"
-        body_html = f"""
-        <html>
-        <head>
-            <meta charset="UTF-8">
-        </head>
-        <body style="font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #2d3748; background-color: #f7fafc; margin: 0; padding: 0;">
-            <div style="max-width: 650px; margin: 30px auto; background-color: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                <!-- Header -->
-                <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; text-align: center; color: #ffffff;">
-                    <h1 style="margin: 0; font-size: 24px; font-weight: 600;">Talep Güncelleme Bildirimi</h1>
-                </div>
-                
-                <!-- Content -->
-                <div style="padding: 30px;">
-                    <p style="font-size: 16px; color: #2d3748; margin-bottom: 20px;">Sayın {user.name},</p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-bottom: 25px;">
-                        Oluşturduğunuz teknik servis talebinde güncelleme yapılmıştır. Aşağıda güncellenen bilgiler yer almaktadır.
-                    </p>
-                    
-                    <div style="background: #f7fafc; border-left: 4px solid #667eea; padding: 20px; border-radius: 6px; margin: 25px 0;">
-                        <table style="width: 100%; border-collapse: collapse;">
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748; width: 140px;">Talep Numarası:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">#{request.id}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Bayi Bilgisi:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{request.dealer.name} ({request.dealer.code})</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748; vertical-align: top;">Güncellemeler:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">
-                                    <ul style="margin: 0; padding-left: 20px;">
-                                        {''.join([f'<li style="margin-bottom: 5px;">{change}</li>' for change in changes_text])}
-                                    </ul>
-                                </td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Güncelleyen Personel:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{updated_by_user.name}</td>
-                            </tr>
-                        </table>
-                    </div>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 25px;">
-                        Talebinizle ilgili güncel bilgileri sistem üzerinden takip edebilirsiniz. Herhangi bir sorunuz bulunması durumunda, lütfen bizimle iletişime geçmekten çekinmeyiniz.
-                    </p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 30px;">
-                        Saygılarımızla,<br>
-                        <strong>Teknik Servis Yönetim Sistemi</strong>
-                    </p>
-                </div>
-                
-                <!-- Footer -->
-                <div style="background: #edf2f7; padding: 20px; text-align: center; border-top: 1px solid #e2e8f0;">
-                    <p style="margin: 0; font-size: 12px; color: #718096;">
-                        Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermeyiniz.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        context = {
+            "user_name": user.name,
+            "request_id": request.id,
+            "dealer_name": request.dealer.name,
+            "dealer_code": request.dealer.code,
+            "updated_by_name": updated_by_user.name,
+        }
+        changes_html = get_template("request_updated_change_item.html").render_many(
+            {"change": change} for change in changes_text
+        )
+        body_html = get_template("request_updated.html").render(changes_html=changes_html, **context)
+        body_text = get_template("request_updated.txt").render(
+            changes_text="\n".join(f"  • {change}" for change in changes_text),
+            **context
+        )
         
-        body_text = f"""
-TALEP GÜNCELLEME BİLDİRİMİ
-
-Sayın {user.name},
-
-Oluşturduğunuz teknik servis talebinde güncelleme yapılmıştır. Aşağıda güncellenen bilgiler yer almaktadır.
-
-TALEP DETAYLARI:
-----------------
-Talep Numarası: #{request.id}
-Bayi Bilgisi: {request.dealer.name} ({request.dealer.code})
-
-Güncellemeler:
-{chr(10).join([f'  • {change}' for change in changes_text])}
-
-Güncelleyen Personel: {updated_by_user.name}
-
-Talebinizle ilgili güncel bilgileri sistem üzerinden takip edebilirsiniz. Herhangi bir sorunuz bulunması durumunda, lütfen bizimle iletişime geçmekten çekinmeyiniz.
-
-Saygılarımızla,
-Teknik Servis Yönetim Sistemi
-
----
-Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermeyiniz.
-        """
-        
-        await self.send_email(user.email, subject, body_html, body_text)
+        self._deliver(user, request, "updated", "; ".join(changes_text), subject, body_html, body_text)
     
     async def notify_request_created(
         self,
@@ -490,111 +421,19 @@ Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermey
             return
         
         subject = f"Talep Oluşturma Onayı - Talep No: {request.id}"
-        body_html = f"""
-        <html>
-        <head>
-            <meta charset="UTF-8">
-        </head>
-        <body style="font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #2d3748; background-color: #f7fafc; margin: 0; padding: 0;">
-            <div style="max-width: 650px; margin: 30px auto; background-color: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                <!-- Header -->
-                <div style="background: linear-gradient(135deg, #4299e1 0%, #3182ce 100%); padding: 30px; text-align: center; color: #ffffff;">
-                    <h1 style="margin: 0; font-size: 24px; font-weight: 600;">Talep Oluşturma Onayı</h1>
-                </div>
-                
-                <!-- Content -->
-                <div style="padding: 30px;">
-                    <p style="font-size: 16px; color: #2d3748; margin-bottom: 20px;">Sayın {created_by_user.name},</p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-bottom: 25px;">
-                        Teknik servis talebiniz başarıyla oluşturulmuştur. Talebiniz ilgili birimlere iletilmiş olup, en kısa sürede değerlendirilecektir.
-                    </p>
-                    
-                    <div style="background: #f7fafc; border-left: 4px solid #4299e1; padding: 20px; border-radius: 6px; margin: 25px 0;">
-                        <table style="width: 100%; border-collapse: collapse;">
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748; width: 140px;">Talep Numarası:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">#{request.id}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Bayi Bilgisi:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{request.dealer.name} ({request.dealer.code})</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Yapılacak İş:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{request.job_type}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">İstenen Tarih:</td>
-                                <td style="padding: 8px 0; color: #4a5568;">{request.requested_date.strftime('%d.%m.%Y') if request.requested_date else '-'}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Durum:</td>
-                                <td style="padding: 8px 0; color: #4299e1; font-weight: 600;">{request.status}</td>
-                            </tr>
-                        </table>
-                    </div>
-                    
-                    <div style="background: #dbeafe; padding: 15px; border-radius: 6px; margin: 25px 0; border-left: 4px solid #4299e1;">
-                        <p style="margin: 0; font-size: 14px; color: #1e40af; font-weight: 600;">
-                            ℹ️ Talebiniz teknik sorumlulara iletilmiştir ve en kısa sürede planlama sürecine alınacaktır.
-                        </p>
-                    </div>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 25px;">
-                        Talebinizin durumunu sistem üzerinden takip edebilirsiniz. Planlama süreci tamamlandığında size bilgilendirme yapılacaktır.
-                    </p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 20px;">
-                        Bize güvendiğiniz için teşekkür ederiz.
-                    </p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 30px;">
-                        Saygılarımızla,<br>
-                        <strong>Teknik Servis Yönetim Sistemi</strong>
-                    </p>
-                </div>
-                
-                <!-- Footer -->
-                <div style="background: #edf2f7; padding: 20px; text-align: center; border-top: 1px solid #e2e8f0;">
-                    <p style="margin: 0; font-size: 12px; color: #718096;">
-                        Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermeyiniz.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        body_text = f"""
-TALEP OLUŞTURMA ONAYI
-
-Sayın {created_by_user.name},
-
-Teknik servis talebiniz başarıyla oluşturulmuştur. Talebiniz ilgili birimlere iletilmiş olup, en kısa sürede değerlendirilecektir.
-
-TALEP DETAYLARI:
-----------------
-Talep Numarası: #{request.id}
-Bayi Bilgisi: {request.dealer.name} ({request.dealer.code})
-Yapılacak İş: {request.job_type}
-İstenen Tarih: {request.requested_date.strftime('%d.%m.%Y') if request.requested_date else '-'}
-Durum: {request.status}
-
-Talebiniz teknik sorumlulara iletilmiştir ve en kısa sürede planlama sürecine alınacaktır.
-
-Talebinizin durumunu sistem üzerinden takip edebilirsiniz. Planlama süreci tamamlandığında size bilgilendirme yapılacaktır.
-
-Bize güvendiğiniz için teşekkür ederiz.
-
-Saygılarımızla,
-Teknik Servis Yönetim Sistemi
-
----
-Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermeyiniz.
-        """
+        context = {
+            "created_by_name": created_by_user.name,
+            "request_id": request.id,
+            "dealer_name": request.dealer.name,
+            "dealer_code": request.dealer.code,
+            "job_type": request.job_type,
+            "requested_date": request.requested_date.strftime('%d.%m.%Y') if request.requested_date else '-',
+            "status": request.status,
+        }
+        body_html = get_template("request_created.html").render(**context)
+        body_text = get_template("request_created.txt").render(**context)
         
-        await self.send_email(created_by_user.email, subject, body_html, body_text)
+        self.enqueue_email(created_by_user.email, subject, body_html, body_text)
     
     async def notify_new_request_to_tech(
         self,
@@ -609,113 +448,118 @@ Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermey
         depot_name = request.depot.name if request.depot else "Bilinmeyen Depo"
         
         subject = f"Yeni Talep Bildirimi - Talep No: {request.id} - {depot_name}"
-        body_html = f"""
-        <html>
-        <head>
-            <meta charset="UTF-8">
-        </head>
-        <body style="font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #2d3748; background-color: #f7fafc; margin: 0; padding: 0;">
-            <div style="max-width: 650px; margin: 30px auto; background-color: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                <!-- Header -->
-                <div style="background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); padding: 30px; text-align: center; color: #ffffff;">
-                    <h1 style="margin: 0; font-size: 24px; font-weight: 600;">Yeni Talep Bildirimi</h1>
-                    <p style="margin: 10px 0 0 0; font-size: 16px; opacity: 0.9;">{depot_name} Deposu</p>
-                </div>
-                
-                <!-- Content -->
-                <div style="padding: 30px;">
-                    <p style="font-size: 16px; color: #2d3748; margin-bottom: 20px;">Sayın {tech_user.name},</p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-bottom: 25px;">
-                        <strong>{depot_name}</strong> deposu için yeni bir teknik servis talebi oluşturulmuştur. Aşağıda talep detayları yer almaktadır.
-                    </p>
-                    
-                    <div style="background: #fef3c7; border-left: 4px solid #f59e0b; padding: 20px; border-radius: 6px; margin: 25px 0;">
-                        <table style="width: 100%; border-collapse: collapse;">
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748; width: 140px;">Talep Numarası:</td>
-                                <td style="padding: 8px 0; color: #92400e; font-weight: 600;">#{request.id}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Bayi Bilgisi:</td>
-                                <td style="padding: 8px 0; color: #92400e;">{request.dealer.name} ({request.dealer.code})</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Yapılacak İş:</td>
-                                <td style="padding: 8px 0; color: #92400e;">{request.job_type}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748; vertical-align: top;">İş Detayı:</td>
-                                <td style="padding: 8px 0; color: #92400e;">{request.job_detail or 'Detay belirtilmemiş'}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">İstenen Tarih:</td>
-                                <td style="padding: 8px 0; color: #92400e;">{request.requested_date.strftime('%d.%m.%Y') if request.requested_date else '-'}</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Talep Eden:</td>
-                                <td style="padding: 8px 0; color: #92400e;">{created_by_user.name} ({created_by_user.email})</td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; font-weight: 600; color: #2d3748;">Durum:</td>
-                                <td style="padding: 8px 0; color: #92400e; font-weight: 600;">{request.status}</td>
-                            </tr>
-                        </table>
-                    </div>
-                    
-                    <div style="background: #fef3c7; padding: 15px; border-radius: 6px; margin: 25px 0; border-left: 4px solid #f59e0b;">
-                        <p style="margin: 0; font-size: 14px; color: #92400e; font-weight: 600;">
-                            ⚠️ Lütfen iş planı sayfasından bu talebi planlama sürecine alınız.
-                        </p>
-                    </div>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 25px;">
-                        Talebin planlanması için gerekli işlemleri en kısa sürede gerçekleştirmeniz önemle rica olunur.
-                    </p>
-                    
-                    <p style="font-size: 15px; color: #4a5568; margin-top: 30px;">
-                        Saygılarımızla,<br>
-                        <strong>Teknik Servis Yönetim Sistemi</strong>
-                    </p>
-                </div>
-                
-                <!-- Footer -->
-                <div style="background: #edf2f7; padding: 20px; text-align: center; border-top: 1px solid #e2e8f0;">
-                    <p style="margin: 0; font-size: 12px; color: #718096;">
-                        Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermeyiniz.
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        context = {
+            "tech_user_name": tech_user.name,
+            "depot_name": depot_name,
+            "request_id": request.id,
+            "dealer_name": request.dealer.name,
+            "dealer_code": request.dealer.code,
+            "job_type": request.job_type,
+            "job_detail": request.job_detail or 'Detay belirtilmemiş',
+            "requested_date": request.requested_date.strftime('%d.%m.%Y') if request.requested_date else '-',
+            "created_by_name": created_by_user.name if created_by_user else '-',
+            "created_by_email": created_by_user.email if created_by_user else '-',
+            "status": request.status,
+        }
+        body_html = get_template("new_request_to_tech.html").render(**context)
+        body_text = get_template("new_request_to_tech.txt").render(**context)
         
-        body_text = f"""
-YENİ TALEP BİLDİRİMİ
-
-Sayın {tech_user.name},
-
-{depot_name} deposu için yeni bir teknik servis talebi oluşturulmuştur. Aşağıda talep detayları yer almaktadır.
-
-TALEP DETAYLARI:
-----------------
-Talep Numarası: #{request.id}
-Bayi Bilgisi: {request.dealer.name} ({request.dealer.code})
-Yapılacak İş: {request.job_type}
-İş Detayı: {request.job_detail or 'Detay belirtilmemiş'}
-İstenen Tarih: {request.requested_date.strftime('%d.%m.%Y') if request.requested_date else '-'}
-Talep Eden: {created_by_user.name} ({created_by_user.email})
-Durum: {request.status}
-
-Lütfen iş planı sayfasından bu talebi planlama sürecine alınız.
-
-Talebin planlanması için gerekli işlemleri en kısa sürede gerçekleştirmeniz önemle rica olunur.
-
-Saygılarımızla,
-Teknik Servis Yönetim Sistemi
-
----
-Bu e-posta otomatik olarak oluşturulmuştur. Lütfen bu e-postaya yanıt vermeyiniz.
+        self.enqueue_email(tech_user.email, subject, body_html, body_text)
+    
+    def flush_digests(self, window_seconds: Optional[int] = None) -> int:
+        """
+        En eski bekleyen bildirimi pencereden eski olan alıcıların tüm bekleyen bildirimlerini tek email'e topla.
+        Kayıtlar UPDATE ... SET sent_at ... RETURNING ile sahiplenilir (birden fazla worker aynı bildirimi iki kez
+        göndermez); email'ler outbox'a aynı commit'te yazılır. Tek bildirimi olan alıcıya o bildirimin email'i
+        aynen gider. Outbox'a yazılan email sayısını döndürür.
         """
+        if window_seconds is None:
+            window_seconds = settings.NOTIFICATION_DIGEST_WINDOW_SECONDS
+        now = datetime.now(timezone.utc)
         
-        await self.send_email(tech_user.email, subject, body_html, body_text)
+        due_users = (
+            select(NotificationDigestItem.user_id)
+            .where(NotificationDigestItem.sent_at.is_(None))
+            .group_by(NotificationDigestItem.user_id)
+            .having(func.min(NotificationDigestItem.created_at) <= now - timedelta(seconds=window_seconds))
+        )
+        claimed = self.db.execute(
+            update(NotificationDigestItem)
+            .where(NotificationDigestItem.sent_at.is_(None), NotificationDigestItem.user_id.in_(due_users))
+            .values(sent_at=now)
+            .returning(
+                NotificationDigestItem.user_id,
+                NotificationDigestItem.request_id,
+                NotificationDigestItem.kind,
+                NotificationDigestItem.dealer_label,
+                NotificationDigestItem.detail,
+                NotificationDigestItem.subject,
+                NotificationDigestItem.body_html,
+                NotificationDigestItem.body_text,
+                NotificationDigestItem.created_at
+            )
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not claimed:
+            self.db.commit()
+            return 0
+        
+        by_user: Dict[int, list] = {}
+        for item in claimed:
+            by_user.setdefault(item.user_id, []).append(item)
+        users = {user.id: user for user in self.db.query(User).filter(User.id.in_(list(by_user)))}
+        
+        emails = 0
+        for user_id, items in by_user.items():
+            user = users.get(user_id)
+            if not user or not user.email:
+                continue
+            items.sort(key=lambda item: item.created_at)
+            if len(items) == 1:
+                subject, body_html, body_text = items[0].subject, items[0].body_html, items[0].body_text
+            else:
+                subject, body_html, body_text = self._render_digest(user, items)
+            self.db.add(EmailOutbox(to_email=user.email, subject=subject, body_html=body_html, body_text=body_text))
+            emails += 1
+        self.db.commit()
+        
+        if emails:
+            from app.services.email_outbox_service import email_outbox_worker
+            email_outbox_worker.wake()
+        return emails
+    
+    def _render_digest(self, user: User, items: list) -> Tuple[str, str, str]:
+        rows = [
+            {
+                "request_id": item.request_id or "-",
+                "dealer_label": item.dealer_label or "-",
+                "event": DIGEST_EVENT_LABELS.get(item.kind, item.kind),
+                "detail": item.detail or "",
+                "time": item.created_at.strftime("%d.%m.%Y %H:%M") if item.created_at else "",
+            }
+            for item in items
+        ]
+        subject = f"Talep Bildirimleri Özeti - {len(items)} Bildirim"
+        context = {"user_name": user.name, "item_count": len(items)}
+        body_html = get_template("notification_digest.html").render(
+            rows=get_template("notification_digest_row.html").render_many(rows), **context
+        )
+        item_lines = "\n".join(
+            f"#{row['request_id']} - {row['dealer_label']} - {row['event']}: {row['detail']} ({row['time']})"
+            for row in rows
+        )
+        body_text = get_template("notification_digest.txt").render(item_lines=item_lines, **context)
+        return subject, body_html, body_text
+
+
+def flush_notification_digests() -> int:
+    """Zamanı gelen özet bildirimleri outbox'a yaz (scheduler işi, kendi session'ı ile)"""
+    from app.db.session import SessionLocal
+    
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        return NotificationService(db).flush_digests()
+    finally:
+        db.close()
+        observe_job("notification_digest_flush", time.perf_counter() - started)
@@ -1,8 +1,9 @@
 import os
 import uuid
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select
 from app.models.photo import Photo
 from app.models.request import Request
 from app.core.config import settings
@@ -77,3 +78,32 @@ class PhotoService:
             "name": p.file_name,
             "id": p.id
         } for p in photos]
+
+    def get_photo_counts(self, request_ids: Iterable[int]) -> Dict[int, int]:
+        """Birden fazla talebin fotoğraf sayılarını tek GROUP BY sorgusu ile getir (fotoğrafı olmayanlar 0)"""
+        request_ids = list(set(request_ids))
+        if not request_ids:
+            return {}
+        
+        rows = self.db.query(
+            Photo.request_id,
+            func.count(Photo.id)
+        ).filter(Photo.request_id.in_(request_ids)).group_by(Photo.request_id).all()
+        
+        counts = {request_id: 0 for request_id in request_ids}
+        counts.update({request_id: count for request_id, count in rows})
+        return counts
+
+    @staticmethod
+    def photo_count_subquery():
+        """
+        Talep başına fotoğraf sayısı, Request'e bağlı (correlated) skaler alt sorgu olarak.
+        Yalnızca dış sorgunun döndürdüğü taleplerin fotoğrafları photos.request_id index'inden sayılır;
+        filtreden bağımsız tüm photos tablosu gruplanmaz.
+        """
+        return (
+            select(func.count(Photo.id))
+            .where(Photo.request_id == Request.id)
+            .correlate(Request)
+            .scalar_subquery()
+        )
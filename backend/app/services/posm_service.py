@@ -1,7 +1,12 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import distinct, exists, func, literal, select, true
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from app.core.reference_cache import POSM, mark_changed
+from app.models.depot import Depot
 from app.models.posm import Posm
 from app.models.posm_transfer import PosmTransfer
+from app.services.posm_stock_service import PosmStockService
 from app.schemas.posm import (
     PosmResponse, PosmCreateRequest, PosmUpdateRequest, 
     PosmStockResponse, PosmTransferRequest, PosmTransferResponse
@@ -28,6 +33,24 @@ class PosmService:
             repair_pending_count=p.repair_pending_count
         ) for p in posms]
 
+    def get_catalog(self, depot_id: Optional[int] = None) -> List[Tuple[int, str, Optional[int]]]:
+        """POSM kataloğu: (id, isim, depo) isim sırasıyla; stok sayaçları hariç (önbelleğe alınan kısım)"""
+        query = self.db.query(Posm.id, Posm.name, Posm.depot_id)
+        
+        if depot_id:
+            query = query.filter(Posm.depot_id == depot_id)
+        
+        return [tuple(row) for row in query.order_by(Posm.name).all()]
+
+    def get_stock_counts(self, depot_ids: Optional[List[int]] = None) -> Dict[int, Tuple[int, int]]:
+        """POSM ID -> (hazır, tamir bekleyen); depot_ids verilmezse tüm depolar"""
+        query = self.db.query(Posm.id, Posm.ready_count, Posm.repair_pending_count)
+        
+        if depot_ids is not None:
+            query = query.filter(Posm.depot_id.in_(depot_ids))
+        
+        return {posm_id: (ready, repair_pending) for posm_id, ready, repair_pending in query.all()}
+
     def get_posm_by_id(self, posm_id: int) -> Optional[PosmResponse]:
         """POSM'i ID ile getir"""
         posm = self.db.query(Posm).filter(Posm.id == posm_id).first()
@@ -70,15 +93,25 @@ class PosmService:
             tamirBekleyen=posm.repair_pending_count
         )
 
-    def create_posm(self, posm_data: PosmCreateRequest) -> PosmResponse:
-        """Yeni POSM oluştur"""
+    def create_posm(self, posm_data: PosmCreateRequest, created_by: Optional[int] = None) -> PosmResponse:
+        """Yeni POSM oluştur (başlangıç stoku deftere açılış bakiyesi olarak yazılır)"""
         posm = Posm(
             name=posm_data.name,
             depot_id=posm_data.depot_id,
-            ready_count=posm_data.ready_count,
-            repair_pending_count=posm_data.repair_pending_count
+            ready_count=0,
+            repair_pending_count=0
         )
         self.db.add(posm)
+        self.db.flush()
+        mark_changed(self.db, POSM)
+        if posm_data.ready_count or posm_data.repair_pending_count:
+            PosmStockService(self.db).apply_movement(
+                posm.id,
+                "opening_balance",
+                ready_delta=posm_data.ready_count,
+                repair_pending_delta=posm_data.repair_pending_count,
+                created_by=created_by
+            )
         self.db.commit()
         self.db.refresh(posm)
         
@@ -90,18 +123,22 @@ class PosmService:
             repair_pending_count=posm.repair_pending_count
         )
 
-    def update_posm(self, posm_id: int, update_data: PosmUpdateRequest) -> Optional[PosmResponse]:
-        """POSM güncelle"""
+    def update_posm(self, posm_id: int, update_data: PosmUpdateRequest, updated_by: Optional[int] = None) -> Optional[PosmResponse]:
+        """POSM güncelle (adet değişikliği sayım düzeltmesi hareketi olarak yazılır)"""
         posm = self.db.query(Posm).filter(Posm.id == posm_id).first()
         if not posm:
             return None
         
         if update_data.name is not None:
             posm.name = update_data.name
-        if update_data.ready_count is not None:
-            posm.ready_count = update_data.ready_count
-        if update_data.repair_pending_count is not None:
-            posm.repair_pending_count = update_data.repair_pending_count
+            mark_changed(self.db, POSM)
+        if update_data.ready_count is not None or update_data.repair_pending_count is not None:
+            PosmStockService(self.db).set_counts(
+                posm_id,
+                ready_count=update_data.ready_count,
+                repair_pending_count=update_data.repair_pending_count,
+                created_by=updated_by
+            )
         
         self.db.commit()
         self.db.refresh(posm)
@@ -121,9 +158,56 @@ class PosmService:
             return False
         
         self.db.delete(posm)
+        mark_changed(self.db, POSM)
         self.db.commit()
         return True
 
+    def sync_catalog_to_depots(self, dry_run: bool = False) -> dict:
+        """
+        Her POSM isminin her depoda bir kaydı olmasını sağla (eksikler stok 0 ile eklenir).
+        Eksik (isim, depo) çiftleri tek ifadeyle bulunur: isimler x depolar, mevcut çiftler hariç.
+        Ekleme ON CONFLICT (name, depot_id) DO NOTHING ile yapılır; tekrar çalıştırmak yan etkisizdir.
+        dry_run=True ise hiçbir şey yazılmaz, eklenecek çiftler döndürülür.
+        """
+        names = select(Posm.name).distinct().subquery("names")
+        missing = (
+            select(names.c.name, Depot.id.label("depot_id"))
+            .select_from(names.join(Depot, true()))
+            .where(~exists().where(Posm.name == names.c.name, Posm.depot_id == Depot.id))
+            .subquery("missing")
+        )
+        
+        total_posms = self.db.query(func.count(distinct(Posm.name))).scalar() or 0
+        depot_names = dict(self.db.query(Depot.id, Depot.name).all())
+        
+        if dry_run:
+            pairs = self.db.execute(select(missing.c.name, missing.c.depot_id)).all()
+        else:
+            stmt = insert(Posm).from_select(
+                ["name", "depot_id", "ready_count", "repair_pending_count"],
+                select(missing.c.name, missing.c.depot_id, literal(0), literal(0))
+            ).on_conflict_do_nothing(index_elements=[Posm.name, Posm.depot_id])
+            pairs = self.db.execute(stmt.returning(Posm.name, Posm.depot_id)).all()
+            if pairs:
+                mark_changed(self.db, POSM)
+            self.db.commit()
+        
+        by_depot = {}
+        for name, depot_id in pairs:
+            by_depot.setdefault(depot_id, []).append(name)
+        
+        return {
+            "dry_run": dry_run,
+            "created": len(pairs),
+            "skipped": total_posms * len(depot_names) - len(pairs),
+            "total_posms": total_posms,
+            "total_depots": len(depot_names),
+            "missing": [
+                {"depot_id": depot_id, "depot_name": depot_names.get(depot_id), "posm_names": sorted(posm_names)}
+                for depot_id, posm_names in sorted(by_depot.items())
+            ],
+        }
+
     def transfer_posm(self, transfer_data: PosmTransferRequest, transferred_by: int) -> PosmTransferResponse:
         """POSM transfer et (depolar arası)"""
         # Kaynak depodaki POSM'i bul
@@ -135,39 +219,26 @@ class PosmService:
         if not from_posm:
             raise ValueError("Kaynak depoda POSM bulunamadı")
         
-        # Stok kontrolü
         if transfer_data.transfer_type == "ready":
-            if from_posm.ready_count < transfer_data.quantity:
-                raise ValueError(f"Yetersiz hazır stok. Mevcut: {from_posm.ready_count}, İstenen: {transfer_data.quantity}")
-            from_posm.ready_count -= transfer_data.quantity
+            delta_field = "ready_delta"
         elif transfer_data.transfer_type == "repair_pending":
-            if from_posm.repair_pending_count < transfer_data.quantity:
-                raise ValueError(f"Yetersiz tamir bekleyen stok. Mevcut: {from_posm.repair_pending_count}, İstenen: {transfer_data.quantity}")
-            from_posm.repair_pending_count -= transfer_data.quantity
+            delta_field = "repair_pending_delta"
         else:
             raise ValueError("Geçersiz transfer tipi. 'ready' veya 'repair_pending' olmalı")
         
-        # Hedef depoda aynı isimde POSM var mı kontrol et
-        to_posm = self.db.query(Posm).filter(
+        # Hedef depoda aynı isimde POSM yoksa stok 0 ile oluştur (eşzamanlı transferlerde tek kayıt)
+        created = self.db.execute(
+            insert(Posm)
+            .values(name=from_posm.name, depot_id=transfer_data.to_depot_id, ready_count=0, repair_pending_count=0)
+            .on_conflict_do_nothing(index_elements=[Posm.name, Posm.depot_id])
+            .returning(Posm.id)
+        ).first()
+        if created:
+            mark_changed(self.db, POSM)
+        to_posm_id = self.db.query(Posm.id).filter(
             Posm.name == from_posm.name,
             Posm.depot_id == transfer_data.to_depot_id
-        ).first()
-        
-        if to_posm:
-            # Mevcut POSM'e ekle
-            if transfer_data.transfer_type == "ready":
-                to_posm.ready_count += transfer_data.quantity
-            else:
-                to_posm.repair_pending_count += transfer_data.quantity
-        else:
-            # Yeni POSM oluştur
-            to_posm = Posm(
-                name=from_posm.name,
-                depot_id=transfer_data.to_depot_id,
-                ready_count=transfer_data.quantity if transfer_data.transfer_type == "ready" else 0,
-                repair_pending_count=transfer_data.quantity if transfer_data.transfer_type == "repair_pending" else 0
-            )
-            self.db.add(to_posm)
+        ).scalar()
         
         # Transfer kaydı oluştur
         transfer = PosmTransfer(
@@ -180,6 +251,20 @@ class PosmService:
             transferred_by=transferred_by
         )
         self.db.add(transfer)
+        self.db.flush()
+        
+        # Stok hareketleri koşullu UPDATE ile; satırlar id sırasıyla kilitlenir (ters yönlü eşzamanlı
+        # transferler kilitlenmesin). Kaynakta stok yetmezse ValueError ve transaction geri alınır.
+        movements = [
+            (from_posm.id, "transfer_out", -transfer_data.quantity),
+            (to_posm_id, "transfer_in", transfer_data.quantity),
+        ]
+        stock_service = PosmStockService(self.db)
+        for posm_id, reason, quantity in sorted(movements):
+            stock_service.apply_movement(
+                posm_id, reason, transfer_id=transfer.id, created_by=transferred_by, **{delta_field: quantity}
+            )
+        
         self.db.commit()
         self.db.refresh(transfer)
         
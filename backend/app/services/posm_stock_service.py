@@ -0,0 +1,225 @@
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import Integer, String, func, literal, select, update
+from sqlalchemy.orm import Session
+from app.models.posm import Posm
+from app.models.posm_stock_movement import PosmStockMovement
+
+
+class PosmStockService:
+    """
+    POSM stok hareketleri. Her değişiklik defterde bir satırdır; posm sayaçları defterin toplamıdır
+    ve hareketle aynı transaction'da koşullu UPDATE ile güncellenir (okuyup Python'da kontrol etmek yok).
+    Metotlar commit etmez; transaction sınırı çağıran servisindir. Sayaçlar POSM katalog önbelleğinde
+    tutulmaz (liste okunurken canlı sorgulanır), bu yüzden stok hareketleri katalog sürümünü artırmaz.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply_movement(
+        self,
+        posm_id: int,
+        reason: str,
+        ready_delta: int = 0,
+        repair_pending_delta: int = 0,
+        request_id: Optional[int] = None,
+        transfer_id: Optional[int] = None,
+        created_by: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Sayaçları tek ifadede değiştir ve hareketi deftere yaz; yeni (hazır, tamir bekleyen) döner.
+        UPDATE ... WHERE ready_count + delta >= 0 RETURNING: eşzamanlı iki düşüm satır kilidinde sıralanır,
+        ikincisi koşulu güncel değerle yeniden değerlendirir. Stok yetmezse ValueError.
+        """
+        stmt = (
+            update(Posm)
+            .where(
+                Posm.id == posm_id,
+                Posm.ready_count + ready_delta >= 0,
+                Posm.repair_pending_count + repair_pending_delta >= 0
+            )
+            .values(
+                ready_count=Posm.ready_count + ready_delta,
+                repair_pending_count=Posm.repair_pending_count + repair_pending_delta,
+                updated_at=func.now()
+            )
+            .returning(Posm.ready_count, Posm.repair_pending_count)
+            .execution_options(synchronize_session=False)
+        )
+        row = self.db.execute(stmt).first()
+        
+        if row is None:
+            current = self.db.query(Posm.ready_count, Posm.repair_pending_count).filter(Posm.id == posm_id).first()
+            if current is None:
+                raise ValueError("POSM bulunamadı")
+            if current.ready_count + ready_delta < 0:
+                raise ValueError(f"Yetersiz hazır stok. Mevcut: {current.ready_count}, İstenen: {-ready_delta}")
+            raise ValueError(f"Yetersiz tamir bekleyen stok. Mevcut: {current.repair_pending_count}, İstenen: {-repair_pending_delta}")
+        
+        self.db.add(PosmStockMovement(
+            posm_id=posm_id,
+            ready_delta=ready_delta,
+            repair_pending_delta=repair_pending_delta,
+            reason=reason,
+            request_id=request_id,
+            transfer_id=transfer_id,
+            created_by=created_by
+        ))
+        return row.ready_count, row.repair_pending_count
+
+    def set_counts(
+        self,
+        posm_id: int,
+        ready_count: Optional[int] = None,
+        repair_pending_count: Optional[int] = None,
+        reason: str = "adjustment",
+        created_by: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Sayım düzeltmesi: satır kilitlenir (SELECT ... FOR UPDATE), fark hareket olarak yazılır"""
+        current = (
+            self.db.query(Posm.ready_count, Posm.repair_pending_count)
+            .filter(Posm.id == posm_id)
+            .with_for_update()
+            .first()
+        )
+        if current is None:
+            raise ValueError("POSM bulunamadı")
+        
+        ready_delta = 0 if ready_count is None else ready_count - current.ready_count
+        repair_pending_delta = 0 if repair_pending_count is None else repair_pending_count - current.repair_pending_count
+        if ready_delta == 0 and repair_pending_delta == 0:
+            return current.ready_count, current.repair_pending_count
+        
+        return self.apply_movement(
+            posm_id,
+            reason,
+            ready_delta=ready_delta,
+            repair_pending_delta=repair_pending_delta,
+            created_by=created_by
+        )
+
+    def _ledger_totals(self):
+        return (
+            select(
+                PosmStockMovement.posm_id,
+                func.sum(PosmStockMovement.ready_delta).label("ready"),
+                func.sum(PosmStockMovement.repair_pending_delta).label("repair_pending")
+            )
+            .group_by(PosmStockMovement.posm_id)
+            .subquery("ledger")
+        )
+
+    @staticmethod
+    def _ledger_sum(column):
+        return (
+            select(func.coalesce(func.sum(column), 0))
+            .where(PosmStockMovement.posm_id == Posm.id)
+            .scalar_subquery()
+        )
+
+    def record_balances(self, posm_ids: Iterable[int], reason: str, created_by: Optional[int] = None) -> int:
+        """
+        Sayaçları doğrudan yazılmış POSM'ler için (toplu import upsert'ü, yeni kayıt) defteri sayaçlara
+        denkleştiren hareketleri tek INSERT ... SELECT ile yaz. Sayaç satırları çağıranın transaction'ında
+        kilitli olmalıdır (aynı transaction'daki UPDATE/INSERT yeterli). Yazılan hareket sayısı döner.
+        """
+        posm_ids = list(posm_ids)
+        if not posm_ids:
+            return 0
+        
+        ledger = self._ledger_totals()
+        ready_delta = Posm.ready_count - func.coalesce(ledger.c.ready, 0)
+        repair_pending_delta = Posm.repair_pending_count - func.coalesce(ledger.c.repair_pending, 0)
+        balances = (
+            select(
+                Posm.id, ready_delta, repair_pending_delta,
+                literal(reason, String), literal(created_by, Integer)
+            )
+            .select_from(Posm)
+            .outerjoin(ledger, ledger.c.posm_id == Posm.id)
+            .where(Posm.id.in_(posm_ids), (ready_delta != 0) | (repair_pending_delta != 0))
+        )
+        result = self.db.execute(
+            PosmStockMovement.__table__.insert().from_select(
+                ["posm_id", "ready_delta", "repair_pending_delta", "reason", "created_by"],
+                balances
+            )
+        )
+        return result.rowcount or 0
+
+    def get_movements(self, posm_id: int, limit: int = 100) -> List[dict]:
+        """POSM'in stok hareketleri (en yeni önce)"""
+        movements = (
+            self.db.query(PosmStockMovement)
+            .filter(PosmStockMovement.posm_id == posm_id)
+            .order_by(PosmStockMovement.id.desc())
+            .limit(limit)
+            .all()
+        )
+        return [
+            {
+                "id": m.id,
+                "ready_delta": m.ready_delta,
+                "repair_pending_delta": m.repair_pending_delta,
+                "reason": m.reason,
+                "request_id": m.request_id,
+                "transfer_id": m.transfer_id,
+                "created_by": m.created_by,
+                "created_at": m.created_at.isoformat() if m.created_at else None,
+            }
+            for m in movements
+        ]
+
+    def reconcile(self, fix: bool = False) -> dict:
+        """
+        Sayaçları defter toplamıyla karşılaştır. fix=True ise sapan sayaçlar defterden yeniden hesaplanır
+        (defter esas kayıttır) ve commit edilir.
+        """
+        ledger = self._ledger_totals()
+        ledger_ready = func.coalesce(ledger.c.ready, 0)
+        ledger_repair_pending = func.coalesce(ledger.c.repair_pending, 0)
+        drifted = self.db.execute(
+            select(
+                Posm.id, Posm.name, Posm.depot_id,
+                Posm.ready_count, Posm.repair_pending_count,
+                ledger_ready.label("ledger_ready"), ledger_repair_pending.label("ledger_repair_pending")
+            )
+            .select_from(Posm)
+            .outerjoin(ledger, ledger.c.posm_id == Posm.id)
+            .where((Posm.ready_count != ledger_ready) | (Posm.repair_pending_count != ledger_repair_pending))
+            .order_by(Posm.id)
+        ).all()
+        
+        if fix and drifted:
+            drifted_ids = [row.id for row in drifted]
+            # Önce satırlar kilitlenir; toplam, kilit alındıktan sonraki ayrı ifadede (güncel snapshot) hesaplanır
+            self.db.query(Posm.id).filter(Posm.id.in_(drifted_ids)).with_for_update().all()
+            self.db.execute(
+                update(Posm)
+                .where(Posm.id.in_(drifted_ids))
+                .values(
+                    ready_count=self._ledger_sum(PosmStockMovement.ready_delta),
+                    repair_pending_count=self._ledger_sum(PosmStockMovement.repair_pending_delta),
+                    updated_at=func.now()
+                )
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+        
+        return {
+            "checked": self.db.query(func.count(Posm.id)).scalar() or 0,
+            "drift_count": len(drifted),
+            "fixed": bool(fix and drifted),
+            "drifted": [
+                {
+                    "posm_id": row.id,
+                    "name": row.name,
+                    "depot_id": row.depot_id,
+                    "ready_count": row.ready_count,
+                    "repair_pending_count": row.repair_pending_count,
+                    "ledger_ready": row.ledger_ready,
+                    "ledger_repair_pending": row.ledger_repair_pending,
+                }
+                for row in drifted
+            ],
+        }
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
+from app.models.report_delivery import ReportRun, ReportDelivery
+from app.models.user import User
+from app.services.email_outbox_service import SmtpConnectionPool
+from app.services.notification_service import get_smtp_settings
+
+logger = logging.getLogger(__name__)
+
+# (user_id, email)
+Recipient = Tuple[Optional[int], str]
+
+_admin_recipients: Optional[List[Recipient]] = None
+_admin_recipients_expires_at = 0.0
+_admin_recipients_lock = threading.Lock()
+
+
+def get_admin_recipients(db: Session) -> List[Recipient]:
+    """Admin kullanıcıların (id, email) listesi - ADMIN_RECIPIENTS_CACHE_TTL_SECONDS boyunca önbellekte"""
+    global _admin_recipients, _admin_recipients_expires_at
+    with _admin_recipients_lock:
+        if _admin_recipients is not None and _admin_recipients_expires_at > time.time():
+            return list(_admin_recipients)
+
+    rows = db.query(User.id, User.email).filter(User.role == "admin", User.email.isnot(None)).all()
+    recipients = [(row.id, row.email) for row in rows]
+
+    with _admin_recipients_lock:
+        _admin_recipients = recipients
+        _admin_recipients_expires_at = time.time() + settings.ADMIN_RECIPIENTS_CACHE_TTL_SECONDS
+    return list(recipients)
+
+
+def invalidate_admin_recipients() -> None:
+    """Kullanıcı oluşturma/güncelleme/silme sonrası admin alıcı önbelleğini boşalt"""
+    global _admin_recipients
+    with _admin_recipients_lock:
+        _admin_recipients = None
+
+
+class ReportDeliveryService:
+    """
+    Render edilmiş bir raporu tüm alıcılara eşzamanlı gönderir ve sonucu report_runs / report_deliveries'e yazar.
+    HTML gövdesi bir kez MIME parçasına dönüştürülür; alıcılar paylaşılan bir SMTP bağlantı havuzundan
+    en fazla REPORT_DELIVERY_CONCURRENCY paralel gönderimle işlenir.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def deliver(
+        self,
+        report_key: str,
+        subject: str,
+        html_content: str,
+        recipients: List[Recipient],
+        scheduled_report_id: Optional[int] = None,
+        started_at: Optional[float] = None,
+        render_ms: Optional[int] = None
+    ) -> ReportRun:
+        """Raporu alıcılara gönder. started_at (time.perf_counter) verilirse süre veri çekmeyi de kapsar."""
+        started_at = started_at if started_at is not None else time.perf_counter()
+
+        # Aynı email'e iki kez gönderme
+        unique_recipients = []
+        seen = set()
+        for user_id, email in recipients:
+            if email and email not in seen:
+                seen.add(email)
+                unique_recipients.append((user_id, email))
+
+        smtp = get_smtp_settings()
+        if smtp is None:
+            logger.warning(f"📧 [EMAIL - SMTP AYARLARI YOK] Rapor: {report_key}, {len(unique_recipients)} alıcı, Subject: {subject}")
+            deliveries = [
+                ReportDelivery(recipient_user_id=user_id, recipient_email=email, status="skipped", duration_ms=0)
+                for user_id, email in unique_recipients
+            ]
+        else:
+            # HTML parçası bir kez encode edilir, her alıcının mesajında paylaşılır
+            html_part = MIMEText(html_content, "html")
+            concurrency = max(1, min(settings.REPORT_DELIVERY_CONCURRENCY, len(unique_recipients)))
+            pool = SmtpConnectionPool(concurrency)
+            try:
+                deliveries = await asyncio.gather(*(
+                    self._send_one(pool, smtp, html_part, subject, user_id, email)
+                    for user_id, email in unique_recipients
+                ))
+            finally:
+                await pool.close()
+
+        success_count = sum(1 for d in deliveries if d.status != "failed")
+        run = ReportRun(
+            report_key=report_key,
+            scheduled_report_id=scheduled_report_id,
+            subject=subject[:500],
+            recipient_count=len(deliveries),
+            success_count=success_count,
+            error_count=len(deliveries) - success_count,
+            render_ms=render_ms,
+            duration_ms=int((time.perf_counter() - started_at) * 1000),
+            finished_at=datetime.now(timezone.utc),
+            deliveries=list(deliveries)
+        )
+        self.db.add(run)
+        self.db.commit()
+
+        logger.info(
+            f"📊 Rapor {report_key}: {run.success_count}/{run.recipient_count} alıcıya gönderildi, "
+            f"süre {run.duration_ms} ms (render {render_ms} ms)"
+        )
+        return run
+
+    async def _send_one(
+        self,
+        pool: SmtpConnectionPool,
+        smtp: dict,
+        html_part: MIMEText,
+        subject: str,
+        user_id: Optional[int],
+        email: str
+    ) -> ReportDelivery:
+        started = time.perf_counter()
+        message = MIMEMultipart("alternative")
+        message["From"] = smtp["from"]
+        message["To"] = email
+        message["Subject"] = subject
+        message.attach(html_part)
+
+        try:
+            await pool.send(message, smtp)
+            status, error = "sent", None
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+            logger.error(f"❌ Rapor gönderme hatası ({email}): {error}")
+
+        return ReportDelivery(
+            recipient_user_id=user_id,
+            recipient_email=email,
+            status=status,
+            error=error,
+            duration_ms=int((time.perf_counter() - started) * 1000)
+        )
+
+    def get_runs(self, scheduled_report_id: Optional[int] = None, report_key: Optional[str] = None, limit: int = 50) -> List[ReportRun]:
+        """Son rapor çalışmaları (en yeni önce)"""
+        query = self.db.query(ReportRun)
+        if scheduled_report_id:
+            query = query.filter(ReportRun.scheduled_report_id == scheduled_report_id)
+        if report_key:
+            query = query.filter(ReportRun.report_key == report_key)
+        return query.order_by(ReportRun.id.desc()).limit(limit).all()
+
+    def get_run(self, run_id: int) -> Optional[ReportRun]:
+        """Çalışma ve alıcı bazında gönderim kayıtları"""
+        return (
+            self.db.query(ReportRun)
+            .options(selectinload(ReportRun.deliveries))
+            .filter(ReportRun.id == run_id)
+            .first()
+        )
@@ -0,0 +1,156 @@
+import csv
+import io
+import tempfile
+from typing import Iterator, Optional, BinaryIO
+from datetime import date, datetime
+from sqlalchemy.orm import Session
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from app.models.request import Request
+from app.services.photo_service import PhotoService
+from app.services.request_service import request_report_loaders
+
+# Sunucu tarafı cursor'dan her seferde çekilecek satır sayısı
+EXPORT_BATCH_SIZE = 500
+
+# Dosya parçalarının boyutu (StreamingResponse)
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# (Başlık, Excel sütun genişliği)
+EXPORT_COLUMNS = [
+    ("Talep ID", 10),
+    ("Talep Tarihi", 18),
+    ("Durum", 16),
+    ("Öncelik", 10),
+    ("Bayi Kodu", 14),
+    ("Bayi Adı", 40),
+    ("Territory", 20),
+    ("Depo", 16),
+    ("Yapılacak İş", 14),
+    ("İş Detayı", 50),
+    ("POSM Adı", 24),
+    ("Planlanan Tarih", 16),
+    ("Tamamlanma Tarihi", 19),
+    ("Oluşturan Kullanıcı", 24),
+    ("Oluşturan Email", 30),
+    ("Tamamlayan Kullanıcı", 24),
+    ("Güncelleyen Kullanıcı", 24),
+    ("Fotoğraf Sayısı", 16),
+    ("Enlem", 14),
+    ("Boylam", 14),
+    ("Tamamlanma Süresi (Gün)", 25),
+]
+
+
+class ReportExportService:
+    """Detaylı raporu sabit bellekle dışa aktarır (yield_per cursor + write-only workbook / CSV)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def build_query(
+        self,
+        depot_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status_filter: Optional[str] = None,
+        job_type_filter: Optional[str] = None
+    ):
+        """(Request, fotoğraf sayısı) satırları döndüren filtreli sorgu"""
+        # Fotoğraf sayısı her satır için photos.request_id index'inden sayılır (filtrelenen talepler kadar)
+        query = (
+            self.db.query(Request, PhotoService.photo_count_subquery())
+            .options(*request_report_loaders())
+        )
+
+        if depot_id:
+            query = query.filter(Request.depot_id == depot_id)
+        if start_date:
+            query = query.filter(Request.request_date >= datetime.combine(start_date, datetime.min.time()))
+        if end_date:
+            query = query.filter(Request.request_date <= datetime.combine(end_date, datetime.max.time()))
+        if status_filter:
+            query = query.filter(Request.status == status_filter)
+        if job_type_filter:
+            query = query.filter(Request.job_type == job_type_filter)
+
+        return query.order_by(Request.request_date.desc())
+
+    def iter_rows(self, **filters) -> Iterator[tuple]:
+        """EXPORT_COLUMNS sırasıyla satır değerleri (sunucu tarafı cursor ile parça parça)"""
+        for req, photo_count in self.build_query(**filters).yield_per(EXPORT_BATCH_SIZE):
+            completion_days = None
+            if req.completed_date and req.request_date:
+                completion_days = (req.completed_date - req.request_date.date()).days
+
+            lat = str(req.latitude) if req.latitude is not None else (str(req.dealer.latitude) if req.dealer and req.dealer.latitude is not None else None)
+            lng = str(req.longitude) if req.longitude is not None else (str(req.dealer.longitude) if req.dealer and req.dealer.longitude is not None else None)
+
+            yield (
+                req.id,
+                req.request_date.strftime("%d.%m.%Y %H:%M") if req.request_date else "",
+                req.status,
+                req.priority or "Orta",
+                req.dealer.code,
+                req.dealer.name,
+                req.territory.name if req.territory else "",
+                req.depot.name if req.depot else "",
+                req.job_type,
+                req.job_detail or "",
+                req.posm.name if req.posm else "",
+                req.planned_date.strftime("%d.%m.%Y") if req.planned_date else "",
+                req.completed_date.strftime("%d.%m.%Y") if req.completed_date else "",
+                req.user.name,
+                req.user.email,
+                req.completed_by_user.name if req.completed_by_user else "",
+                req.updated_by_user.name if req.updated_by_user else "",
+                photo_count,
+                lat or "",
+                lng or "",
+                completion_days if completion_days is not None else "",
+            )
+
+    def write_xlsx(self, fileobj: BinaryIO, **filters) -> None:
+        """Write-only workbook ile Excel dosyasını fileobj'ye yaz (satırlar bellekte tutulmaz)"""
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Detaylı Rapor")
+
+        # Write-only modda sütun genişlikleri satırlardan önce ayarlanmalı
+        for idx, (_, width) in enumerate(EXPORT_COLUMNS, start=1):
+            worksheet.column_dimensions[get_column_letter(idx)].width = width
+
+        worksheet.append([title for title, _ in EXPORT_COLUMNS])
+        for row in self.iter_rows(**filters):
+            worksheet.append(row)
+
+        workbook.save(fileobj)
+
+    def iter_xlsx(self, **filters) -> Iterator[bytes]:
+        """Excel dosyasını geçici dosyaya yazıp parça parça döndür"""
+        with tempfile.TemporaryFile() as tmp:
+            self.write_xlsx(tmp, **filters)
+            tmp.seek(0)
+            while True:
+                chunk = tmp.read(EXPORT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def iter_csv(self, **filters) -> Iterator[bytes]:
+        """CSV çıktısını satır grupları halinde üret (Excel'in Türkçe karakterleri tanıması için UTF-8 BOM ile)"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";")
+
+        buffer.write("\ufeff")
+        writer.writerow([title for title, _ in EXPORT_COLUMNS])
+
+        for idx, row in enumerate(self.iter_rows(**filters), start=1):
+            writer.writerow(row)
+            if idx % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        remaining = buffer.getvalue()
+        if remaining:
+            yield remaining.encode("utf-8")
@@ -1,18 +1,51 @@
+import base64
 from typing import List, Optional
 from datetime import date, datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import Integer, and_, any_, bindparam, or_, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from app.models.request import Request, JobType, RequestStatus
 from app.models.dealer import Dealer
 from app.models.user import User
 from app.models.territory import Territory
 from app.models.posm import Posm
+from app.services.stats_service import StatsService
+from app.services.posm_stock_service import PosmStockService
+from app.services.audit_service import AuditService
 from app.schemas.request import (
     RequestCreate, RequestResponse, RequestDetailResponse,
-    RequestUpdate, RequestStatsResponse
+    RequestUpdate, RequestStatsResponse, RequestListFilter, RequestPageResponse
 )
 
 
+def request_list_loaders() -> tuple:
+    """Liste görünümleri için eager-loading seçenekleri (_to_response'un okuduğu ilişkiler)"""
+    return (
+        joinedload(Request.territory),
+        joinedload(Request.dealer),
+        joinedload(Request.posm),
+        joinedload(Request.user),
+    )
+
+
+def request_detail_loaders() -> tuple:
+    """Detay görünümü için eager-loading seçenekleri (fotoğraflar ve kullanıcılar dahil)"""
+    return request_list_loaders() + (
+        joinedload(Request.completed_by_user),
+        joinedload(Request.updated_by_user),
+        selectinload(Request.photos),
+    )
+
+
+def request_report_loaders() -> tuple:
+    """Rapor satırları için eager-loading seçenekleri (depo ve kullanıcılar dahil)"""
+    return request_list_loaders() + (
+        joinedload(Request.depot),
+        joinedload(Request.completed_by_user),
+        joinedload(Request.updated_by_user),
+    )
+
+
 class RequestService:
     def __init__(self, db: Session):
         self.db = db
@@ -63,39 +96,11 @@ class RequestService:
         if not user:
             return []
         
-        # Tech kullanıcılar için: Kendi talepleri + kendi depolarındaki tüm talepler
-        user_role = user.role.value if hasattr(user.role, 'value') else user.role
-        if include_depot_requests and user_role in ["tech", "admin"]:
-            from app.models.user import user_depots
-            user_depot_ids = [depot.id for depot in user.depots] if user.depots else []
-            if not user_depot_ids and user.depot_id:
-                user_depot_ids = [user.depot_id]
-            
-            if user_depot_ids:
-                # Kendi talepleri VEYA kendi depolarındaki talepler
-                query = self.db.query(Request).filter(
-                    or_(
-                        Request.user_id == user.id,
-                        Request.depot_id.in_(user_depot_ids)
-                    )
-                )
-            else:
-                # Sadece kendi talepleri
-                query = self.db.query(Request).filter(Request.user_id == user.id)
-        else:
-            # Normal kullanıcılar: Sadece kendi talepleri
-            query = self.db.query(Request).filter(Request.user_id == user.id)
-        
-        # Depot filtresi: Eğer parametre olarak depot_id verilmişse
-        if depot_id:
-            query = query.filter(Request.depot_id == depot_id)
-        elif not include_depot_requests and user.depot_id:
-            # Normal kullanıcılar için: Kendi depot_id'si varsa filtrele
-            query = query.filter(Request.depot_id == user.depot_id)
+        query = self._user_scope_query(user, depot_id, include_depot_requests)
         
         # Tüm durumları dahil et (tamamlanan dahil) - status filtresi yok
         # request_date: oluşturulma tarihi (DateTime)
-        requests = query.order_by(Request.request_date.desc()).all()
+        requests = query.options(*request_list_loaders()).order_by(Request.request_date.desc()).all()
         
         return [self._to_response(r) for r in requests]
 
@@ -106,12 +111,110 @@ class RequestService:
         if depot_id:
             query = query.filter(Request.depot_id == depot_id)
         
-        requests = query.order_by(Request.request_date.desc()).all()
+        requests = query.options(*request_list_loaders()).order_by(Request.request_date.desc()).all()
+        return [self._to_response(r, include_user=True) for r in requests]
+
+    def get_requests_page(
+        self,
+        filters: RequestListFilter,
+        user_email: Optional[str] = None,
+        include_depot_requests: bool = False,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> RequestPageResponse:
+        """Talepleri sayfalı getir (keyset cursor: request_date DESC, id DESC)
+        
+        Args:
+            filters: Depot, durum, iş tipi, öncelik ve tarih aralığı filtreleri
+            user_email: Verilirse sadece kullanıcının görebildiği talepler (get_user_requests ile aynı kapsam)
+            include_depot_requests: Tech kullanıcılar için kendi depolarındaki talepleri de dahil et
+            limit: Sayfa boyutu
+            cursor: Önceki sayfanın next_cursor değeri
+            include_total: Filtreye uyan toplam kayıt sayısını da hesapla (ek COUNT sorgusu)
+        """
+        if user_email:
+            user = self.db.query(User).filter(User.email == user_email).first()
+            if not user:
+                return RequestPageResponse(items=[], next_cursor=None, limit=limit, total=0 if include_total else None)
+            query = self._user_scope_query(user, filters.depot_id, include_depot_requests)
+        else:
+            query = self.db.query(Request)
+            if filters.depot_id:
+                query = query.filter(Request.depot_id == filters.depot_id)
+        
+        if filters.status:
+            query = query.filter(Request.status.in_(filters.status))
+        if filters.job_type:
+            query = query.filter(Request.job_type.in_(filters.job_type))
+        if filters.priority:
+            query = query.filter(Request.priority.in_(filters.priority))
+        if filters.start_date:
+            query = query.filter(Request.request_date >= datetime.combine(filters.start_date, datetime.min.time()))
+        if filters.end_date:
+            query = query.filter(Request.request_date <= datetime.combine(filters.end_date, datetime.max.time()))
+        
+        total = query.order_by(None).count() if include_total else None
+        
+        if cursor:
+            cursor_date, cursor_id = self._decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Request.request_date, Request.id) < tuple_(cursor_date, cursor_id)
+            )
+        
+        # Bir fazla kayıt çekerek sonraki sayfa olup olmadığını anla
+        rows = (
+            query.options(*request_list_loaders())
+            .order_by(Request.request_date.desc(), Request.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = self._encode_cursor(rows[-1].request_date, rows[-1].id)
+        
+        return RequestPageResponse(
+            items=[self._to_response(r, include_user=user_email is None) for r in rows],
+            next_cursor=next_cursor,
+            limit=limit,
+            total=total
+        )
+
+    def get_pending_requests(self, depot_ids: Optional[List[int]] = None) -> List[RequestResponse]:
+        """Bekleyen işleri getir (iş planı için, depo filtresi ile)"""
+        query = self.db.query(Request).filter(Request.status == RequestStatus.BEKLEMEDE.value)
+        
+        if depot_ids:
+            query = query.filter(Request.depot_id.in_(depot_ids))
+        
+        requests = query.options(*request_list_loaders()).order_by(Request.requested_date.asc()).all()
+        return [self._to_response(r, include_user=True) for r in requests]
+
+    def get_planned_requests(
+        self,
+        depot_ids: Optional[List[int]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[RequestResponse]:
+        """Takvime eklenmiş işleri getir (depo ve planlanan tarih aralığı filtresi ile)"""
+        query = self.db.query(Request).filter(Request.status == RequestStatus.TAKVIME_EKLENDI.value)
+        
+        if depot_ids:
+            query = query.filter(Request.depot_id.in_(depot_ids))
+        if start_date:
+            query = query.filter(Request.planned_date >= start_date)
+        if end_date:
+            query = query.filter(Request.planned_date <= end_date)
+        
+        requests = query.options(*request_list_loaders()).order_by(Request.planned_date.asc()).all()
         return [self._to_response(r, include_user=True) for r in requests]
 
     def get_request_by_id(self, request_id: int) -> Optional[RequestDetailResponse]:
         """Talep detaylarını getir"""
-        request = self.db.query(Request).filter(Request.id == request_id).first()
+        request = self.db.query(Request).options(*request_detail_loaders()).filter(Request.id == request_id).first()
         if not request:
             return None
         
@@ -160,13 +263,19 @@ class RequestService:
             latitude=latitude,
             longitude=longitude,
             photos=photos,
+            fotografSayisi=len(photos),
             tamamlayanKullanici=completed_by_name,
             guncelleyenKullanici=updated_by_name
         )
 
     def update_request(self, request_id: int, update_data: RequestUpdate, updated_by_id: int) -> Optional[Request]:
         """Talep güncelle"""
-        request = self.db.query(Request).filter(Request.id == request_id).first()
+        completing = update_data.status == RequestStatus.TAMAMLANDI.value
+        query = self.db.query(Request).filter(Request.id == request_id)
+        if completing:
+            # Aynı talebi eşzamanlı tamamlayan ikinci istek ilkinin commit'ini bekler ve güncel durumu görür
+            query = query.with_for_update(of=Request).populate_existing()
+        request = query.first()
         if not request:
             return None
         
@@ -213,78 +322,138 @@ class RequestService:
         pass
         
         # POSM stok güncelleme (Montaj/Demontaj için)
-        # Request'in depot_id'si ile POSM'in depot_id'sinin eşleştiğini kontrol et
-        if update_data.status == RequestStatus.TAMAMLANDI.value and request.posm:
+        # Yalnızca "Tamamlandı"ya geçişte bir kez uygulanır (tamamlanmış talebin yeniden kaydı stoğu değiştirmez)
+        if (
+            completing
+            and old_status != RequestStatus.TAMAMLANDI.value
+            and request.posm
+            and request.job_type in (JobType.MONTAJ.value, JobType.DEMONTAJ.value)
+        ):
+            posm_id = request.posm_id
             # Depot kontrolü: Request'in depot_id'si ile POSM'in depot_id'si eşleşmeli
             if request.depot_id and request.posm.depot_id != request.depot_id:
-                # Eğer eşleşmiyorsa, doğru depodaki POSM'i bul
-                correct_posm = self.db.query(Posm).filter(
+                # Doğru depodaki POSM'i kullan; bulunamazsa mevcut POSM (backward compatibility)
+                correct_posm_id = self.db.query(Posm.id).filter(
                     Posm.name == request.posm.name,
                     Posm.depot_id == request.depot_id
-                ).first()
-                if correct_posm:
-                    # Doğru depodaki POSM'i kullan
-                    if request.job_type == JobType.MONTAJ.value:
-                        # Stok kontrolü yap
-                        if correct_posm.ready_count <= 0:
-                            raise ValueError(f"Yetersiz hazır stok. Mevcut: {correct_posm.ready_count}, İstenen: 1")
-                        correct_posm.ready_count -= 1
-                    elif request.job_type == JobType.DEMONTAJ.value:
-                        correct_posm.repair_pending_count += 1
-                else:
-                    # Doğru depoda POSM bulunamadı, mevcut POSM'i kullan (backward compatibility)
-                    if request.job_type == JobType.MONTAJ.value:
-                        # Stok kontrolü yap
-                        if request.posm.ready_count <= 0:
-                            raise ValueError(f"Yetersiz hazır stok. Mevcut: {request.posm.ready_count}, İstenen: 1")
-                        request.posm.ready_count -= 1
-                    elif request.job_type == JobType.DEMONTAJ.value:
-                        request.posm.repair_pending_count += 1
+                ).scalar()
+                if correct_posm_id:
+                    posm_id = correct_posm_id
+            
+            stock_service = PosmStockService(self.db)
+            if request.job_type == JobType.MONTAJ.value:
+                # Hazır stoktan düş (koşullu UPDATE; stok yetmezse ValueError)
+                stock_service.apply_movement(
+                    posm_id, "montaj", ready_delta=-1, request_id=request.id, created_by=updated_by_id
+                )
             else:
-                # Normal durum: Depot'lar eşleşiyor veya depot_id yok
-                if request.job_type == JobType.MONTAJ.value:
-                    # Hazır stoktan düş - stok kontrolü yap
-                    if request.posm.ready_count <= 0:
-                        raise ValueError(f"Yetersiz hazır stok. Mevcut: {request.posm.ready_count}, İstenen: 1")
-                    request.posm.ready_count -= 1
-                elif request.job_type == JobType.DEMONTAJ.value:
-                    # Tamir bekleyene ekle
-                    request.posm.repair_pending_count += 1
+                # Tamir bekleyene ekle
+                stock_service.apply_movement(
+                    posm_id, "demontaj", repair_pending_delta=1, request_id=request.id, created_by=updated_by_id
+                )
         
         self.db.commit()
         self.db.refresh(request)
         
         return request
 
+    def plan_requests(
+        self,
+        request_ids: List[int],
+        planned_date: date,
+        planned_by_id: int,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> dict:
+        """
+        Talepleri toplu planla: id'ler tek sorguda doğrulanır, durum ve planlanan tarih tek
+        UPDATE ... WHERE id = ANY(:ids) AND status = 'Beklemede' RETURNING ile yazılır,
+        audit kayıtları tek toplu INSERT'tir ve UPDATE ile aynı commit'te yazılır.
+        Dönen owner_requests ({talep sahibi id: [talep id]}) sahip başına tek bildirim için kullanılır.
+        """
+        request_ids = list(dict.fromkeys(request_ids))
+        if not request_ids:
+            return {"updated": 0, "planned_ids": [], "owner_requests": {}, "errors": []}
+        
+        current = {
+            row.id: row
+            for row in self.db.query(Request.id, Request.status, Request.planned_date).filter(
+                Request.id == any_(bindparam("ids", request_ids, type_=ARRAY(Integer)))
+            )
+        }
+        
+        stmt = (
+            update(Request)
+            .where(
+                Request.id == any_(bindparam("ids", request_ids, type_=ARRAY(Integer))),
+                Request.status == RequestStatus.BEKLEMEDE.value
+            )
+            .values(
+                status=RequestStatus.TAKVIME_EKLENDI.value,
+                planned_date=planned_date,
+                updated_by=planned_by_id
+            )
+            .returning(Request.id, Request.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        planned = self.db.execute(stmt).all()
+        
+        planned_ids = {row.id for row in planned}
+        owner_requests = {}
+        for row in planned:
+            owner_requests.setdefault(row.user_id, []).append(row.id)
+        
+        errors = []
+        for request_id in request_ids:
+            if request_id in planned_ids:
+                continue
+            if request_id not in current:
+                errors.append(f"Talep {request_id} bulunamadı")
+            else:
+                # Doğrulamadan sonra başka bir istekle planlanmış olabilir; UPDATE koşulu esastır
+                errors.append(f"Talep {request_id} zaten planlanmış veya tamamlanmış")
+        
+        new_values = {"status": RequestStatus.TAKVIME_EKLENDI.value, "planned_date": planned_date.isoformat()}
+        AuditService(self.db).create_logs([
+            {
+                "user_id": planned_by_id,
+                "action": "UPDATE",
+                "entity_type": "Request",
+                "entity_id": request_id,
+                "old_values": {
+                    "status": current[request_id].status,
+                    "planned_date": current[request_id].planned_date.isoformat() if current[request_id].planned_date else None,
+                },
+                "new_values": new_values,
+                "description": f"Talep planlandı: {request_id}",
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+            }
+            for request_id in request_ids
+            if request_id in planned_ids
+        ])
+        
+        return {
+            "updated": len(planned_ids),
+            "planned_ids": [request_id for request_id in request_ids if request_id in planned_ids],
+            "owner_requests": owner_requests,
+            "errors": errors,
+        }
+
     def get_request_stats(self, user_email: Optional[str] = None, depot_id: Optional[int] = None) -> RequestStatsResponse:
         """Talep istatistiklerini getir (depot filtresi ile)"""
-        query = self.db.query(Request)
+        user_id = None
         
         # Kullanıcıya özel ise filtrele
         if user_email:
             user = self.db.query(User).filter(User.email == user_email).first()
             if user:
-                query = query.filter(Request.user_id == user.id)
+                user_id = user.id
                 # Kullanıcının depot_id'si varsa filtrele
                 if user.depot_id and not depot_id:
                     depot_id = user.depot_id
         
-        # Depot filtresi
-        if depot_id:
-            query = query.filter(Request.depot_id == depot_id)
-        
-        requests = query.all()
-        
-        counts = {"open": 0, "completed": 0, "pending": 0}
-        
-        for req in requests:
-            if req.status == RequestStatus.TAMAMLANDI.value:
-                counts["completed"] += 1
-            elif req.status == RequestStatus.BEKLEMEDE.value:
-                counts["pending"] += 1
-            else:
-                counts["open"] += 1
-        
+        counts = StatsService(self.db).get_status_counts(user_id=user_id, depot_id=depot_id)
         return RequestStatsResponse(**counts)
 
     def _to_response(self, request: Request, include_user: bool = False) -> RequestResponse:
@@ -318,3 +487,52 @@ class RequestService:
             response.email = request.user.email
         
         return response
+
+    def _user_scope_query(self, user: User, depot_id: Optional[int] = None, include_depot_requests: bool = False):
+        """Kullanıcının görebildiği talepler için temel sorgu (depot filtresi ile)"""
+        # Tech kullanıcılar için: Kendi talepleri + kendi depolarındaki tüm talepler
+        user_role = user.role.value if hasattr(user.role, 'value') else user.role
+        if include_depot_requests and user_role in ["tech", "admin"]:
+            user_depot_ids = [depot.id for depot in user.depots] if user.depots else []
+            if not user_depot_ids and user.depot_id:
+                user_depot_ids = [user.depot_id]
+            
+            if user_depot_ids:
+                # Kendi talepleri VEYA kendi depolarındaki talepler
+                query = self.db.query(Request).filter(
+                    or_(
+                        Request.user_id == user.id,
+                        Request.depot_id.in_(user_depot_ids)
+                    )
+                )
+            else:
+                # Sadece kendi talepleri
+                query = self.db.query(Request).filter(Request.user_id == user.id)
+        else:
+            # Normal kullanıcılar: Sadece kendi talepleri
+            query = self.db.query(Request).filter(Request.user_id == user.id)
+        
+        # Depot filtresi: Eğer parametre olarak depot_id verilmişse
+        if depot_id:
+            query = query.filter(Request.depot_id == depot_id)
+        elif not include_depot_requests and user.depot_id:
+            # Normal kullanıcılar için: Kendi depot_id'si varsa filtrele
+            query = query.filter(Request.depot_id == user.depot_id)
+        
+        return query
+
+    @staticmethod
+    def _encode_cursor(request_date: datetime, request_id: int) -> str:
+        """Keyset cursor'ı (request_date, id) çiftinden üret"""
+        raw = f"{request_date.isoformat()}|{request_id}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str):
+        """Keyset cursor'ı çöz, geçersizse ValueError fırlat"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            date_part, id_part = raw.rsplit("|", 1)
+            return datetime.fromisoformat(date_part), int(id_part)
+        except Exception:
+            raise ValueError("Geçersiz cursor")
@@ -0,0 +1,121 @@
+from typing import Optional
+from datetime import date, datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import func, cast, Date
+from app.models.request import Request, RequestStatus, JobType
+from app.core.reference_cache import get_depot_names
+
+
+class StatsService:
+    """Talep istatistiklerini SQL tarafında (GROUP BY + COUNT(*) FILTER) hesaplar.
+    Maliyet tarih aralığındaki talep sayısından bağımsızdır; Python'a sadece depo başına bir satır döner.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_report_stats(
+        self,
+        depot_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> dict:
+        """Durum, iş tipi ve depo bazında sayılar, tamamlanma oranı ve ortalama tamamlanma süresi"""
+        is_completed = Request.status == RequestStatus.TAMAMLANDI.value
+        # Postgres: date - date = gün sayısı (integer)
+        completion_days = Request.completed_date - cast(Request.request_date, Date)
+        has_completion_dates = is_completed & Request.completed_date.isnot(None)
+
+        query = self.db.query(
+            Request.depot_id,
+            func.count().label("total"),
+            func.count().filter(Request.status == RequestStatus.BEKLEMEDE.value).label("pending"),
+            func.count().filter(Request.status == RequestStatus.TAKVIME_EKLENDI.value).label("planned"),
+            func.count().filter(is_completed).label("completed"),
+            func.count().filter(Request.status == RequestStatus.IPTAL.value).label("cancelled"),
+            func.count().filter(Request.job_type == JobType.MONTAJ.value).label("montaj"),
+            func.count().filter(Request.job_type == JobType.DEMONTAJ.value).label("demontaj"),
+            func.count().filter(Request.job_type == JobType.BAKIM.value).label("bakim"),
+            func.coalesce(func.sum(completion_days).filter(has_completion_dates), 0).label("completion_days_sum"),
+            func.count().filter(has_completion_dates).label("completion_days_count"),
+        )
+
+        if depot_id:
+            query = query.filter(Request.depot_id == depot_id)
+        if start_date:
+            query = query.filter(Request.request_date >= datetime.combine(start_date, datetime.min.time()))
+        if end_date:
+            query = query.filter(Request.request_date <= datetime.combine(end_date, datetime.max.time()))
+
+        rows = query.group_by(Request.depot_id).all()
+
+        totals = {
+            "total": 0, "pending": 0, "planned": 0, "completed": 0, "cancelled": 0,
+            "montaj": 0, "demontaj": 0, "bakim": 0,
+            "completion_days_sum": 0, "completion_days_count": 0,
+        }
+        rows_by_depot = {}
+        for row in rows:
+            rows_by_depot[row.depot_id] = row
+            for key in totals:
+                totals[key] += getattr(row, key) or 0
+
+        # Depo bazında (talebi olmayan depolar da 0 ile listelenir)
+        by_depot = {}
+        for depot_id, depot_name in get_depot_names(self.db).items():
+            row = rows_by_depot.get(depot_id)
+            by_depot[depot_name] = {
+                "total": row.total if row else 0,
+                "pending": row.pending if row else 0,
+                "completed": row.completed if row else 0
+            }
+
+        total = totals["total"]
+        completed = totals["completed"]
+        completion_rate = (completed / total * 100) if total > 0 else 0.0
+
+        avg_completion_time = None
+        if totals["completion_days_count"]:
+            avg_completion_time = float(totals["completion_days_sum"]) / totals["completion_days_count"]
+
+        return {
+            "total_requests": total,
+            "pending_requests": totals["pending"],
+            "planned_requests": totals["planned"],
+            "completed_requests": completed,
+            "cancelled_requests": totals["cancelled"],
+            "by_depot": by_depot,
+            "by_job_type": {
+                JobType.MONTAJ.value: totals["montaj"],
+                JobType.DEMONTAJ.value: totals["demontaj"],
+                JobType.BAKIM.value: totals["bakim"]
+            },
+            "by_status": {
+                RequestStatus.BEKLEMEDE.value: totals["pending"],
+                RequestStatus.TAKVIME_EKLENDI.value: totals["planned"],
+                RequestStatus.TAMAMLANDI.value: completed,
+                RequestStatus.IPTAL.value: totals["cancelled"]
+            },
+            "completion_rate": round(completion_rate, 2),
+            "avg_completion_time_days": round(avg_completion_time, 2) if avg_completion_time else None
+        }
+
+    def get_status_counts(self, user_id: Optional[int] = None, depot_id: Optional[int] = None) -> dict:
+        """Açık / tamamlanan / bekleyen talep sayıları (tek sorgu)"""
+        query = self.db.query(
+            func.count().label("total"),
+            func.count().filter(Request.status == RequestStatus.TAMAMLANDI.value).label("completed"),
+            func.count().filter(Request.status == RequestStatus.BEKLEMEDE.value).label("pending"),
+        )
+
+        if user_id:
+            query = query.filter(Request.user_id == user_id)
+        if depot_id:
+            query = query.filter(Request.depot_id == depot_id)
+
+        row = query.one()
+        return {
+            "open": row.total - row.completed - row.pending,
+            "completed": row.completed,
+            "pending": row.pending
+        }
@@ -0,0 +1,44 @@
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """
+    Bir blok içinde çalıştırılan SQL ifadelerini sayar.
+    N+1 regresyonlarını yakalamak için endpoint/servis çağrılarının etrafında kullanılır:
+
+        with QueryCounter(engine) as counter:
+            RequestService(db).get_all_requests()
+        counter.assert_max(3)
+    """
+
+    def __init__(self, engine: Optional[Engine] = None):
+        if engine is None:
+            from app.db.session import engine as default_engine
+            engine = default_engine
+        self.engine = engine
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def assert_max(self, expected: int, label: str = "") -> None:
+        """Sorgu sayısı beklenenden fazlaysa AssertionError fırlat (çalışan SQL'leri listeler)"""
+        if self.count > expected:
+            executed = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(self.statements))
+            raise AssertionError(
+                f"{label or 'Blok'} {self.count} SQL sorgusu çalıştırdı, en fazla {expected} bekleniyordu:\n{executed}"
+            )
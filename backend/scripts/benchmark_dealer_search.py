@@ -0,0 +1,215 @@
+"""
+Bayi aramasını sentetik veriyle ölçer: --dealers adet bayi (varsayılan 100.000) geçici depolara yazılır,
+her arama terimi için eski arama (ILIKE '%terim%', limitsiz, territory satır başına lazy load) ile
+DealerService.search_dealers (tr_fold + trigram/önek index'leri, sıralı, limitli, territory join) karşılaştırılır.
+Yeni sorgunun planında kullanılan index'ler EXPLAIN ile raporlanır; Türkçe harf katlaması
+(İSTANBUL / istanbul / ıstanbul aynı sonucu vermeli) kontrol edilir; Python ve SQL katlamasının
+(fold_search_text / tr_fold) her Türkçe büyük harf için aynı sonucu verdiği de doğrulanır.
+
+PostgreSQL ve alembic e1f2a3b4c5d6 (tr_fold, pg_trgm index'leri) gerektirir. Test verisi sonunda silinir (--keep ile saklanır).
+Kullanım: python scripts/benchmark_dealer_search.py [--dealers 100000] [--depots 3] [--repeat 20]
+"""
+import sys
+import os
+import re
+import argparse
+import random
+import statistics
+import time
+
+# Proje root'unu path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert, or_, text
+from app.db.session import SessionLocal, engine
+from app.models.dealer import Dealer
+from app.models.depot import Depot
+from app.models.territory import Territory
+from app.services.dealer_service import DealerService
+
+_INDEX_IN_PLAN = re.compile(r"(?:Index (?:Only )?Scan(?: Backward)? using|Bitmap Index Scan on) (\w+)")
+
+FIRST_WORDS = ["Özkan", "Şener", "Çelik", "Güneş", "Işık", "İnci", "Yıldız", "Doğan", "Kılıç", "Aydın", "Ünal", "Erdoğan"]
+BUSINESS_WORDS = ["Büfe", "Market", "Gıda", "Tekel", "Bakkal", "Şarküteri", "Kuruyemiş", "Süpermarket"]
+CITIES = ["İstanbul", "İzmir", "Isparta", "Iğdır", "Çanakkale", "Şanlıurfa", "Ankara", "Muğla", "Düzce", "Ağrı"]
+
+# (etiket, terim): kısa önek, tam kod, içerir, Türkçe büyük/küçük harf çeşitleri
+SEARCH_TERMS = [
+    ("Kısa önek (2 karakter)", "bn"),
+    ("Kod öneki", "BNCH0012"),
+    ("Tam kod", "BNCH001233"),
+    ("Ad içerir", "kuruyemiş"),
+    ("Şehir (büyük İ)", "İSTANBUL"),
+    ("Şehir (küçük i)", "istanbul"),
+    ("Şehir (ı ile)", "ıstanbul"),
+    ("Şehir (büyük I)", "ISPARTA"),
+    ("Eşleşmeyen", "zzqx"),
+]
+FOLDING_GROUPS = [("İSTANBUL", "istanbul", "ıstanbul")]
+# fold_search_text ile tr_fold() karşılaştırması: çeviri tablosundaki her harf ve şapkalı kelimeler
+FOLD_SAMPLES = ["İIıiÇĞÖŞÜÂÎÛ", "çğöşüâîû", "KÂĞIT", "HALİÇ KÜLTÜR MERKEZİ", "İNKILÂP", "ÛLFET", "Hâkim Îmar"]
+
+
+def create_dataset(dealer_count: int, depot_count: int) -> dict:
+    db = SessionLocal()
+    try:
+        suffix = f"{int(time.time())}_{os.getpid()}"
+        depots = [Depot(name=f"BENCH {suffix} {i}", code=f"BENCH_{suffix}_{i}") for i in range(depot_count)]
+        territory = Territory(name=f"BENCH {suffix}")
+        db.add_all(depots + [territory])
+        db.flush()
+
+        rng = random.Random(42)
+        rows = []
+        for i in range(dealer_count):
+            rows.append({
+                "code": f"BNCH{i:06d}",
+                "name": f"{rng.choice(FIRST_WORDS)} {rng.choice(BUSINESS_WORDS)} {rng.choice(CITIES)}",
+                "depot_id": depots[i % depot_count].id,
+                "territory_id": territory.id if i % 2 else None,
+            })
+            if len(rows) == 5000:
+                db.execute(insert(Dealer), rows)
+                rows = []
+        if rows:
+            db.execute(insert(Dealer), rows)
+        db.commit()
+        db.execute(text("ANALYZE dealers"))
+        db.commit()
+        return {"depot_ids": [depot.id for depot in depots], "territory_id": territory.id}
+    finally:
+        db.close()
+
+
+def legacy_search(db, search_term: str, depot_id: int) -> list:
+    """Eski DealerService.search_dealers davranışı (karşılaştırma için)"""
+    search_lower = search_term.lower()
+    dealers = db.query(Dealer).filter(
+        Dealer.depot_id == depot_id,
+        or_(Dealer.code.ilike(f"%{search_lower}%"), Dealer.name.ilike(f"%{search_lower}%"))
+    ).all()
+    return [(dealer.territory.name if dealer.territory else None, dealer.code, dealer.name) for dealer in dealers]
+
+
+def timed(func, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95, result
+
+
+def explain_indexes(db, search_term: str, depot_id: int) -> set:
+    """search_dealers'ın dealers sorgusunun planındaki index'ler"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM dealers" in statement:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        DealerService(db).search_dealers(search_term=search_term, depot_id=depot_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    db.rollback()
+
+    used = set()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for statement, parameters in captured:
+            cursor.execute("EXPLAIN " + statement, parameters)
+            used.update(_INDEX_IN_PLAN.findall("\n".join(row[0] for row in cursor.fetchall())))
+        raw.rollback()
+    finally:
+        raw.close()
+    return used
+
+
+def fold_mismatches(db) -> list:
+    """Python ve SQL harf katlamasının farklı sonuç verdiği örnekler: (örnek, python, sql)"""
+    mismatches = []
+    for sample in FOLD_SAMPLES:
+        python_folded = DealerService.fold_search_text(sample)
+        sql_folded = db.execute(text("SELECT tr_fold(:value)"), {"value": sample}).scalar()
+        if python_folded != sql_folded:
+            mismatches.append((sample, python_folded, sql_folded))
+    return mismatches
+
+
+def cleanup(dataset: dict) -> None:
+    db = SessionLocal()
+    try:
+        db.query(Dealer).filter(Dealer.depot_id.in_(dataset["depot_ids"])).delete(synchronize_session=False)
+        db.query(Territory).filter(Territory.id == dataset["territory_id"]).delete(synchronize_session=False)
+        db.query(Depot).filter(Depot.id.in_(dataset["depot_ids"])).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bayi arama benchmark'ı (sentetik veri)")
+    parser.add_argument("--dealers", type=int, default=100000, help="Sentetik bayi sayısı")
+    parser.add_argument("--depots", type=int, default=3, help="Bayilerin dağıtılacağı depo sayısı")
+    parser.add_argument("--repeat", type=int, default=20, help="Terim başına tekrar")
+    parser.add_argument("--keep", action="store_true", help="Test verisini silme")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("⚠️  Bu benchmark PostgreSQL gerektirir")
+        return 1
+
+    started = time.perf_counter()
+    dataset = create_dataset(args.dealers, args.depots)
+    depot_id = dataset["depot_ids"][0]
+    print(
+        f"🔧 {args.dealers:,} bayi {args.depots} depoya {time.perf_counter() - started:.1f} sn'de yazıldı "
+        f"(aranan depo: ~{args.dealers // args.depots:,} bayi)\n"
+    )
+
+    failures = []
+    db = SessionLocal()
+    try:
+        print(f"{'Terim':<28} {'eski p50/p95 ms':>18} {'eski sonuç':>11} {'yeni p50/p95 ms':>18} {'yeni sonuç':>11}  index")
+        codes_by_term = {}
+        for label, term in SEARCH_TERMS:
+            legacy_p50, legacy_p95, legacy_rows = timed(lambda: legacy_search(db, term, depot_id), max(1, args.repeat // 4))
+            db.expunge_all()
+            new_p50, new_p95, new_rows = timed(
+                lambda: DealerService(db).search_dealers(search_term=term, depot_id=depot_id), args.repeat
+            )
+            codes_by_term[term] = [row.bayiKodu for row in new_rows]
+            used = explain_indexes(db, term, depot_id)
+            print(
+                f"{label:<28} {legacy_p50:>8.1f}/{legacy_p95:<9.1f} {len(legacy_rows):>11,} "
+                f"{new_p50:>8.1f}/{new_p95:<9.1f} {len(new_rows):>11,}  {', '.join(sorted(used)) or 'seq scan'}"
+            )
+
+        for group in FOLDING_GROUPS:
+            if len({tuple(codes_by_term[term]) for term in group}) != 1:
+                failures.append(f"Harf katlama tutarsız: {' / '.join(group)} farklı sonuç verdi")
+        for sample, python_folded, sql_folded in fold_mismatches(db):
+            failures.append(f"Python/SQL katlama farklı: {sample!r} -> {python_folded!r} / {sql_folded!r}")
+        if (codes_by_term.get("BNCH001233") or [None])[0] != "BNCH001233":
+            failures.append("Tam kod eşleşmesi ilk sırada değil")
+    finally:
+        db.close()
+        if not args.keep:
+            cleanup(dataset)
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("\n✅ Harf katlama tutarlı (Python = SQL), tam kod eşleşmesi ilk sırada")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Email rapor şablonlarının render süresini ölçer (veritabanı gerekmez).
+5.000 satırlık haftalık tamamlanan ve bekleyen işler raporunu sahte taleplerle render eder.
+Kullanım: python scripts/benchmark_email_templates.py [--rows 5000] [--repeat 5]
+"""
+import sys
+import os
+import argparse
+import time
+from datetime import datetime, date, timedelta
+from types import SimpleNamespace
+
+# Proje root'unu path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.email_templates import load_email_templates
+from app.services.scheduled_reports import generate_weekly_completed_report, generate_pending_requests_report
+
+
+def build_requests(count: int):
+    """Rapor fonksiyonlarının kullandığı alanlara sahip sahte talepler"""
+    depots = [SimpleNamespace(name=f"Depo {i}") for i in range(5)]
+    users = [SimpleNamespace(name=f"Kullanıcı {i}") for i in range(20)]
+    statuses = ["Beklemede", "TakvimeEklendi", "Tamamlandı"]
+    job_types = ["Montaj", "Demontaj", "Bakım"]
+    priorities = ["Düşük", "Orta", "Yüksek", "Acil"]
+    base = datetime(2026, 1, 1, 9, 0)
+
+    requests = []
+    for i in range(count):
+        requests.append(SimpleNamespace(
+            id=i + 1,
+            status=statuses[i % 3],
+            job_type=job_types[i % 3],
+            priority=priorities[i % 4],
+            request_date=base + timedelta(hours=i),
+            planned_date=date(2026, 2, 1) if i % 2 else None,
+            completed_date=date(2026, 2, 3),
+            dealer=SimpleNamespace(code=f"B{i:05d}", name=f"Bayi {i} & Ortakları"),
+            depot=depots[i % len(depots)],
+            user=users[i % len(users)],
+            completed_by_user=users[(i + 1) % len(users)] if i % 5 else None,
+        ))
+    return requests
+
+
+def measure(label: str, func, requests, repeat: int) -> None:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        html_content = func(requests)
+        timings.append(time.perf_counter() - started)
+        size = len(html_content)
+    best = min(timings)
+    avg = sum(timings) / len(timings)
+    print(
+        f"{label}: {len(requests)} satır, en iyi {best * 1000:.1f} ms, ortalama {avg * 1000:.1f} ms, "
+        f"{len(requests) / best:,.0f} satır/sn, {size / 1024:.0f} KB"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Email rapor şablonu render benchmark'ı")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    template_count = load_email_templates()
+    print(f"{template_count} şablon {(time.perf_counter() - started) * 1000:.1f} ms'de yüklendi")
+
+    requests = build_requests(args.rows)
+    measure("Haftalık tamamlanan işler", generate_weekly_completed_report, requests, args.repeat)
+    measure("Bekleyen ve planlanmış işler", generate_pending_requests_report, requests, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
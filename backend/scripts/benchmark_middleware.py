@@ -0,0 +1,195 @@
+"""
+Middleware yığınının istek başına maliyetini ölçer: eski BaseHTTPMiddleware yığını ile saf ASGI yığını.
+Varsayılan mod süreç içidir (sunucu/veritabanı gerekmez): aynı /health ve /requests endpoint'leri
+iki yığınla sarılır ve ASGI seviyesinde eşzamanlı isteklerle saniyedeki istek sayısı karşılaştırılır.
+--url verilirse çalışan bir sunucuya (ör. deploy öncesi/sonrası) HTTP istekleri atılır.
+
+Kullanım:
+  python scripts/benchmark_middleware.py [--requests 5000] [--concurrency 50] [--rows 100]
+  python scripts/benchmark_middleware.py --url http://localhost:8000 --token <JWT> [--requests 2000]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Proje root'unu path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.core.rate_limit import InMemoryTokenBucketStore, RateLimiter
+from app.middleware.error_handler import ErrorHandlerMiddleware, build_error_response
+from app.middleware.rate_limiter import RateLimiterMiddleware, _get_user_key
+from app.middleware.security_headers import SecurityHeadersMiddleware, SECURITY_HEADERS
+from app.utils.ip_helper import get_client_ip
+
+
+# ---------- Eski (BaseHTTPMiddleware) yığın - karşılaştırma için ----------
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        for key, value in SECURITY_HEADERS.items():
+            response.headers[key] = value
+        return response
+
+
+class LegacyRateLimiterMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, limiter: RateLimiter):
+        super().__init__(app)
+        self.limiter = limiter
+
+    async def dispatch(self, request, call_next):
+        path = request.url.path
+        if path in ['/health', '/']:
+            return await call_next(request)
+        result = await self.limiter.hit(request.method, path, get_client_ip(request) or "unknown", _get_user_key(request))
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(result.limit)
+        response.headers["X-RateLimit-Remaining"] = str(max(0, result.remaining))
+        return response
+
+
+async def legacy_error_handler(request, call_next):
+    try:
+        return await call_next(request)
+    except Exception as e:
+        return build_error_response(e)
+
+
+def build_app(stack: str, rows: int) -> FastAPI:
+    """main.py ile aynı sırada middleware eklenmiş, sahte /health ve /requests endpoint'li uygulama"""
+    app = FastAPI()
+    payload = [
+        {
+            "id": i,
+            "status": "Beklemede",
+            "job_type": "Montaj",
+            "priority": "Orta",
+            "dealer_name": f"Bayi {i}",
+            "depot_name": "Depo",
+            "description": "Örnek talep açıklaması " * 3,
+        }
+        for i in range(rows)
+    ]
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy", "database": "connected", "version": "1.0.0"}
+
+    @app.get("/requests")
+    async def requests_list():
+        return JSONResponse(payload)
+
+    # Limit ölçümü etkilemesin
+    limiter = RateLimiter(InMemoryTokenBucketStore(), default_per_minute=10 ** 9)
+    if stack == "legacy":
+        app.add_middleware(LegacySecurityHeadersMiddleware)
+        app.add_middleware(LegacyRateLimiterMiddleware, limiter=limiter)
+        app.middleware("http")(legacy_error_handler)
+    else:
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(RateLimiterMiddleware, requests_per_minute=10 ** 9, limiter=limiter)
+        app.add_middleware(ErrorHandlerMiddleware)
+    return app
+
+
+async def asgi_get(app, path: str) -> int:
+    """Tek bir GET isteğini doğrudan ASGI seviyesinde çalıştır, status kodunu döndür"""
+    status_code = 0
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive():
+        # uvicorn gibi: gövdeden sonra, response bitene kadar bekle ve disconnect bildir
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_complete.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return status_code
+
+
+async def run_in_process(app, path: str, total: int, concurrency: int) -> float:
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            status_code = await asgi_get(app, path)
+            assert status_code == 200, f"{path}: {status_code}"
+
+    # Isınma
+    for _ in range(50):
+        await asgi_get(app, path)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+
+def run_http(url: str, token: str, total: int, concurrency: int) -> float:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    def fetch(_):
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+            response.read()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(fetch, range(min(50, total))))
+        started = time.perf_counter()
+        list(executor.map(fetch, range(total)))
+    return total / (time.perf_counter() - started)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Middleware yığını benchmark'ı")
+    parser.add_argument("--requests", type=int, default=5000, help="Endpoint başına istek sayısı")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=100, help="Sahte /requests yanıtındaki talep sayısı")
+    parser.add_argument("--url", help="Çalışan sunucunun adresi (verilirse HTTP üzerinden ölçülür)")
+    parser.add_argument("--token", default="", help="/requests için Bearer token (--url ile)")
+    args = parser.parse_args()
+
+    if args.url:
+        base = args.url.rstrip("/")
+        for path in ("/health", "/requests/"):
+            rps = run_http(base + path, args.token, args.requests, args.concurrency)
+            print(f"{path:<12} {rps:10.0f} istek/sn")
+        return 0
+
+    print(f"{'endpoint':<12} {'BaseHTTP':>12} {'saf ASGI':>12} {'fark':>8}")
+    for path in ("/health", "/requests"):
+        results = {}
+        for stack in ("legacy", "asgi"):
+            app = build_app(stack, args.rows)
+            results[stack] = asyncio.run(run_in_process(app, path, args.requests, args.concurrency))
+        change = (results["asgi"] / results["legacy"] - 1) * 100
+        print(f"{path:<12} {results['legacy']:10.0f}/sn {results['asgi']:10.0f}/sn {change:+7.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Sıcak talep / audit log / fotoğraf sorgularının beklenen index'leri kullandığını EXPLAIN ile kontrol eder.
+Sorgular servis fonksiyonlarının kendisi çalıştırılarak yakalanır (SQL elle kopyalanmaz), ardından aynı
+parametrelerle EXPLAIN edilir. Küçük tablolarda planlayıcı her zaman seq scan seçeceği için EXPLAIN
+'SET enable_seqscan = off' ile çalıştırılır: kontrol, index'in sorgu için kullanılabilir olduğunu doğrular.
+Beklenen index planda yoksa script 1 ile çıkar.
+Kullanım: python scripts/check_index_usage.py [--verbose]
+"""
+import sys
+import os
+import re
+import argparse
+from datetime import date, timedelta
+
+# Proje root'unu path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app.db.session import SessionLocal, engine
+from app.models.request import Request
+from app.models.user import User
+from app.schemas.audit_log import AuditLogFilter
+from app.schemas.request import RequestListFilter
+from app.services.audit_service import AuditService
+from app.services.photo_service import PhotoService
+from app.services.request_service import RequestService
+from app.services.scheduled_reports import get_completed_requests_last_week, get_pending_and_planned_requests
+
+# "Index Scan using ix_x on ...", "Index Only Scan using ix_x", "Bitmap Index Scan on ix_x"
+_INDEX_IN_PLAN = re.compile(r"(?:Index (?:Only )?Scan(?: Backward)? using|Bitmap Index Scan on) (\w+)")
+
+
+def build_checks(user: User, depot_id: int, request_id: int):
+    """(etiket, kabul edilen index(ler), yakalanacak SQL'in tablosu, fonksiyon) listesi"""
+    today = date.today()
+    return [
+        ("Talep listesi (tümü, keyset)", "ix_requests_request_date_id", "requests",
+         lambda db: RequestService(db).get_requests_page(RequestListFilter(), limit=50)),
+        ("Talep listesi (depo)", "ix_requests_depot_request_date", "requests",
+         lambda db: RequestService(db).get_requests_page(RequestListFilter(depot_id=depot_id), limit=50)),
+        # Kullanıcının depo filtresi de varsa planlayıcı daha seçici olanı kullanır
+        ("Kullanıcının talepleri", ("ix_requests_user_request_date", "ix_requests_depot_request_date"), "requests",
+         lambda db: RequestService(db).get_user_requests(user.email)),
+        ("İş planı: bekleyenler", "ix_requests_pending_depot_requested_date", "requests",
+         lambda db: RequestService(db).get_pending_requests(depot_ids=[depot_id])),
+        ("İş planı: planlananlar", "ix_requests_planned_depot_planned_date", "requests",
+         lambda db: RequestService(db).get_planned_requests(
+             depot_ids=[depot_id], start_date=today, end_date=today + timedelta(days=14))),
+        ("Rapor: geçen hafta tamamlananlar", "ix_requests_status_completed_date", "requests",
+         lambda db: get_completed_requests_last_week(db)),
+        # status IN (iki açık durum) kısmi index koşullarını ima etmez; status önekli index kullanılır
+        ("Rapor: bekleyen ve planlanan işler", ("ix_requests_status_completed_date", "ix_requests_depot_request_date"), "requests",
+         lambda db: get_pending_and_planned_requests(db, depot_ids=[depot_id])),
+        ("Talep fotoğrafları", "ix_photos_request_id", "photos",
+         lambda db: PhotoService(db).get_request_photos(request_id)),
+        ("Audit log listesi", "ix_audit_logs_created_at", "audit_logs",
+         lambda db: AuditService(db).get_logs(limit=50)),
+        ("Audit log: entity geçmişi", "ix_audit_logs_entity_created_at", "audit_logs",
+         lambda db: AuditService(db).get_logs(AuditLogFilter(entity_type="Request", entity_id=request_id), limit=50)),
+        ("Audit log: kullanıcı", "ix_audit_logs_user_created_at", "audit_logs",
+         lambda db: AuditService(db).get_logs(AuditLogFilter(user_id=user.id), limit=50)),
+    ]
+
+
+def capture_statements(func, db):
+    """Fonksiyonun çalıştırdığı SELECT'leri (sql, parametreler) olarak yakala"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def explain(statement: str, parameters) -> str:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute("EXPLAIN " + statement, parameters)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        raw.rollback()
+        return plan
+    finally:
+        raw.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Index kullanım kontrolü (EXPLAIN)")
+    parser.add_argument("--verbose", action="store_true", help="Planların tamamını yazdır")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("⚠️  Bu kontrol PostgreSQL gerektirir")
+        return 1
+
+    db = SessionLocal()
+    try:
+        sample = db.query(Request).filter(Request.depot_id.isnot(None)).order_by(Request.id.desc()).first()
+        if not sample:
+            print("⚠️  Kontrol için depo atanmış en az bir talep gerekli")
+            return 1
+        user = db.query(User).filter(User.id == sample.user_id).first()
+
+        failures = 0
+        for label, expected, table, func in build_checks(user, sample.depot_id, sample.id):
+            expected = (expected,) if isinstance(expected, str) else expected
+            statements = [
+                (sql, params) for sql, params in capture_statements(func, db)
+                if re.search(rf"\bFROM {table}\b", sql)
+            ]
+            db.rollback()
+
+            used = set()
+            plans = []
+            for sql, params in statements:
+                plan = explain(sql, params)
+                plans.append(plan)
+                used.update(_INDEX_IN_PLAN.findall(plan))
+
+            ok = bool(used.intersection(expected))
+            failures += 0 if ok else 1
+            print(f"{'✅' if ok else '❌'} {label:<38} {' | '.join(expected):<42} kullanılan: {', '.join(sorted(used)) or '-'}")
+            if args.verbose or not ok:
+                for plan in plans:
+                    print("    " + plan.replace("\n", "\n    "))
+
+        if failures:
+            print(f"\n❌ {failures} sorgu beklenen index'i kullanmıyor")
+            return 1
+        print("\n✅ Tüm sorgular beklenen index'leri kullanıyor")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Liste ve detay endpoint'lerinin çalıştırdığı SQL sorgu sayısını kontrol eder (N+1 regresyon kontrolü).
+Sorgu sayısı dönen satır sayısından bağımsız olmalıdır; bütçe aşılırsa script 1 ile çıkar.
+Kullanım: python scripts/check_query_counts.py
+"""
+import sys
+import os
+import asyncio
+
+# Proje root'unu path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal, engine
+from app.models.request import Request
+from app.models.user import User
+from app.services.request_service import RequestService
+from app.schemas.request import RequestListFilter
+from app.api import routes_reports
+from app.utils.query_counter import QueryCounter
+
+
+def build_checks(admin: dict, sample_request_id: int):
+    """(etiket, sorgu bütçesi, fonksiyon) listesi"""
+    return [
+        ("RequestService.get_all_requests", 1,
+         lambda db: RequestService(db).get_all_requests()),
+        ("RequestService.get_user_requests", 3,
+         lambda db: RequestService(db).get_user_requests(admin["email"], include_depot_requests=True)),
+        ("RequestService.get_requests_page", 2,
+         lambda db: RequestService(db).get_requests_page(RequestListFilter(), limit=200, include_total=True)),
+        ("RequestService.get_request_by_id", 2,
+         lambda db: RequestService(db).get_request_by_id(sample_request_id)),
+        ("RequestService.get_pending_requests", 1,
+         lambda db: RequestService(db).get_pending_requests()),
+        ("RequestService.get_planned_requests", 1,
+         lambda db: RequestService(db).get_planned_requests()),
+        ("GET /reports/detailed", 2,
+         lambda db: asyncio.run(routes_reports.get_detailed_report(
+             depot_id=None, start_date=None, end_date=None, status_filter=None, job_type_filter=None,
+             db=db, current_user=admin
+         ))),
+    ]
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        admin_user = db.query(User).filter(User.role == "admin").first()
+        sample = db.query(Request).order_by(Request.id.desc()).first()
+        if not admin_user or not sample:
+            print("⚠️  Kontrol için en az bir admin kullanıcı ve bir talep gerekli")
+            return 1
+        admin = {
+            "id": admin_user.id,
+            "name": admin_user.name,
+            "email": admin_user.email,
+            "role": "admin",
+            "depot_id": None,
+            "depot_ids": [],
+        }
+        sample_request_id = sample.id
+        total_requests = db.query(Request).count()
+    finally:
+        db.close()
+
+    print(f"Toplam talep: {total_requests}")
+    failed = False
+    for label, budget, func in build_checks(admin, sample_request_id):
+        # Her kontrol temiz bir session ile çalışır (identity map önbelleği sayıyı etkilemesin)
+        db = SessionLocal()
+        try:
+            with QueryCounter(engine) as counter:
+                func(db)
+            try:
+                counter.assert_max(budget, label)
+                print(f"✅ {label}: {counter.count} sorgu (bütçe {budget})")
+            except AssertionError as e:
+                failed = True
+                print(f"❌ {e}")
+        finally:
+            db.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Rate limit token bucket store'larını gerçek arka uçlara karşı kontrol eder (uygulama kodu taklit edilmez):
+- SqliteTokenBucketStore: geçici bir SQLite dosyası; kapasite/dolum, worker'lar arası paylaşım
+  (aynı dosyayı açan ikinci store) ve başka bir bağlantı yazma kilidini tutarken event loop'un bloklanmaması
+- RedisTokenBucketStore: --redis-url verilirse o sunucu (redis paketi gerekir), verilmezse
+  fakeredis kuruluysa onun Lua destekli sunucusu; ikisi de yoksa bu kısım atlanır
+Bir kontrol başarısız olursa script 1 ile çıkar.
+Kullanım: python scripts/check_rate_limit_store.py [--redis-url redis://localhost:6379/15]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Proje root'unu path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.rate_limit import RedisTokenBucketStore, SqliteTokenBucketStore
+
+
+async def check_bucket(store, label: str, failures: list) -> None:
+    """Kapasite kadar istek geçer, sonraki reddedilir, dolum hızıyla tekrar izin verilir"""
+    key = f"check|{label}|{time.time()}"
+    failed_before = len(failures)
+    capacity, rate = 5, 20.0  # saniyede 20 token: 0.1 sn'de 2 token dolar
+
+    results = [await store.take(key, capacity, rate) for _ in range(capacity)]
+    if not all(allowed for allowed, _ in results):
+        failures.append(f"{label}: kapasite içindeki istekler reddedildi ({results})")
+    allowed, tokens = await store.take(key, capacity, rate)
+    if allowed:
+        failures.append(f"{label}: kapasite aşıldığı halde istek geçti (kalan {tokens:.2f})")
+
+    await asyncio.sleep(0.1)
+    allowed, _ = await store.take(key, capacity, rate)
+    if not allowed:
+        failures.append(f"{label}: dolumdan sonra istek reddedildi")
+
+    other_allowed, _ = await store.take(key + "|diğer", capacity, rate)
+    if not other_allowed:
+        failures.append(f"{label}: farklı anahtar aynı kovayı kullandı")
+    print(f"{'❌' if len(failures) > failed_before else '✅'} {label}: kapasite, dolum ve anahtar ayrımı")
+
+
+async def check_sqlite_shared(path: str, failures: list) -> None:
+    """Aynı dosyayı açan iki store (iki worker gibi) aynı kovayı paylaşmalı"""
+    first, second = SqliteTokenBucketStore(path), SqliteTokenBucketStore(path)
+    key = f"check|shared|{time.time()}"
+    capacity, rate = 10, 0.001
+
+    outcomes = await asyncio.gather(*[
+        (first if i % 2 else second).take(key, capacity, rate) for i in range(capacity * 2)
+    ])
+    allowed = sum(1 for ok, _ in outcomes if ok)
+    if allowed != capacity:
+        failures.append(f"SQLite paylaşım: {capacity * 2} istekten {allowed} geçti (beklenen {capacity})")
+    else:
+        print(f"✅ SQLite paylaşım: iki store'dan {capacity * 2} istekten {allowed} geçti")
+
+
+async def check_sqlite_non_blocking(path: str, failures: list) -> None:
+    """Başka bir bağlantı yazma kilidini tutarken take() beklerken event loop çalışmaya devam etmeli"""
+    store = SqliteTokenBucketStore(path)
+    hold_seconds = 0.5
+    locked = threading.Event()
+
+    def hold_write_lock():
+        conn = sqlite3.connect(path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        locked.set()
+        time.sleep(hold_seconds)
+        conn.execute("COMMIT")
+        conn.close()
+
+    holder = threading.Thread(target=hold_write_lock)
+    holder.start()
+    await asyncio.to_thread(locked.wait)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    allowed, _ = await store.take(f"check|lock|{time.time()}", 5, 1.0)
+    waited = time.perf_counter() - started
+    ticker_task.cancel()
+    await asyncio.to_thread(holder.join)
+
+    # Kilit beklenirken ~hold_seconds / 0.01 tick atılmalı; loop bloklanırsa neredeyse hiç atılmaz
+    if not allowed or ticks < (waited / 0.01) / 2:
+        failures.append(f"SQLite kilit: {waited:.2f} sn beklerken event loop {ticks} tick attı (bloklandı)")
+    else:
+        print(f"✅ SQLite kilit: {waited:.2f} sn beklerken event loop {ticks} tick attı")
+
+
+async def build_redis_store(url: str):
+    """(store, etiket) - redis URL'i ya da fakeredis; ikisi de yoksa (None, sebep)"""
+    if url:
+        store = RedisTokenBucketStore.from_url(url)
+        await store.client.ping()
+        return store, f"Redis ({url})"
+    try:
+        import fakeredis
+    except ImportError:
+        return None, "fakeredis kurulu değil ve --redis-url verilmedi"
+    return RedisTokenBucketStore(fakeredis.FakeAsyncRedis()), "Redis (fakeredis)"
+
+
+async def run(redis_url: str) -> list:
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rate_limit.db")
+        await check_bucket(SqliteTokenBucketStore(path), "SQLite", failures)
+        await check_sqlite_shared(path, failures)
+        await check_sqlite_non_blocking(path, failures)
+
+    store, label = await build_redis_store(redis_url)
+    if store is None:
+        print(f"⚠️  Redis kontrolü atlandı: {label}")
+    else:
+        await check_bucket(store, label, failures)
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rate limit store kontrolü")
+    parser.add_argument("--redis-url", default="", help="Kontrol edilecek Redis (ör. redis://localhost:6379/15)")
+    args = parser.parse_args()
+
+    failures = asyncio.run(run(args.redis_url))
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+import_from_csv.py, import_from_excel.py ve import_from_sheets.py'nin ortak CLI katmanı.
+Import'un kendisi app.services.import_job_service'tedir (admin API ile aynı iş altyapısı):
+her tip için bir import işi oluşturulur ve doğrudan çalıştırılır; yarıda kalan iş --resume ile devam eder.
+"""
+import sys
+import os
+import argparse
+from typing import List, Tuple
+
+# Proje root'unu path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+from app.models.depot import Depot
+from app.services.import_job_service import IMPORTERS, ImportJobService
+
+# (import tipi, dosya adı, dosya içeriği)
+ImportSource = Tuple[str, str, bytes]
+
+
+def build_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--depot-id", type=int, help="Bayi ve POSM kayıtlarının depo id'si (bu tipler için zorunlu)")
+    parser.add_argument("--only", choices=sorted(IMPORTERS), action="append", help="Yalnızca bu tip(ler)i import et")
+    parser.add_argument("--no-create-territories", action="store_true", help="Dosyada olup veritabanında olmayan territory'leri oluşturma")
+    parser.add_argument("--resume", type=int, metavar="JOB_ID", help="Yarıda kalmış import işini checkpoint'ten devam ettir")
+    return parser
+
+
+def _print_progress(job) -> None:
+    print(f"   … {job.processed_rows}/{job.total_rows} satır", end="\r", flush=True)
+
+
+def _print_result(job) -> None:
+    print()  # İlerleme satırını kapat
+    icon = "✅" if job.status == "completed" else "❌"
+    print(
+        f"{icon} [{job.kind}] iş {job.id}: {job.status} - {job.inserted_count} yeni, "
+        f"{job.updated_count} güncellenen, {job.error_count} hatalı satır"
+        + (f" ({job.message})" if job.status != "completed" and job.message else "")
+    )
+    if job.error_count:
+        print(f"   Hata raporu: GET /admin/import-jobs/{job.id}/errors")
+    if job.status != "completed":
+        print(f"   Devam ettirmek için: --resume {job.id}")
+
+
+def run_imports(source_type: str, sources: List[ImportSource], args: argparse.Namespace) -> int:
+    """Her kaynak için bir import işi oluşturup sırayla çalıştır; herhangi biri başarısızsa 1 döndür"""
+    db = SessionLocal()
+    try:
+        service = ImportJobService(db)
+
+        if args.resume:
+            print(f"🔁 İş {args.resume} devam ettiriliyor...")
+            try:
+                job = service.run_job(args.resume, progress=_print_progress)
+            except ValueError as e:
+                print(f"❌ {e}")
+                return 1
+            _print_result(job)
+            return 0 if job.status == "completed" else 1
+
+        if args.depot_id and not db.query(Depot).filter(Depot.id == args.depot_id).first():
+            print(f"❌ Depo bulunamadı: {args.depot_id}")
+            return 1
+
+        failures = 0
+        for kind, filename, contents in sources:
+            if args.only and kind not in args.only:
+                continue
+            importer = IMPORTERS[kind]
+            if importer.requires_depot and not args.depot_id:
+                print(f"⚠️  {importer.label} import'u atlandı: --depot-id gerekli")
+                continue
+
+            print(f"\n📥 {importer.label} import ediliyor ({filename})...")
+            job = service.create_job(
+                kind=kind,
+                source_type=source_type,
+                filename=filename,
+                contents=contents,
+                depot_id=args.depot_id if importer.requires_depot else None,
+                options=None if args.no_create_territories else {"create_territories": True}
+            )
+            job = service.run_job(job.id, progress=_print_progress)
+            _print_result(job)
+            failures += 0 if job.status == "completed" else 1
+
+        return 1 if failures else 0
+    finally:
+        db.close()
@@ -0,0 +1,219 @@
+"""
+POSM stok defteri eşzamanlılık testi: yüzlerce Montaj talebini paralel thread'lerle aynı anda tamamlar.
+Geçici bir depo, bayi, POSM (--stock adet hazır stok) ve --completions adet talep oluşturur; her talep
+ayrı session'la RequestService.update_request üzerinden "Tamamlandı" yapılır. Ayrıca --duplicates kadar
+talep iki kez eşzamanlı tamamlanır (aynı talep stoktan bir kez düşmeli).
+
+Doğrulananlar:
+  - başarılı tamamlanma sayısı = min(stok, talep); kalanlar "Yetersiz hazır stok" ile reddedilir
+  - hazır stok hiçbir zaman negatif olmaz ve stok - başarılı sayısına eşittir
+  - her talep için en fazla bir montaj hareketi vardır
+  - sayaçlar stok hareket defterinin toplamına eşittir
+
+PostgreSQL gerektirir (satır kilitleri ve RETURNING). Test verisi sonunda silinir (--keep ile saklanır).
+Kullanım: python scripts/stress_posm_stock.py --stock 200 --completions 300 --workers 25
+"""
+import sys
+import os
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+# Proje root'unu path'e ekle
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from app.db.session import SessionLocal
+from app.models.dealer import Dealer
+from app.models.depot import Depot
+from app.models.posm import Posm
+from app.models.posm_stock_movement import PosmStockMovement
+from app.models.request import Request, JobType, RequestStatus
+from app.models.user import User
+from app.schemas.request import RequestUpdate
+from app.services.posm_stock_service import PosmStockService
+from app.services.request_service import RequestService
+
+
+def create_fixture(stock: int, completions: int) -> dict:
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.role == "admin").first()
+        if not admin:
+            raise RuntimeError("Test için en az bir admin kullanıcı gerekli")
+
+        suffix = f"{int(time.time())}_{os.getpid()}"
+        depot = Depot(name=f"STRESS {suffix}", code=f"STRESS_{suffix}")
+        db.add(depot)
+        db.flush()
+        dealer = Dealer(code=f"STRESS-{suffix}", name="Stok stres testi", depot_id=depot.id)
+        posm = Posm(name=f"STRESS POSM {suffix}", depot_id=depot.id, ready_count=0, repair_pending_count=0)
+        db.add_all([dealer, posm])
+        db.flush()
+        PosmStockService(db).apply_movement(posm.id, "opening_balance", ready_delta=stock, created_by=admin.id)
+
+        requests = [
+            Request(
+                user_id=admin.id,
+                dealer_id=dealer.id,
+                depot_id=depot.id,
+                job_type=JobType.MONTAJ.value,
+                requested_date=date.today(),
+                posm_id=posm.id,
+                status=RequestStatus.BEKLEMEDE.value
+            )
+            for _ in range(completions)
+        ]
+        db.add_all(requests)
+        db.commit()
+        return {
+            "admin_id": admin.id,
+            "depot_id": depot.id,
+            "posm_id": posm.id,
+            "request_ids": [request.id for request in requests],
+        }
+    finally:
+        db.close()
+
+
+def complete_request(request_id: int, admin_id: int, start: threading.Event) -> str:
+    """Tek talebi kendi session'ında tamamla; 'ok', 'insufficient' veya hata metni döner"""
+    start.wait()
+    db = SessionLocal()
+    try:
+        RequestService(db).update_request(
+            request_id,
+            RequestUpdate(status=RequestStatus.TAMAMLANDI.value, completed_date=date.today()),
+            admin_id
+        )
+        return "ok"
+    except ValueError as e:
+        db.rollback()
+        return "insufficient" if "Yetersiz" in str(e) else f"error: {e}"
+    except Exception as e:
+        db.rollback()
+        return f"error: {type(e).__name__}: {e}"
+    finally:
+        db.close()
+
+
+def verify(fixture: dict, stock: int, completions: int, results: list) -> list:
+    failures = []
+    ok = results.count("ok")
+    insufficient = results.count("insufficient")
+    errors = [result for result in results if result not in ("ok", "insufficient")]
+    expected_ok = min(stock, completions)
+
+    db = SessionLocal()
+    try:
+        posm = db.query(Posm).filter(Posm.id == fixture["posm_id"]).one()
+        completed = db.query(func.count(Request.id)).filter(
+            Request.id.in_(fixture["request_ids"]),
+            Request.status == RequestStatus.TAMAMLANDI.value
+        ).scalar()
+        montaj_per_request = db.query(PosmStockMovement.request_id, func.count(PosmStockMovement.id)).filter(
+            PosmStockMovement.posm_id == posm.id,
+            PosmStockMovement.reason == "montaj"
+        ).group_by(PosmStockMovement.request_id).all()
+        ledger_ready, ledger_repair_pending = db.query(
+            func.coalesce(func.sum(PosmStockMovement.ready_delta), 0),
+            func.coalesce(func.sum(PosmStockMovement.repair_pending_delta), 0)
+        ).filter(PosmStockMovement.posm_id == posm.id).one()
+
+        print(f"   başarılı: {ok}, stok yetersiz: {insufficient}, diğer hata: {len(errors)}")
+        print(f"   tamamlanan talep: {completed}, kalan hazır stok: {posm.ready_count}, defter toplamı: {ledger_ready}")
+
+        if errors:
+            failures.append(f"Beklenmeyen hatalar ({len(errors)}), ilki: {errors[0]}")
+        if completed != expected_ok:
+            failures.append(f"Tamamlanan talep {completed}, beklenen {expected_ok}")
+        if posm.ready_count < 0:
+            failures.append(f"Negatif stok: {posm.ready_count}")
+        if posm.ready_count != stock - completed:
+            failures.append(f"Hazır stok {posm.ready_count}, beklenen {stock - completed}")
+        if any(count > 1 for _, count in montaj_per_request):
+            failures.append("Aynı talep için birden fazla montaj hareketi")
+        if len(montaj_per_request) != completed:
+            failures.append(f"Montaj hareketi {len(montaj_per_request)}, tamamlanan talep {completed}")
+        if (ledger_ready, ledger_repair_pending) != (posm.ready_count, posm.repair_pending_count):
+            failures.append(
+                f"Defter ({ledger_ready}, {ledger_repair_pending}) ile sayaçlar "
+                f"({posm.ready_count}, {posm.repair_pending_count}) farklı"
+            )
+    finally:
+        db.close()
+    return failures
+
+
+def cleanup(fixture: dict) -> None:
+    db = SessionLocal()
+    try:
+        db.query(Request).filter(Request.id.in_(fixture["request_ids"])).delete(synchronize_session=False)
+        db.query(Posm).filter(Posm.id == fixture["posm_id"]).delete(synchronize_session=False)
+        db.query(Dealer).filter(Dealer.depot_id == fixture["depot_id"]).delete(synchronize_session=False)
+        db.query(Depot).filter(Depot.id == fixture["depot_id"]).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="POSM stok defteri eşzamanlılık testi")
+    parser.add_argument("--stock", type=int, default=200, help="Başlangıç hazır stok")
+    parser.add_argument("--completions", type=int, default=300, help="Paralel tamamlanacak Montaj talebi sayısı")
+    parser.add_argument("--duplicates", type=int, default=50, help="İki kez eşzamanlı tamamlanacak talep sayısı")
+    parser.add_argument("--workers", type=int, default=25, help="Thread sayısı (DB pool boyutunu aşmamalı)")
+    parser.add_argument("--keep", action="store_true", help="Test verisini silme")
+    args = parser.parse_args()
+
+    fixture = create_fixture(args.stock, args.completions)
+    request_ids = fixture["request_ids"]
+    # Tekrarlanan talepler kuyrukta aslının hemen arkasına konur (iki istek aynı anda aynı talebi tamamlar)
+    jobs = []
+    for index, request_id in enumerate(request_ids):
+        jobs.append(request_id)
+        if index < args.duplicates:
+            jobs.append(request_id)
+    print(
+        f"🔧 POSM {fixture['posm_id']}: {args.stock} stok, {len(request_ids)} talep, "
+        f"{len(jobs)} eşzamanlı tamamlama ({args.workers} thread)"
+    )
+
+    failures = []
+    try:
+        # Tüm işler kuyruğa alındıktan sonra thread'ler aynı anda başlar (çakışma olasılığı en yüksek)
+        start = threading.Event()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = [
+                executor.submit(complete_request, request_id, fixture["admin_id"], start)
+                for request_id in jobs
+            ]
+            started = time.perf_counter()
+            start.set()
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+        print(f"   {len(jobs)} istek {elapsed:.2f} sn'de tamamlandı")
+
+        # Talep başına tek sonuç: tekrarlanan tamamlamada ikinci istek talebi tamamlanmış görür,
+        # stok değişmeden "ok" döner; isteklerden biri başarılıysa talep tamamlanmıştır
+        by_request = {}
+        for request_id, result in zip(jobs, results):
+            if by_request.get(request_id) != "ok":
+                by_request[request_id] = result
+        failures = verify(fixture, args.stock, len(request_ids), list(by_request.values()))
+    finally:
+        if not args.keep:
+            cleanup(fixture)
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Stok tutarlı: negatif stok yok, her talep bir kez düştü, defter = sayaçlar")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
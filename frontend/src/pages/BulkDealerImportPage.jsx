@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import api from '../utils/api'
 import '../styles/BulkDealerImportPage.css'
 
@@ -8,9 +8,11 @@ function BulkDealerImportPage() {
   const [file, setFile] = useState(null)
   const [uploading, setUploading] = useState(false)
   const [result, setResult] = useState(null)
+  const pollTimer = useRef(null)
 
   useEffect(() => {
     loadDepots()
+    return () => clearTimeout(pollTimer.current)
   }, [])
 
   const loadDepots = async () => {
@@ -27,6 +29,47 @@ function BulkDealerImportPage() {
     setResult(null)
   }
 
+  // Import arka planda çalışır; iş bitene kadar durumu periyodik olarak sorgula
+  const pollJob = async (jobId) => {
+    try {
+      const response = await api.get(`/admin/import-jobs/${jobId}`)
+      const job = response.data
+      setResult(job)
+
+      if (job.status === 'completed') {
+        setUploading(false)
+        alert('Import başarıyla tamamlandı!')
+      } else if (job.status === 'failed') {
+        setUploading(false)
+        alert(job.message || 'Import başarısız')
+      } else {
+        pollTimer.current = setTimeout(() => pollJob(jobId), 1000)
+      }
+    } catch (error) {
+      setUploading(false)
+      alert(error.response?.data?.detail || 'Import durumu alınamadı')
+    }
+  }
+
+  const handleDownloadErrors = async () => {
+    try {
+      const response = await api.get(`/admin/import-jobs/${result.id}/errors`, {
+        responseType: 'blob'
+      })
+
+      const url = window.URL.createObjectURL(new Blob([response.data]))
+      const link = document.createElement('a')
+      link.href = url
+      link.setAttribute('download', `import_${result.id}_hatalar.csv`)
+      document.body.appendChild(link)
+      link.click()
+      link.remove()
+      window.URL.revokeObjectURL(url)
+    } catch (error) {
+      alert('Hata raporu indirilemedi')
+    }
+  }
+
   const handleUpload = async (e) => {
     e.preventDefault()
 
@@ -60,11 +103,10 @@ function BulkDealerImportPage() {
       setResult(response.data)
       setFile(null)
       document.getElementById('file-input').value = ''
-      alert('Import başarıyla tamamlandı!')
+      pollJob(response.data.id)
     } catch (error) {
       alert(error.response?.data?.detail || 'Import başarısız')
       setResult(null)
-    } finally {
       setUploading(false)
     }
   }
@@ -137,6 +179,12 @@ function BulkDealerImportPage() {
         {result && (
           <div className="import-result">
             <h3>Import Sonuçları</h3>
+            {(result.status === 'pending' || result.status === 'running') && (
+              <p>İşleniyor... {result.processed_rows || 0} / {result.total_rows || '?'} satır</p>
+            )}
+            {result.status === 'failed' && (
+              <p className="stat-value error">{result.message}</p>
+            )}
             <div className="result-stats">
               <div className="stat-item">
                 <span className="stat-label">Yeni Kayıt:</span>
@@ -146,10 +194,10 @@ function BulkDealerImportPage() {
                 <span className="stat-label">Güncellenen:</span>
                 <span className="stat-value info">{result.updated || 0}</span>
               </div>
-              {result.errors && result.errors.length > 0 && (
+              {result.error_count > 0 && (
                 <div className="stat-item">
                   <span className="stat-label">Hatalar:</span>
-                  <span className="stat-value error">{result.errors.length}</span>
+                  <span className="stat-value error">{result.error_count}</span>
                 </div>
               )}
             </div>
@@ -161,6 +209,12 @@ function BulkDealerImportPage() {
                     <li key={index}>{error}</li>
                   ))}
                 </ul>
+                {result.error_count > result.errors.length && (
+                  <p>İlk {result.errors.length} hata gösteriliyor.</p>
+                )}
+                <button type="button" onClick={handleDownloadErrors} className="btn-primary">
+                  Hata Raporunu İndir (CSV)
+                </button>
               </div>
             )}
           </div>
@@ -117,11 +117,20 @@ function PosmManagementPage() {
   }
 
   const handleSyncAllDepots = async () => {
-    if (!window.confirm('Tüm mevcut POSM\'leri tüm depolar için oluşturmak istediğinize emin misiniz? (Stoklar 0 olarak ayarlanacak)')) {
-      return
-    }
-
     try {
+      // Önce eklenecek kayıtları göster (hiçbir şey yazılmaz)
+      const preview = await api.post('/posm/sync-all-depots', null, { params: { dry_run: true } })
+      if (preview.data.created === 0) {
+        alert('Tüm POSM\'ler tüm depolarda zaten mevcut')
+        return
+      }
+      const details = preview.data.missing
+        .map(item => `${item.depot_name}: ${item.posm_names.length} POSM`)
+        .join('\n')
+      if (!window.confirm(`${preview.data.created} POSM kaydı oluşturulacak (stoklar 0 olarak ayarlanacak):\n${details}\n\nDevam etmek istiyor musunuz?`)) {
+        return
+      }
+
       const response = await api.post('/posm/sync-all-depots')
       alert(`Senkronizasyon tamamlandı!\nOluşturulan: ${response.data.created}\nAtlanan: ${response.data.skipped}\nToplam POSM: ${response.data.total_posms}\nToplam Depo: ${response.data.total_depots}`)
       loadPosmList()